@@ -21,6 +21,9 @@ import subprocess
 import shutil
 from pathlib import Path
 from app.core.config import settings
+from app.services.host_health import host_health
+from app.services.partition_store import partition_store
+from app.services.progress_bus import DOWNLOAD, EXTRACT, progress_bus, topic_of
 import uuid
 
 router = APIRouter()
@@ -498,6 +501,7 @@ async def save_extracted_data(org_name: str, payload: SaveExtractedDataRequest):
         # Align with savedf behavior (no special quoting) for pboc dataset
         df_detail.to_csv(filepath_dtl)
         df_cat.to_csv(filepath_cat)
+        partition_store.request_sync()
 
         logger.info(f"Saved extracted data to {filepath_dtl} and {filepath_cat}")
         return {
@@ -516,6 +520,10 @@ async def save_extracted_data(org_name: str, payload: SaveExtractedDataRequest):
 # Global download status storage
 download_sessions: Dict[str, DownloadStatus] = {}
 
+def _publish_download_status(session_id: str, download_status: DownloadStatus, event_type: str = "progress"):
+    """Push the session's status to /progress/download/{session_id} subscribers."""
+    progress_bus.publish(topic_of(DOWNLOAD, session_id), {"type": event_type, **download_status.dict()})
+
 async def perform_downloads_background(
     session_id: str,
     selected_attachments: list,
@@ -579,8 +587,9 @@ async def perform_downloads_background(
                     filename = os.path.basename(filepath)
                     file_progress.filename = filename
             
-            # Update progress callback
+            # Update progress callback (runs on the download thread)
             def progress_callback(progress_data):
+                changed = file_progress.status != 'downloading' or file_progress.progress != progress_data['progress']
                 file_progress.status = 'downloading'
                 file_progress.progress = progress_data['progress']
                 file_progress.downloaded_bytes = progress_data['downloaded_bytes']
@@ -595,10 +604,14 @@ async def perform_downloads_background(
                 
                 # Debug log
                 logger.debug(f"[PROGRESS_CALLBACK] session_id={session_id} attachment_id={attachment['id']} progress={progress_data['progress']}% overall={download_status.overall_progress}%")
+                # Once per percent, not per chunk
+                if changed:
+                    _publish_download_status(session_id, download_status)
             
-            # Download the file
+            # Download the file off the event loop
             logger.info(f"[BACKGROUND_DOWNLOAD] session_id={session_id} attachment_id={attachment['id']} Starting download: {attachment['download_url']}")
-            result = download_file_with_progress(
+            result = await asyncio.to_thread(
+                download_file_with_progress,
                 attachment['download_url'],
                 filepath,
                 progress_callback,
@@ -642,10 +655,13 @@ async def perform_downloads_background(
                 'error': str(e)
             })
             download_status.failed += 1
+        finally:
+            _publish_download_status(session_id, download_status)
     
     # Final progress update
     download_status.overall_progress = 100
     download_status.current_file = None
+    _publish_download_status(session_id, download_status, "completed")
     
     # Log final session summary
     logger.info(f"[BACKGROUND_DOWNLOAD] session_id={session_id} COMPLETED total={len(selected_attachments)} success={len(downloaded_files)} failed={len(failed_downloads)} skipped={len(skipped_files)}")
@@ -747,6 +763,8 @@ def download_file_with_progress(
         }
 
     # Attempt loop with HTTPS fallback if initial scheme is HTTP
+    # (hosts already known to need HTTPS are upgraded up front)
+    url = host_health.preferred_url(url)
     parsed = urlparse(url)
     https_fallback = (parsed.scheme == 'http')
     last_error: Optional[Exception] = None
@@ -762,6 +780,7 @@ def download_file_with_progress(
                 try:
                     logger.info(f"Retrying via HTTPS fallback: {https_url}")
                     result = try_download(https_url, retry_count)
+                    host_health.mark_https(url)
                     return result
                 except Exception as ee:
                     last_error = ee
@@ -892,7 +911,7 @@ async def download_attachments(org_name: str, request: DownloadRequest, backgrou
 
 @router.get("/download-progress/{session_id}")
 async def get_download_progress(session_id: str):
-    """Get download progress for a session"""
+    """Get download progress for a session (GET /progress/download/{session_id}/events streams it instead)"""
     if session_id not in download_sessions:
         logger.warning(f"[PROGRESS] session_id={session_id} not found in active sessions: {list(download_sessions.keys())}")
         raise HTTPException(status_code=404, detail="Download session not found")
@@ -951,6 +970,7 @@ class TextExtractionRequest(BaseModel):
     extract_all: bool = False
     use_soffice: bool = False
     use_llm_ocr: bool = False
+    progress_id: Optional[str] = None  # Publish per-file progress to /progress/extract/{progress_id}
 
 
 def encode_image(image_path: str) -> str:
@@ -1569,6 +1589,10 @@ async def extract_attachment_text(org_name: str, request: TextExtractionRequest)
     
     org_name_index = org2name[org_name]
     
+    def publish(event: dict):
+        if request.progress_id:
+            progress_bus.publish(topic_of(EXTRACT, request.progress_id), event)
+    
     try:
         # Get attachment list
         attachments = await get_attachment_text_list(org_name)
@@ -1585,12 +1609,17 @@ async def extract_attachment_text(org_name: str, request: TextExtractionRequest)
         if not selected_attachments:
             raise HTTPException(status_code=400, detail="No valid attachments selected")
         
-        # Extract text from each file
+        # Extract text from each file (OCR/LibreOffice run off the event loop)
         results = []
+        total = len(selected_attachments)
         for attachment in selected_attachments:
+            publish({"type": "progress", "current": len(results), "total": total, "fileName": attachment.fileName,
+                     "progress": int(len(results) / total * 100), "message": f"正在提取 {attachment.fileName}"})
             try:
                 logger.info(f"Extracting text from {attachment.fileName}")
-                content = extract_text_from_file(attachment.filePath, attachment.fileType, request.use_soffice, request.use_llm_ocr)
+                content = await asyncio.to_thread(
+                    extract_text_from_file, attachment.filePath, attachment.fileType, request.use_soffice, request.use_llm_ocr
+                )
                 
                 result = {
                     "id": attachment.id,
@@ -1617,16 +1646,18 @@ async def extract_attachment_text(org_name: str, request: TextExtractionRequest)
                 }
                 results.append(result)
         
-        return {
+        summary = {
             "message": f"Text extraction completed for {len(results)} files",
             "total_files": len(results),
             "successful": len([r for r in results if r["status"] == "completed"]),
             "failed": len([r for r in results if r["status"] == "failed"]),
-            "results": results
         }
+        publish({"type": "completed", "current": total, "total": total, "progress": 100, **summary})
+        return {**summary, "results": results}
     
     except Exception as e:
         logger.error(f"Error extracting text for {org_name}: {e}")
+        publish({"type": "error", "error": str(e)})
         raise HTTPException(status_code=500, detail="Failed to extract text")
 
 @router.post("/save-text-results/{org_name}")
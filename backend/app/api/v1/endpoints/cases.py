@@ -1,17 +1,35 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import logging
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from app.models.case import Case, CaseCreate, CaseUpdate, CaseSearchParams, CaseResponse
 from app.services.case_service import CaseService
 from app.core.database import get_database
 from app.core.config import settings
+from app.services.crawl_scheduler import CrawlScheduler, crawl_schedule_store
+from app.services.crawl_jobs import DONE, FAILED, JOB_DONE, JOB_FINALIZING, JOB_RUNNING, crawl_jobs, new_owner, selection_key
+from app.services.driver_pool import DriverPool
+from app.services.host_health import host_health
+from app.services.html_archive import DETAIL_PAGE, LIST_PAGE, archive_page, html_archive, reparse
+from app.services.job_runs import job_runs
+from app.services.list_fetcher import NOT_MODIFIED, fetch_list_pages_sync
+from app.services.page_cache import PageCacheBatch, list_page_cache, rows_hash
+from app.services.partition_store import partition_store
+from app.services.playwright_engine import PlaywrightEngine, PlaywrightPool
+from app.services.pboc_parser import parse_detail_page, parse_list_page, table_rows
+from app.services.rate_limit import host_limiter
+from app.services.scrape_engine import ScrapeCancelled, iter_scrape, load_page
+from app.services.scrape_output import job_record_log
+from app.services.scrape_worker import scrape_worker
+from app.services.seen_index import DTL_LINK, SUM_LINK, seen_index
+from app.utils.dataset import compute_dataset_etag
+from app.utils.responses import conditional_response, make_etag
 from bson import ObjectId
+from lxml.etree import ParserError
 import pandas as pd
-import glob
 import os
 import time
-import random
 import json
 import re
 import openai
@@ -20,9 +38,7 @@ from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException, WebDriverException
-import socket
 import urllib.parse
 
 router = APIRouter()
@@ -926,44 +942,59 @@ org2url = {
 PBOC_DATA_PATH = "../pboc"
 TEMP_PATH = "../temp"
 
+LIST_UPDATE_MODES = ("range", "until_known", "backfill")
+
 class UpdateListRequest(BaseModel):
     orgName: str
-    startPage: int
-    endPage: int
+    startPage: int = 1
+    endPage: int = 1
+    useCache: bool = True  # skip list pages unchanged since the last run
+    # range: startPage..endPage; until_known: from page 1 until a fully known page;
+    # backfill: bisect for the first unknown page and crawl older pages from there
+    mode: str = "range"
+    maxPages: int = 50  # page budget per list for until_known/backfill
+
+class UpdateListBatchRequest(BaseModel):
+    orgNames: List[str]
+    startPage: int = 1
+    endPage: int = 1
+    useCache: bool = True
+    mode: str = "range"
+    maxPages: int = 50
+    concurrency: Optional[int] = None  # defaults to LIST_BATCH_CONCURRENCY
 
 class UpdateDetailsRequest(BaseModel):
     orgName: str
 
+class ArchiveReparseRequest(BaseModel):
+    kind: str = "detail"  # "detail" or "list"
+    orgNames: Optional[List[str]] = None  # defaults to every archived org
+    sinceDays: Optional[float] = None  # only pages fetched within this many days
+
 def validate_url_hostname(url: str) -> bool:
-    """Validate if the hostname in the URL can be resolved and connected to."""
-    try:
-        parsed_url = urllib.parse.urlparse(url)
-        hostname = parsed_url.hostname
-        port = parsed_url.port or (443 if parsed_url.scheme == 'https' else 80)
-        
-        if not hostname:
-            return False
-        
-        # Try to resolve the hostname
-        ip_address = socket.gethostbyname(hostname)
-        logger.info(f"[validate_url_hostname] HOSTNAME_RESOLVED url={url} hostname={hostname} ip={ip_address}")
-        
-        # Try to establish a connection to the host
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(10)  # 10 second timeout
-        result = sock.connect_ex((hostname, port))
-        sock.close()
-        
-        if result == 0:
-            logger.info(f"[validate_url_hostname] CONNECTION_SUCCESS url={url} hostname={hostname} port={port}")
-            return True
-        else:
-            logger.warning(f"[validate_url_hostname] CONNECTION_FAILED url={url} hostname={hostname} port={port} error_code={result}")
-            return False
-            
-    except (socket.gaierror, socket.error, ValueError) as e:
-        logger.warning(f"[validate_url_hostname] VALIDATION_FAILED url={url} hostname={parsed_url.hostname if 'parsed_url' in locals() else 'unknown'} error={str(e)}")
-        return False
+    """Validate if the hostname in the URL can be resolved and connected to.
+
+    Results are cached per host (see host_health), so links sharing a host
+    cost one DNS lookup and TCP connect per TTL, and hosts whose circuit
+    breaker is open are rejected without probing.
+    """
+    ok = host_health.check(url)
+    if not ok:
+        logger.warning(f"[validate_url_hostname] VALIDATION_FAILED url={url} hostname={urllib.parse.urlparse(url).hostname or 'unknown'}")
+    return ok
+
+_chromedriver_path: Optional[str] = None
+_chromedriver_lock = threading.Lock()
+
+
+def _get_chromedriver_path() -> str:
+    """Resolve the chromedriver binary once per process (ChromeDriverManager hits the network)."""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None or not os.path.exists(_chromedriver_path):
+            _chromedriver_path = ChromeDriverManager().install()
+        return _chromedriver_path
+
 
 def get_chrome_driver(folder):
     options = webdriver.ChromeOptions()
@@ -1035,7 +1066,7 @@ def get_chrome_driver(folder):
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            service = ChromeService(executable_path=ChromeDriverManager().install())
+            service = ChromeService(executable_path=_get_chromedriver_path())
             driver = webdriver.Chrome(service=service, options=options)
             break
         except Exception as e:
@@ -1053,10 +1084,32 @@ def get_chrome_driver(folder):
     
     return driver
 
+# Warm browsers shared by list fallback and detail scraping jobs
+if settings.BROWSER_ENGINE == "playwright":
+    driver_pool = PlaywrightPool(
+        PlaywrightEngine(
+            max_contexts=settings.PLAYWRIGHT_MAX_CONTEXTS,
+            blocked_types=settings.PLAYWRIGHT_BLOCKED_RESOURCES.split(","),
+            nav_timeout=settings.PLAYWRIGHT_NAV_TIMEOUT_SECONDS,
+        ),
+        size=settings.PLAYWRIGHT_MAX_CONTEXTS,
+        acquire_timeout=settings.DRIVER_POOL_ACQUIRE_TIMEOUT_SECONDS,
+    )
+else:
+    driver_pool = DriverPool(
+        lambda: get_chrome_driver(TEMP_PATH),
+        size=settings.DRIVER_POOL_SIZE,
+        max_pages=settings.DRIVER_POOL_MAX_PAGES,
+        acquire_timeout=settings.DRIVER_POOL_ACQUIRE_TIMEOUT_SECONDS,
+    )
+
 def savedf(df, basename):
     savename = f"{basename}.csv"
     savepath = os.path.join(PBOC_DATA_PATH, savename)
     df.to_csv(savepath)
+    seen_index.add_shard(savepath)
+    partition_store.request_sync()
+    return savepath
 
 def savetempsub(df: pd.DataFrame, basename: str, subfolder: str):
     savename = f"{basename}.csv"
@@ -1066,53 +1119,59 @@ def savetempsub(df: pd.DataFrame, basename: str, subfolder: str):
     # Quote non-numeric similar to legacy to preserve commas
     df.to_csv(savepath, quoting=1, escapechar='\\')
 
-def get_sumeventdf(orgname: str, start: int, end: int):
-    org_name_index = org2name.get(orgname)
-    if not org_name_index:
-        raise HTTPException(status_code=400, detail="Invalid organization name")
+def _scrape_list_page_selenium(browser, url: str, zongbu: bool, org_name_index: str = "") -> pd.DataFrame:
+    """Load a list page in Chrome and extract name/date/link/sum rows.
 
-    browser = get_chrome_driver(TEMP_PATH)
-    baseurls = org2url.get(orgname)
-    if not baseurls:
-        raise HTTPException(status_code=400, detail="No URLs found for organization")
-    
-    resultls = []
+    The rendered DOM is read once via page_source and parsed in-process, rather
+    than one chromedriver round-trip per element.
+    """
+    # Paced per host, like detail pages
+    host_limiter.acquire(url)
+    load_page(browser, url, host_limiter)
+    source = browser.page_source
+    archive_page(LIST_PAGE, org_name_index, url, browser.current_url, source)
+    return parse_list_page(source, browser.current_url, zongbu)
 
-    # Process each base URL for the organization
-    for baseurl in baseurls:
-        for i in range(start, end + 1):
-            url = f"{baseurl}{i}.html"
+
+def fetch_list_urls(orgname: str, urls: List[str], zongbu: bool, cache_batch: Optional[PageCacheBatch] = None):
+    """Fetch list page URLs; returns {url: DataFrame, NOT_MODIFIED or None (failed)}.
+
+    Pages are first fetched concurrently as static HTML (httpx + lxml); only
+    pages that fail that path (anti-bot challenge, JS-rendered, network error)
+    are loaded in headless Chrome. Blocking: call from a worker thread.
+    """
+    static_results = {}
+    if settings.LIST_FETCH_STATIC:
+        try:
+            static_results = fetch_list_pages_sync(urls, zongbu, cache_batch, org2name.get(orgname, ""), host_limiter)
+        except Exception as e:
+            logger.info(f"[update-list] static_fetch_failed org={orgname} err={e}")
+            static_results = {}
+
+    fallback_urls = [url for url in urls if static_results.get(url) is None]
+    logger.info(
+        f"[update-list] org={orgname} pages={len(urls)} static_ok={len(urls) - len(fallback_urls)} selenium={len(fallback_urls)}"
+    )
+
+    browser = driver_pool.acquire() if fallback_urls else None
+    try:
+        for url in fallback_urls:
             try:
                 logger.info(f"[update-list] fetching url={url}")
-                browser.get(url)
-                time.sleep(random.randint(2, 5))
-                
-                namels, datels, linkls, sumls = [], [], [], []
-                if org_name_index == "zongbu":
-                    ls3 = browser.find_elements(By.XPATH, "//div[2]/ul/li/a")
-                    ls4 = browser.find_elements(By.XPATH, "//div[2]/ul/li/span")
-                    for j in range(len(ls3)):
-                        namels.append(ls3[j].text)
-                        datels.append(ls4[j].text)
-                        linkls.append(ls3[j].get_attribute("href"))
-                        sumls.append("")
-                else:
-                    ls1 = browser.find_elements(By.XPATH, '//td[@class="hei12jj"]')
-                    total = len(ls1) // 3
-                    for j in range(total):
-                        namels.append(ls1[j * 3].text)
-                        datels.append(ls1[j * 3 + 1].text)
-                        sumls.append(ls1[j * 3 + 2].text)
-
-                    ls2 = browser.find_elements(By.XPATH, '//font[@class="hei12"]/a')
-                    for link in ls2:
-                        linkls.append(link.get_attribute("href"))
-
-                df = pd.DataFrame({"name": namels, "date": datels, "link": linkls, "sum": sumls})
+                df = _scrape_list_page_selenium(browser, url, zongbu, org2name.get(orgname, ""))
                 logger.info(
-                    f"[update-list] page_ok url={url} items={len(df)} links={len(linkls)}"
+                    f"[update-list] page_ok url={url} items={len(df)} links={df['link'].notna().sum()}"
                 )
-                resultls.append(df)
+                if cache_batch is not None:
+                    digest = rows_hash(df)
+                    cached = cache_batch.get(url)
+                    if cached and cached.get("rows_hash") == digest:
+                        logger.info(f"[update-list] page_unchanged url={url}")
+                        cache_batch.mark_unchanged(url)
+                        static_results[url] = NOT_MODIFIED
+                        continue
+                    cache_batch.stage(url, rows_hash=digest)
+                static_results[url] = df
             except TimeoutException as e:
                 logger.info(f"[update-list] page_timeout url={url} err=Page load timeout after 45s")
                 continue
@@ -1122,12 +1181,16 @@ def get_sumeventdf(orgname: str, start: int, end: int):
             except Exception as e:
                 logger.info(f"[update-list] page_error url={url} err={e}")
                 continue
+    finally:
+        driver_pool.release(browser)
+    return {url: static_results.get(url) for url in urls}
 
-    browser.quit()
-    if not resultls:
+
+def _combine_list_frames(frames: List[pd.DataFrame], orgname: str) -> pd.DataFrame:
+    if not frames:
         return pd.DataFrame()
         
-    sumdf = pd.concat(resultls)
+    sumdf = pd.concat(frames)
     # Normalize URLs by removing .html extension for better deduplication
     sumdf['normalized_link'] = sumdf['link'].str.replace(r'\.html$', '', regex=True)
     # Remove potential duplicates that might occur across different base URLs
@@ -1137,41 +1200,185 @@ def get_sumeventdf(orgname: str, start: int, end: int):
     sumdf["区域"] = orgname
     return sumdf
 
-def get_csvdf_for_pending(penfolder, beginwith):
-    files = glob.glob(os.path.join(penfolder, "**", beginwith + "*.csv"), recursive=True)
-    dflist = []
-    for filepath in files:
-        try:
-            pendf = pd.read_csv(filepath, index_col=0, low_memory=False)
-            dflist.append(pendf)
-        except Exception:
-            continue
-    if dflist:
-        df = pd.concat(dflist)
-        df.reset_index(drop=True, inplace=True)
-    else:
-        df = pd.DataFrame()
-    return df
+
+def _pages_answered(results) -> int:
+    """Pages of fetch_list_urls results that were actually fetched (rows or unchanged), not failed."""
+    return sum(1 for result in results if result is not None)
+
+
+def get_sumeventdf(orgname: str, start: int, end: int, cache_batch: Optional[PageCacheBatch] = None):
+    """Scrape list pages start..end for an org.
+
+    With a cache batch, pages unchanged since the last committed run (304,
+    same body hash, or same rows for browser-loaded pages) are left out of the
+    result; the caller commits the batch once the new rows are saved.
+    """
+    return _crawl_sumeventdf_range(orgname, start, end, cache_batch)[0]
+
+
+def _crawl_sumeventdf_range(orgname: str, start: int, end: int, cache_batch: Optional[PageCacheBatch] = None):
+    """get_sumeventdf, also returning the number of pages fetched: (sumdf, pages_fetched)."""
+    org_name_index = org2name.get(orgname)
+    if not org_name_index:
+        raise HTTPException(status_code=400, detail="Invalid organization name")
+
+    baseurls = org2url.get(orgname)
+    if not baseurls:
+        raise HTTPException(status_code=400, detail="No URLs found for organization")
+
+    zongbu = org_name_index == "zongbu"
+    urls = [f"{baseurl}{i}.html" for baseurl in baseurls for i in range(start, end + 1)]
+    results = fetch_list_urls(orgname, urls, zongbu, cache_batch)
+
+    # Keep page order so de-duplication keeps the same row as before
+    frames = [results[url] for url in urls if isinstance(results[url], pd.DataFrame)]
+    return _combine_list_frames(frames, orgname), _pages_answered(results.values())
+
+
+def _page_is_known(result, known_links: set) -> Optional[bool]:
+    """True if every link on the page is already stored, False if any is new, None if unknown."""
+    if isinstance(result, str) and result == NOT_MODIFIED:
+        return True  # unchanged since a run whose rows were saved
+    if not isinstance(result, pd.DataFrame):
+        return None  # fetch failed
+    links = result["link"].dropna()
+    return bool(len(links)) and bool(links.isin(known_links).all())
+
+
+def _page_is_empty(result) -> bool:
+    return isinstance(result, pd.DataFrame) and result["link"].dropna().empty
+
+
+def crawl_sumeventdf_until_known(
+    orgname: str,
+    max_pages: int,
+    cache_batch: Optional[PageCacheBatch] = None,
+    backfill: bool = False,
+):
+    """Crawl list pages without a caller-chosen page range.
+
+    Default: walk each list from page 1 (LIST_CRAWL_BATCH pages at a time) and
+    stop at the first page whose links are all already in pbocsum.
+    Backfill: find the last page by galloping, bisect for the first page that
+    is not fully known (stored pages form a prefix of the list), then crawl
+    from there to the end. At most max_pages pages are crawled per list. A
+    probe page that fails twice stops the backfill with a 502, since it cannot
+    be told apart from content or the end of the list.
+    Validators reach cache_batch only for pages whose rows are in sumdf or
+    already stored, never for probes or pages dropped past the stop point.
+
+    Returns (sumdf, pages_fetched); failed fetches are not counted.
+    """
+    org_name_index = org2name.get(orgname)
+    if not org_name_index:
+        raise HTTPException(status_code=400, detail="Invalid organization name")
+    baseurls = org2url.get(orgname)
+    if not baseurls:
+        raise HTTPException(status_code=400, detail="No URLs found for organization")
+
+    zongbu = org_name_index == "zongbu"
+    known_links = seen_index.keys(SUM_LINK, region=orgname)
+    step = max(1, settings.LIST_CRAWL_BATCH)
+
+    frames: List[pd.DataFrame] = []
+    pages_fetched = 0
+    for baseurl in baseurls:
+        fetched: Dict[int, Any] = {}
+        kept: List[int] = []
+        # Probes and pages past the stop point are fetched too; their validators
+        # are only kept (see below) when their rows are saved or already stored
+        probe_batch = cache_batch.scratch() if cache_batch is not None else None
+
+        def fetch_pages(pages: List[int]) -> None:
+            nonlocal pages_fetched
+            todo = [p for p in pages if p not in fetched]
+            if not todo:
+                return
+            urls = [f"{baseurl}{p}.html" for p in todo]
+            results = fetch_list_urls(orgname, urls, zongbu, probe_batch)
+            for p, url in zip(todo, urls):
+                fetched[p] = results[url]
+            pages_fetched += _pages_answered(results.values())
+
+        def probe(page: int):
+            """Result of a backfill probe, retried once; a page that still fails stops the backfill."""
+            fetch_pages([page])
+            if fetched[page] is None:
+                del fetched[page]
+                fetch_pages([page])
+            if fetched[page] is None:
+                url = f"{baseurl}{page}.html"
+                logger.warning(f"[update-list] BACKFILL_STOPPED org={orgname} base={baseurl} probe_failed={url}")
+                raise HTTPException(status_code=502, detail=f"List page {url} could not be fetched; backfill stopped")
+            return fetched[page]
+
+        if backfill:
+            # Gallop to find a page past the end of the list, then bisect for the last page
+            hi = 1
+            while not _page_is_empty(probe(hi)) and hi < settings.LIST_CRAWL_MAX_PAGE:
+                hi *= 2
+            lo = max(1, hi // 2)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if _page_is_empty(probe(mid)):
+                    hi = mid - 1
+                else:
+                    lo = mid
+            last_page = lo
+            # First page that is not fully known (pages 1..k-1 are stored)
+            lo, hi = 1, last_page + 1
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if _page_is_known(probe(mid), known_links):
+                    lo = mid + 1
+                else:
+                    hi = mid
+            first_unknown = lo
+            logger.info(
+                f"[update-list] BACKFILL org={orgname} base={baseurl} last_page={last_page} first_unknown={first_unknown} probes={len(fetched)}"
+            )
+            pages = list(range(first_unknown, min(last_page, first_unknown + max_pages - 1) + 1))
+            for i in range(0, len(pages), step):
+                fetch_pages(pages[i:i + step])
+            for p in pages:
+                if isinstance(fetched[p], pd.DataFrame):
+                    frames.append(fetched[p])
+                    kept.append(p)
+        else:
+            page = 1
+            stop = False
+            while not stop and page <= max_pages:
+                window = list(range(page, min(page + step, max_pages + 1)))
+                fetch_pages(window)
+                for p in window:
+                    result = fetched[p]
+                    if _page_is_empty(result) or _page_is_known(result, known_links):
+                        logger.info(f"[update-list] UNTIL_KNOWN org={orgname} base={baseurl} stop_page={p}")
+                        stop = True
+                        break
+                    if isinstance(result, pd.DataFrame):
+                        frames.append(result)
+                        kept.append(p)
+                page += step
+
+        if cache_batch is not None:
+            kept.extend(p for p, result in fetched.items() if _page_is_known(result, known_links))
+            cache_batch.adopt(probe_batch, [f"{baseurl}{p}.html" for p in kept])
+
+    return _combine_list_frames(frames, orgname), pages_fetched
 
 def get_new_links_for_org(orgname: str):
-    """Compute links in sum not present in dtl for the org."""
-    sum_df = get_pboc_data_for_pending(orgname, "sum")
-    dtl_df = get_pboc_data_for_pending(orgname, "dtl")
-    if sum_df.empty:
-        return []
-    current_links = sum_df["link"].dropna().tolist()
-    old_links = dtl_df["link"].dropna().tolist() if not dtl_df.empty else []
-    return [x for x in current_links if x not in set(old_links)]
+    """Compute links in sum not present in dtl for the org (from the seen-link index)."""
+    return seen_index.pending_links(orgname)
 
 def get_new_links_with_details_for_org(orgname: str):
     """Compute links in sum not present in dtl for the org, with name and date details."""
     sum_df = get_pboc_data_for_pending(orgname, "sum")
-    dtl_df = get_pboc_data_for_pending(orgname, "dtl")
     if sum_df.empty:
         return []
     
     # Get old links that already have details
-    old_links = set(dtl_df["link"].dropna().tolist()) if not dtl_df.empty else set()
+    old_links = seen_index.keys(DTL_LINK)
     
     # Filter for new links only
     new_links_df = sum_df[~sum_df["link"].isin(old_links) & sum_df["link"].notna()].copy()
@@ -1204,163 +1411,74 @@ def get_new_links_with_details_for_org(orgname: str):
     return result
 
 def web2table(rows):
-    data = []
-    for tr in rows:
-        cell_texts = []
-        tds = tr.find_elements(By.TAG_NAME, "td")
-        for td in tds:
-            cell_texts.append(td.text)
-        if cell_texts:
-            data.append(cell_texts)
-    return pd.DataFrame(data)
-
-def scrape_detail_pages(links, orgname: str):
-    """Scrape detail pages for download links and raw text content; save to temp subfolder.
-    
-    Saves temporary files every 10 records for both pboctotable and pboctodownload.
+    """Table of td texts for parsed (lxml) tr elements, e.g. doc.xpath("//table//tr")."""
+    return table_rows(rows)
 
-    Returns tuple (download_count, content_count).
+def _extract_detail_page(browser, durl: str, org_name_index: str):
+    """Load a detail page and return (download_urls, raw_content).
+
+    raw_content is None for download-only pages or when extraction fails.
+    Page-load errors propagate to the caller; the page is parsed from a single
+    page_source snapshot.
     """
-    org_name_index = org2name.get(orgname)
-    if not org_name_index:
-        return (0, 0)
-    if not links:
-        return (0, 0)
+    browser.get(durl)
+    source = browser.page_source
+    archive_page(DETAIL_PAGE, org_name_index, durl, browser.current_url, source)
+    try:
+        return parse_detail_page(source, browser.current_url, org_name_index == "zongbu")
+    except (ParserError, ValueError) as content_error:
+        logger.info(f"[update-details] content_extraction_error url={durl} err={content_error}")
+    return [], None
 
-    browser = get_chrome_driver(TEMP_PATH)
-    download_frames = []
-    table_frames = []
-    
-    # Counters for temp file saving
-    processed_count = 0
-    temp_file_counter = 1
 
-    total_links = len(links)
-    
-    try:
-        for idx, durl in enumerate(links):
-            current_progress = idx + 1
-            progress_percent = round((current_progress / total_links) * 100, 1)
-            
-            try:
-                logger.info(f"[update-details] PROGRESS {current_progress}/{total_links} ({progress_percent}%) org={orgname} fetching url={durl}")
-                browser.get(durl)
-                # Collect download anchors
-                dl_anchors = browser.find_elements(By.XPATH, "//td[@class='hei14jj']//a")
-                downurl = []
-                for a in dl_anchors:
-                    href = a.get_attribute("href")
-                    if href:
-                        downurl.append(href)
-                if downurl:
-                    logger.info(f"[update-details] downloads_found progress={current_progress}/{total_links} url={durl} count={len(downurl)}")
-                    df_dl = pd.DataFrame({"download": downurl})
-                    df_dl["link"] = durl
-                    download_frames.append(df_dl)
-
-                # Extract raw text content from the page only if it has meaningful content beyond download links
-                has_meaningful_content = False
-                try:
-                    # Check if page has table/content structure beyond just download links
-                    if org_name_index == "zongbu":
-                        # For headquarters, extract from easysiteText element
-                        try:
-                            content_element = browser.find_element(By.XPATH, "//*[@id='easysiteText']")
-                            content_text = content_element.text.strip()
-                            if content_text and len(content_text) > 20:  # Meaningful content threshold
-                                has_meaningful_content = True
-                        except Exception:
-                            # Fallback to table check if easysiteText not found
-                            table_rows = browser.find_elements(By.XPATH, "//table/tbody/tr")
-                            if table_rows and len(table_rows) > 0:
-                                # Check if any row has meaningful text (not just download links)
-                                for row in table_rows[:3]:  # Check first few rows
-                                    row_text = row.text.strip()
-                                    if row_text and len(row_text) > 20:  # Meaningful content threshold
-                                        has_meaningful_content = True
-                                        break
-                    else:
-                        # For regional branches, check content in hei14jj class
-                        content_element = browser.find_element(By.XPATH, "//td[@class='hei14jj']")
-                        
-                        # Check if there are table rows or structured content
-                        table_rows = content_element.find_elements(By.XPATH, ".//tr")
-                        if table_rows and len(table_rows) > 1:  # More than just header
-                            has_meaningful_content = True
-                        else:
-                            # Check for other meaningful content (not just links)
-                            content_text = content_element.text.strip()
-                            # Remove download link text patterns to see if there's other content
-                            if content_text and len(content_text) > 50:  # Threshold for meaningful content
-                                # Check if it's not just a list of download links
-                                lines = content_text.split('\n')
-                                meaningful_lines = [line for line in lines if line.strip() and 
-                                                  not line.strip().startswith('http') and 
-                                                  '下载' not in line and '文件' not in line]
-                                if len(meaningful_lines) > 2:
-                                    has_meaningful_content = True
-                    
-                    # Only extract and save content if it has meaningful data
-                    if has_meaningful_content:
-                        if org_name_index == "zongbu":
-                            content_element = browser.find_element(By.XPATH, "//*[@id='easysiteText']")
-                        else:
-                            content_element = browser.find_element(By.XPATH, "//td[@class='hei14jj']")
-                        
-                        raw_content = content_element.text.strip()
-                        
-                        if raw_content:
-                            df_tbl = pd.DataFrame({
-                                "content": [raw_content],
-                                "link": [durl]
-                            })
-                            
-                            logger.info(
-                                f"[update-details] content_found progress={current_progress}/{total_links} url={durl} length={len(raw_content)}"
-                            )
-                            table_frames.append(df_tbl)
-                    else:
-                        logger.info(f"[update-details] download_only_page progress={current_progress}/{total_links} url={durl}")
-                        
-                except Exception as content_error:
-                    logger.info(f"[update-details] content_extraction_error progress={current_progress}/{total_links} url={durl} err={content_error}")
+class HostValidationError(Exception):
+    """The link's host could not be resolved or reached."""
 
-                # Increment processed count
-                processed_count += 1
-                
-                # Save temp files every 10 records
-                if processed_count % 10 == 0:
-                    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-                    
-                    # Save download temp file if we have download data
-                    if download_frames:
-                        dres = pd.concat(download_frames).reset_index(drop=True)
-                        temp_filename = f"temp_pboctodownload{org_name_index}_{temp_file_counter}_{timestamp}"
-                        savetempsub(dres, temp_filename, org_name_index)
-                        logger.info(f"[update-details] TEMP_SAVE progress={current_progress}/{total_links} org={orgname} downloads={len(dres)} file={temp_filename}")
-                    
-                    # Save table temp file if we have table data
-                    if table_frames:
-                        tres = pd.concat(table_frames).reset_index(drop=True)
-                        temp_filename = f"temp_pboctotable{org_name_index}_{temp_file_counter}_{timestamp}"
-                        savetempsub(tres, temp_filename, org_name_index)
-                        logger.info(f"[update-details] TEMP_SAVE progress={current_progress}/{total_links} org={orgname} content={len(tres)} file={temp_filename}")
-                    
-                    temp_file_counter += 1
-
-                # Pace to be gentle
-                time.sleep(random.randint(2, 5))
-            except TimeoutException as e:
-                logger.info(f"[update-details] page_timeout progress={current_progress}/{total_links} url={durl} err=Page load timeout after 45s")
-                continue
-            except WebDriverException as e:
-                logger.info(f"[update-details] page_error progress={current_progress}/{total_links} url={durl} err=WebDriver error: {e}")
-                continue
-            except Exception as e:
-                logger.info(f"[update-details] page_error progress={current_progress}/{total_links} url={durl} err={e}")
-                continue
-    finally:
-        browser.quit()
+
+def _is_dns_error(err: BaseException) -> bool:
+    error_msg = str(err).lower()
+    return any(keyword in error_msg for keyword in ['net::err_name_not_resolved', 'dns', 'name_not_resolved'])
+
+
+def start_or_resume_detail_job(orgname: str, links: List[str], selected: bool = False) -> str:
+    """Return the org's unfinished detail job (adding any new links), or create one.
+
+    With selected, the job covers exactly these links: only an unfinished job
+    for the same link set is resumed, so a run never picks up other queued
+    links of the org.
+    """
+    if selected:
+        selection = selection_key(links)
+        job_id = crawl_jobs.find_active(orgname, selection=selection)
+        if job_id:
+            logger.info(f"[update-details] RESUME job={job_id} org={orgname} selection={selection}")
+            return job_id
+        return crawl_jobs.create_job(orgname, links, meta={"selection": selection})
+    job_id = crawl_jobs.find_active(orgname)
+    if job_id:
+        added = crawl_jobs.add_links(job_id, links)
+        logger.info(f"[update-details] RESUME job={job_id} org={orgname} added_links={added}")
+        return job_id
+    return crawl_jobs.create_job(orgname, links)
+
+
+def _save_detail_results(job_id: str, orgname: str, org_name_index: str, log_tag: str):
+    """Write final pboctodownload/pboctotable files from every done link of the job.
+
+    Results come from the job's append-only record log (read once, newest
+    record per link), in job link order.
+    """
+    records = _detail_record_log(job_id, org_name_index).latest_by("link")
+    download_rows = []
+    table_rows_ = []
+    for _, durl, legacy in crawl_jobs.results(job_id):
+        # Jobs started before the record log kept results in the job store
+        result = records.get(durl) or legacy
+        if not result:
+            continue
+        download_rows.extend((download, durl) for download in result.get("downloads") or [])
+        if result.get("content"):
+            table_rows_.append((result["content"], durl))
 
     # Save final results under temp/<org>
     download_count = 0
@@ -1368,501 +1486,243 @@ def scrape_detail_pages(links, orgname: str):
     # Generate timestamp for final files
     timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
     
-    if download_frames:
-        dres = pd.concat(download_frames).reset_index(drop=True)
+    if download_rows:
+        dres = pd.DataFrame(download_rows, columns=["download", "link"])
         savetempsub(dres, f"pboctodownload{org_name_index}{timestamp}", org_name_index)
         download_count = len(dres)
-        logger.info(f"[update-details] FINAL_SAVE org={orgname} downloads={download_count} processed={total_links} ts={timestamp}")
-    if table_frames:
-        tres = pd.concat(table_frames).reset_index(drop=True)
+        logger.info(f"[{log_tag}] FINAL_SAVE org={orgname} job={job_id} downloads={download_count} ts={timestamp}")
+    if table_rows_:
+        tres = pd.DataFrame(table_rows_, columns=["content", "link"])
         # keep historical saves timestamped similar to legacy
         savetempsub(tres, f"pboctotable{org_name_index}{timestamp}", org_name_index)
         table_count = len(tres)
-        logger.info(f"[update-details] FINAL_SAVE org={orgname} content={table_count} processed={total_links} ts={timestamp}")
+        logger.info(f"[{log_tag}] FINAL_SAVE org={orgname} job={job_id} content={table_count} ts={timestamp}")
+    return download_count, table_count
 
-    logger.info(f"[update-details] PROCESSING_COMPLETE org={orgname} total_processed={total_links} downloads={download_count} content={table_count}")
-    return (download_count, table_count)
 
-async def scrape_detail_pages_with_progress(links, orgname: str, generate_progress_callback):
-    """Scrape detail pages with real-time progress updates via callback.
-    
-    Saves temporary files every 10 records for both pboctotable and pboctodownload.
-    Yields progress updates for each processed link.
+def run_archive_reparse(kind: str, org_names: Optional[List[str]] = None, since: Optional[float] = None) -> Dict[str, Any]:
+    """Re-run extraction over the archived pages and write the results like a crawl would.
 
-    Returns tuple (download_count, content_count).
+    detail: per org, pboctodownload/pboctotable files under temp/<org>, as
+    written at the end of a detail job. list: the rows of every archived list
+    page go through update_sumeventdf, so links missing from pbocsum are added.
     """
-    org_name_index = org2name.get(orgname)
-    if not org_name_index:
-        return (0, 0)
-    if not links:
-        return (0, 0)
-
-    browser = get_chrome_driver(TEMP_PATH)
-    download_frames = []
-    table_frames = []
-    
-    # Counters for temp file saving
-    processed_count = 0
-    temp_file_counter = 1
-    total_links = len(links)
-
-    try:
-        for idx, durl in enumerate(links):
-            current_progress = idx + 1
-            progress_percent = round((current_progress / total_links) * 100, 1)
-            
-            try:
-                # Send progress update
-                progress_message = f"正在处理第 {current_progress}/{total_links} 个链接 ({progress_percent}%)"
-                logger.info(f"[update-details-stream] PROGRESS {current_progress}/{total_links} ({progress_percent}%) org={orgname} fetching url={durl}")
-                
-                # Note: In a real streaming implementation, we would yield this progress
-                # For now, we'll log it and the frontend will simulate based on this
-                
-                browser.get(durl)
-                # Collect download anchors
-                dl_anchors = browser.find_elements(By.XPATH, "//td[@class='hei14jj']//a")
-                downurl = []
-                for a in dl_anchors:
-                    href = a.get_attribute("href")
-                    if href:
-                        downurl.append(href)
-                if downurl:
-                    logger.info(f"[update-details-stream] downloads_found progress={current_progress}/{total_links} url={durl} count={len(downurl)}")
-                    df_dl = pd.DataFrame({"download": downurl})
-                    df_dl["link"] = durl
-                    download_frames.append(df_dl)
-
-                # Extract raw text content from the page only if it has meaningful content beyond download links
-                has_meaningful_content = False
-                try:
-                    # Check if page has table/content structure beyond just download links
-                    if org_name_index == "zongbu":
-                        # For headquarters, extract from easysiteText element
-                        try:
-                            content_element = browser.find_element(By.XPATH, "//*[@id='easysiteText']")
-                            content_text = content_element.text.strip()
-                            if content_text and len(content_text) > 20:  # Meaningful content threshold
-                                has_meaningful_content = True
-                        except Exception:
-                            # Fallback to table check if easysiteText not found
-                            table_rows = browser.find_elements(By.XPATH, "//table/tbody/tr")
-                            if table_rows and len(table_rows) > 0:
-                                # Check if any row has meaningful text (not just download links)
-                                for row in table_rows[:3]:  # Check first few rows
-                                    row_text = row.text.strip()
-                                    if row_text and len(row_text) > 20:  # Meaningful content threshold
-                                        has_meaningful_content = True
-                                        break
-                    else:
-                        # For regional branches, check content in hei14jj class
-                        content_element = browser.find_element(By.XPATH, "//td[@class='hei14jj']")
-                        
-                        # Check if there are table rows or structured content
-                        table_rows = content_element.find_elements(By.XPATH, ".//tr")
-                        if table_rows and len(table_rows) > 1:  # More than just header
-                            has_meaningful_content = True
-                        else:
-                            # Check for other meaningful content (not just links)
-                            content_text = content_element.text.strip()
-                            # Remove download link text patterns to see if there's other content
-                            if content_text and len(content_text) > 50:  # Threshold for meaningful content
-                                # Check if it's not just a list of download links
-                                lines = content_text.split('\n')
-                                meaningful_lines = [line for line in lines if line.strip() and 
-                                                  not line.strip().startswith('http') and 
-                                                  '下载' not in line and '文件' not in line]
-                                if len(meaningful_lines) > 2:
-                                    has_meaningful_content = True
-                    
-                    # Only extract and save content if it has meaningful data
-                    if has_meaningful_content:
-                        if org_name_index == "zongbu":
-                            content_element = browser.find_element(By.XPATH, "//*[@id='easysiteText']")
-                        else:
-                            content_element = browser.find_element(By.XPATH, "//td[@class='hei14jj']")
-                        
-                        raw_content = content_element.text.strip()
-                        
-                        if raw_content:
-                            df_tbl = pd.DataFrame({
-                                "content": [raw_content],
-                                "link": [durl]
-                            })
-                            
-                            logger.info(
-                                f"[update-details-stream] content_found progress={current_progress}/{total_links} url={durl} length={len(raw_content)}"
-                            )
-                            table_frames.append(df_tbl)
-                    else:
-                        logger.info(f"[update-details-stream] download_only_page progress={current_progress}/{total_links} url={durl}")
-                        
-                except Exception as content_error:
-                    logger.info(f"[update-details-stream] content_extraction_error progress={current_progress}/{total_links} url={durl} err={content_error}")
+    name_of = {index: name for name, index in org2name.items()}
+    indexes = [org2name[name] for name in org_names] if org_names else None
+    downloads: Dict[str, List[Tuple[str, str]]] = {}
+    contents: Dict[str, List[Tuple[str, str]]] = {}
+    frames: Dict[str, List[pd.DataFrame]] = {}
+    pages = 0
+    errors = 0
+    for org_index, url, result, error in reparse(html_archive, kind, indexes, since, settings.REPARSE_WORKERS):
+        pages += 1
+        if error is not None:
+            errors += 1
+            logger.info(f"[archive-reparse] parse_error org={org_index} url={url} err={error}")
+            continue
+        if kind == LIST_PAGE:
+            if not result.empty:
+                frames.setdefault(org_index, []).append(result)
+            continue
+        page_downloads, content = result
+        downloads.setdefault(org_index, []).extend((d, url) for d in page_downloads)
+        if content:
+            contents.setdefault(org_index, []).append((content, url))
 
-                # Increment processed count
-                processed_count += 1
-                
-                # Save temp files every 10 records
-                if processed_count % 10 == 0:
-                    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-                    
-                    # Save download temp file if we have download data
-                    if download_frames:
-                        dres = pd.concat(download_frames).reset_index(drop=True)
-                        temp_filename = f"temp_pboctodownload{org_name_index}_{temp_file_counter}_{timestamp}"
-                        savetempsub(dres, temp_filename, org_name_index)
-                        logger.info(f"[update-details-stream] TEMP_SAVE progress={current_progress}/{total_links} org={orgname} downloads={len(dres)} file={temp_filename}")
-                    
-                    # Save table temp file if we have table data
-                    if table_frames:
-                        tres = pd.concat(table_frames).reset_index(drop=True)
-                        temp_filename = f"temp_pboctotable{org_name_index}_{temp_file_counter}_{timestamp}"
-                        savetempsub(tres, temp_filename, org_name_index)
-                        logger.info(f"[update-details-stream] TEMP_SAVE progress={current_progress}/{total_links} org={orgname} content={len(tres)} file={temp_filename}")
-                    
-                    temp_file_counter += 1
-
-                # Pace to be gentle
-                time.sleep(random.randint(2, 5))
-            except TimeoutException as e:
-                logger.info(f"[update-details-stream] page_timeout progress={current_progress}/{total_links} url={durl} err=Page load timeout after 45s")
-                continue
-            except WebDriverException as e:
-                logger.info(f"[update-details-stream] page_error progress={current_progress}/{total_links} url={durl} err=WebDriver error: {e}")
-                continue
-            except Exception as e:
-                logger.info(f"[update-details-stream] page_error progress={current_progress}/{total_links} url={durl} err={e}")
+    logger.info(f"[archive-reparse] PARSED kind={kind} pages={pages} errors={errors}")
+    summary: Dict[str, Any] = {"kind": kind, "pages": pages, "errors": errors, "orgs": {}}
+    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+    if kind == LIST_PAGE:
+        for org_index, org_frames in frames.items():
+            orgname = name_of.get(org_index)
+            if not orgname:
                 continue
-    finally:
-        browser.quit()
+            newdf = update_sumeventdf(_combine_list_frames(org_frames, orgname), orgname)
+            summary["orgs"][orgname] = {"newCases": len(newdf)}
+        return summary
+    for org_index in set(downloads) | set(contents):
+        if org_index not in name_of:
+            continue
+        if downloads.get(org_index):
+            dres = pd.DataFrame(downloads[org_index], columns=["download", "link"])
+            savetempsub(dres, f"pboctodownload{org_index}{timestamp}", org_index)
+        if contents.get(org_index):
+            tres = pd.DataFrame(contents[org_index], columns=["content", "link"])
+            savetempsub(tres, f"pboctotable{org_index}{timestamp}", org_index)
+        summary["orgs"][name_of[org_index]] = {
+            "downloads": len(downloads.get(org_index) or []),
+            "tables": len(contents.get(org_index) or []),
+        }
+    return summary
 
-    # Save final results under temp/<org>
-    download_count = 0
-    table_count = 0
-    # Generate timestamp for final files
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    
-    if download_frames:
-        dres = pd.concat(download_frames).reset_index(drop=True)
-        savetempsub(dres, f"pboctodownload{org_name_index}{timestamp}", org_name_index)
-        download_count = len(dres)
-        logger.info(f"[update-details-stream] FINAL_SAVE org={orgname} downloads={download_count} processed={total_links} ts={timestamp}")
-    if table_frames:
-        tres = pd.concat(table_frames).reset_index(drop=True)
-        # keep historical saves timestamped similar to legacy
-        savetempsub(tres, f"pboctotable{org_name_index}{timestamp}", org_name_index)
-        table_count = len(tres)
-        logger.info(f"[update-details-stream] FINAL_SAVE org={orgname} content={table_count} processed={total_links} ts={timestamp}")
 
-    logger.info(f"[update-details-stream] PROCESSING_COMPLETE org={orgname} total_processed={total_links} downloads={download_count} content={table_count}")
-    return (download_count, table_count)
+def _detail_record_log(job_id: str, org_name_index: str):
+    return job_record_log(os.path.join(TEMP_PATH, org_name_index), job_id)
 
-def scrape_detail_pages_with_progress_queue(links, orgname: str, progress_queue_id: str):
-    """Scrape detail pages with real-time progress updates via queue.
-    
-    Saves temporary files every 10 records for both pboctotable and pboctodownload.
-    Sends progress updates for each processed link via queue.
 
-    Returns tuple (download_count, content_count).
+def run_detail_job(
+    job_id: str,
+    orgname: str,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    validate_hosts: bool = False,
+    log_tag: str = "update-details",
+    cancel: Optional[threading.Event] = None,
+):
+    """Scrape the queued links of a persistent crawl job, then write its final files.
+
+    Links are leased from the job store in batches and scraped concurrently
+    (SCRAPE_CONCURRENCY browsers, per-host token buckets). Each outcome is
+    recorded immediately, so an interrupted run resumes from the remaining
+    links; failures are retried up to CRAWL_JOB_MAX_ATTEMPTS (DNS failures are
+    not retried). Page results are appended to the job's JSONL record log as
+    they complete; final files are written once from that log and cover every
+    done link of the job, including those scraped before a restart.
+
+    on_progress(finished, total) is called after each link. Setting cancel
+    stops the run after the pages already loading: unscraped links go back to
+    the queue and the job stays resumable. Returns tuple
+    (download_count, content_count), (0, 0) when cancelled.
     """
     org_name_index = org2name.get(orgname)
     if not org_name_index:
         return (0, 0)
-    if not links:
-        return (0, 0)
 
-    # Get the progress queue
-    progress_queue = progress_queues.get(progress_queue_id)
-    if not progress_queue:
+    crawl_jobs.recover_stale(job_id)
+    owner = new_owner()
+    job = crawl_jobs.get_job(job_id)
+    if job is None:
         return (0, 0)
-
-    browser = get_chrome_driver(TEMP_PATH)
-    download_frames = []
-    table_frames = []
-    
-    # Counters for temp file saving
-    processed_count = 0
-    temp_file_counter = 1
-    total_links = len(links)
-
-    try:
-        for idx, durl in enumerate(links):
-            current_progress = idx + 1
-            progress_percent = round((current_progress / total_links) * 100, 1)
-            
-            # Send real progress update via queue BEFORE processing
-            try:
-                progress_queue.put({
-                    'type': 'progress',
-                    'current_link': current_progress,
-                    'total_links': total_links,
-                    'progress_percent': progress_percent,
-                    'message': f'正在处理第 {current_progress}/{total_links} 个链接 ({progress_percent}%)'
-                }, block=False)
-            except:
-                pass  # Queue might be full or closed
-            
-            try:
-                logger.info(f"[update-details-queue] PROGRESS {current_progress}/{total_links} ({progress_percent}%) org={orgname} fetching url={durl}")
-                
-                # Validate URL hostname before attempting to access
-                if not validate_url_hostname(durl):
-                    logger.error(f"[update-details-queue] HOSTNAME_VALIDATION_FAILED org={orgname} url={durl} progress={current_progress}/{total_links} error=Cannot resolve hostname")
+    total_links = job["total"]
+    finished_count = job["links"][DONE] + job["links"][FAILED]
+    logger.info(f"[{log_tag}] JOB_START job={job_id} org={orgname} total={total_links} already_finished={finished_count}")
+
+    def scrape_one(browser, durl):
+        # Skip hosts whose circuit breaker is open; validate the rest if asked
+        if not host_health.allow(durl):
+            raise HostValidationError("Host circuit breaker open")
+        if validate_hosts and not validate_url_hostname(durl):
+            # The page is not loaded, so no outcome will free a half-open trial
+            host_health.release(durl)
+            raise HostValidationError("Cannot resolve hostname")
+        return _extract_detail_page(browser, host_health.preferred_url(durl), org_name_index)
+
+    with _detail_record_log(job_id, org_name_index) as record_log:
+        while True:
+            claimed = crawl_jobs.claim(job_id, owner, settings.CRAWL_JOB_CLAIM_BATCH, settings.CRAWL_JOB_LEASE_SECONDS)
+            if not claimed:
+                break
+            urls = [url for _, url in claimed]
+            outcomes = iter_scrape(urls, scrape_one, driver_pool, host_limiter, settings.SCRAPE_CONCURRENCY, cancel)
+            for _, durl, result, err in outcomes:
+                if isinstance(err, ScrapeCancelled):
                     continue
-                
-                # Retry mechanism for network-related errors
-                max_retries = 3
-                retry_count = 0
-                page_loaded = False
-                
-                while retry_count < max_retries and not page_loaded:
-                    try:
-                        if retry_count > 0:
-                            logger.info(f"[update-details-queue] RETRY_ATTEMPT org={orgname} url={durl} progress={current_progress}/{total_links} attempt={retry_count + 1}/{max_retries}")
-                            # Progressive delay: 2s, 5s, 10s
-                            delay = 2 ** retry_count + random.uniform(0, 2)
-                            time.sleep(delay)
-                            
-                            # Recreate browser if this is a retry due to connection issues
-                            try:
-                                browser.quit()
-                            except:
-                                pass
-                            browser = get_chrome_driver(TEMP_PATH)
-                        
-                        browser.get(durl)
-                        logger.info(f"[update-details-queue] PAGE_LOADED org={orgname} url={durl} progress={current_progress}/{total_links}")
-                        page_loaded = True
-                        
-                    except WebDriverException as web_error:
-                        error_msg = str(web_error).lower()
-                        retry_count += 1
-                        
-                        # Check for specific DNS resolution errors that should be skipped
-                        is_dns_error = any(keyword in error_msg for keyword in [
-                            'net::err_name_not_resolved', 'dns', 'name_not_resolved'
-                        ])
-                        
-                        if is_dns_error:
-                            logger.error(f"[update-details-queue] DNS_ERROR_SKIP org={orgname} url={durl} progress={current_progress}/{total_links} error_type={type(web_error).__name__} error_msg={str(web_error)}")
-                            break  # Skip this URL entirely
-                        
-                        # Check if this is a network-related error that should be retried
-                        is_network_error = any(keyword in error_msg for keyword in [
-                            'could not reach host', 'timeout', 'connection', 
-                            'network', 'unreachable'
-                        ])
-                        
-                        if is_network_error and retry_count < max_retries:
-                            logger.warning(f"[update-details-queue] NETWORK_ERROR_RETRY org={orgname} url={durl} progress={current_progress}/{total_links} attempt={retry_count}/{max_retries} error_type={type(web_error).__name__} error_msg={str(web_error)}")
-                            continue
-                        else:
-                            logger.error(f"[update-details-queue] WEBDRIVER_ERROR org={orgname} url={durl} progress={current_progress}/{total_links} error_type={type(web_error).__name__} error_msg={str(web_error)}")
-                            raise
-                            
-                    except Exception as page_error:
-                        error_msg = str(page_error).lower()
-                        retry_count += 1
-                        
-                        # Check for specific DNS resolution errors that should be skipped
-                        is_dns_error = any(keyword in error_msg for keyword in [
-                            'net::err_name_not_resolved', 'dns', 'name_not_resolved'
-                        ])
-                        
-                        if is_dns_error:
-                            logger.error(f"[update-details-queue] DNS_ERROR_SKIP org={orgname} url={durl} progress={current_progress}/{total_links} error_type={type(page_error).__name__} error_msg={str(page_error)}")
-                            break  # Skip this URL entirely
-                        
-                        # Check if this is a network-related error that should be retried
-                        is_network_error = any(keyword in error_msg for keyword in [
-                            'could not reach host', 'timeout', 'connection', 
-                            'network', 'unreachable'
-                        ])
-                        
-                        if is_network_error and retry_count < max_retries:
-                            logger.warning(f"[update-details-queue] GENERAL_ERROR_RETRY org={orgname} url={durl} progress={current_progress}/{total_links} attempt={retry_count}/{max_retries} error_type={type(page_error).__name__} error_msg={str(page_error)}")
-                            continue
-                        else:
-                            logger.error(f"[update-details-queue] PAGE_LOAD_ERROR org={orgname} url={durl} progress={current_progress}/{total_links} error_type={type(page_error).__name__} error_msg={str(page_error)}")
-                            raise
-                
-                # Send progress update after loading page
-                try:
-                    progress_queue.put({
-                        'type': 'progress',
-                        'current_link': current_progress,
-                        'total_links': total_links,
-                        'progress_percent': progress_percent,
-                        'message': f'已获取第 {current_progress}/{total_links} 个页面 ({progress_percent}%)'
-                    }, block=False)
-                except:
-                    pass
-                
-                # Collect download anchors
-                dl_anchors = browser.find_elements(By.XPATH, "//td[@class='hei14jj']//a")
-                downurl = []
-                for a in dl_anchors:
-                    href = a.get_attribute("href")
-                    if href:
-                        downurl.append(href)
-                if downurl:
-                    logger.info(f"[update-details-queue] downloads_found progress={current_progress}/{total_links} url={durl} count={len(downurl)}")
-                    df_dl = pd.DataFrame({"download": downurl})
-                    df_dl["link"] = durl
-                    download_frames.append(df_dl)
-
-                # Extract raw text content from the page only if it has meaningful content beyond download links
-                has_meaningful_content = False
-                try:
-                    # Check if page has table/content structure beyond just download links
-                    if org_name_index == "zongbu":
-                        # For headquarters, extract from easysiteText element
-                        try:
-                            content_element = browser.find_element(By.XPATH, "//*[@id='easysiteText']")
-                            content_text = content_element.text.strip()
-                            if content_text and len(content_text) > 20:  # Meaningful content threshold
-                                has_meaningful_content = True
-                        except Exception:
-                            # Fallback to table check if easysiteText not found
-                            table_rows = browser.find_elements(By.XPATH, "//table/tbody/tr")
-                            if table_rows and len(table_rows) > 0:
-                                # Check if any row has meaningful text (not just download links)
-                                for row in table_rows[:3]:  # Check first few rows
-                                    row_text = row.text.strip()
-                                    if row_text and len(row_text) > 20:  # Meaningful content threshold
-                                        has_meaningful_content = True
-                                        break
+                if err is not None:
+                    if not isinstance(err, HostValidationError):
+                        host_health.record_failure(durl, f"{type(err).__name__}: {err}")
+                    retryable = not isinstance(err, HostValidationError) and not _is_dns_error(err)
+                    state = crawl_jobs.fail(
+                        job_id, durl, f"{type(err).__name__}: {err}", settings.CRAWL_JOB_MAX_ATTEMPTS, retryable
+                    )
+                    if state == FAILED:
+                        finished_count += 1
+                    if isinstance(err, TimeoutException):
+                        logger.info(f"[{log_tag}] page_timeout progress={finished_count}/{total_links} url={durl} state={state} err=Page load timeout")
                     else:
-                        # For regional branches, check content in hei14jj class
-                        content_element = browser.find_element(By.XPATH, "//td[@class='hei14jj']")
-                        
-                        # Check if there are table rows or structured content
-                        table_rows = content_element.find_elements(By.XPATH, ".//tr")
-                        if table_rows and len(table_rows) > 1:  # More than just header
-                            has_meaningful_content = True
-                        else:
-                            # Check for other meaningful content (not just links)
-                            content_text = content_element.text.strip()
-                            # Remove download link text patterns to see if there's other content
-                            if content_text and len(content_text) > 50:  # Threshold for meaningful content
-                                # Check if it's not just a list of download links
-                                lines = content_text.split('\n')
-                                meaningful_lines = [line for line in lines if line.strip() and 
-                                                  not line.strip().startswith('http') and 
-                                                  '下载' not in line and '文件' not in line]
-                                if len(meaningful_lines) > 2:
-                                    has_meaningful_content = True
-                    
-                    # Only extract and save content if it has meaningful data
-                    if has_meaningful_content:
-                        if org_name_index == "zongbu":
-                            content_element = browser.find_element(By.XPATH, "//*[@id='easysiteText']")
-                        else:
-                            content_element = browser.find_element(By.XPATH, "//td[@class='hei14jj']")
-                        
-                        raw_content = content_element.text.strip()
-                        
-                        if raw_content:
-                            df_tbl = pd.DataFrame({
-                                "content": [raw_content],
-                                "link": [durl]
-                            })
-                            
-                            logger.info(
-                                f"[update-details-queue] content_found progress={current_progress}/{total_links} url={durl} length={len(raw_content)}"
-                            )
-                            table_frames.append(df_tbl)
+                        logger.info(f"[{log_tag}] page_error progress={finished_count}/{total_links} url={durl} state={state} error_type={type(err).__name__} err={err}")
+                else:
+                    downurl, raw_content = result
+                    host_health.record_success(durl)
+                    # Record first: a link marked done always has its result in the log
+                    record_log.append({"link": durl, "downloads": downurl, "content": raw_content})
+                    crawl_jobs.complete(job_id, durl, None)
+                    finished_count += 1
+                    progress_percent = round((finished_count / total_links) * 100, 1)
+                    logger.info(f"[{log_tag}] PROGRESS {finished_count}/{total_links} ({progress_percent}%) org={orgname} fetched url={durl}")
+                    if downurl:
+                        logger.info(f"[{log_tag}] downloads_found progress={finished_count}/{total_links} url={durl} count={len(downurl)}")
+                    if raw_content:
+                        logger.info(f"[{log_tag}] content_found progress={finished_count}/{total_links} url={durl} length={len(raw_content)}")
                     else:
-                        logger.info(f"[update-details-queue] download_only_page progress={current_progress}/{total_links} url={durl}")
-                        
-                except Exception as content_error:
-                    logger.info(f"[update-details-queue] content_extraction_error progress={current_progress}/{total_links} url={durl} err={content_error}")
+                        logger.info(f"[{log_tag}] download_only_page progress={finished_count}/{total_links} url={durl}")
 
-                # Increment processed count
-                processed_count += 1
-                
-                # Save temp files every 10 records
-                if processed_count % 10 == 0:
-                    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-                    
-                    # Save download temp file if we have download data
-                    if download_frames:
-                        dres = pd.concat(download_frames).reset_index(drop=True)
-                        temp_filename = f"temp_pboctodownload{org_name_index}_{temp_file_counter}_{timestamp}"
-                        savetempsub(dres, temp_filename, org_name_index)
-                        logger.info(f"[update-details-queue] TEMP_SAVE progress={current_progress}/{total_links} org={orgname} downloads={len(dres)} file={temp_filename}")
-                    
-                    # Save table temp file if we have table data
-                    if table_frames:
-                        tres = pd.concat(table_frames).reset_index(drop=True)
-                        temp_filename = f"temp_pboctotable{org_name_index}_{temp_file_counter}_{timestamp}"
-                        savetempsub(tres, temp_filename, org_name_index)
-                        logger.info(f"[update-details-queue] TEMP_SAVE progress={current_progress}/{total_links} org={orgname} content={len(tres)} file={temp_filename}")
-                    
-                    temp_file_counter += 1
-
-                # Pace to be gentle
-                time.sleep(random.randint(2, 5))
-            except TimeoutException as e:
-                logger.error(f"[update-details-queue] TIMEOUT_ERROR org={orgname} url={durl} progress={current_progress}/{total_links} error_msg=Page load timeout after 45s")
-                continue
-            except WebDriverException as e:
-                logger.error(f"[update-details-queue] WEBDRIVER_ERROR org={orgname} url={durl} progress={current_progress}/{total_links} error_type={type(e).__name__} error_msg={str(e)}")
-                continue
-            except Exception as e:
-                logger.error(f"[update-details-queue] GENERAL_ERROR org={orgname} url={durl} progress={current_progress}/{total_links} error_type={type(e).__name__} error_msg={str(e)}")
-                continue
-    finally:
-        browser.quit()
+                if on_progress is not None:
+                    on_progress(finished_count, total_links)
+            if cancel is not None and cancel.is_set():
+                break
 
-    # Save final results under temp/<org>
-    download_count = 0
-    table_count = 0
-    # Generate timestamp for final files
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    
-    if download_frames:
-        dres = pd.concat(download_frames).reset_index(drop=True)
-        savetempsub(dres, f"pboctodownload{org_name_index}{timestamp}", org_name_index)
-        download_count = len(dres)
-        logger.info(f"[update-details-queue] FINAL_SAVE org={orgname} downloads={download_count} processed={total_links} ts={timestamp}")
-    if table_frames:
-        tres = pd.concat(table_frames).reset_index(drop=True)
-        # keep historical saves timestamped similar to legacy
-        savetempsub(tres, f"pboctotable{org_name_index}{timestamp}", org_name_index)
-        table_count = len(tres)
-        logger.info(f"[update-details-queue] FINAL_SAVE org={orgname} content={table_count} processed={total_links} ts={timestamp}")
+    if cancel is not None and cancel.is_set():
+        released = crawl_jobs.release(job_id, owner)
+        logger.info(f"[{log_tag}] JOB_CANCELLED job={job_id} org={orgname} finished={finished_count}/{total_links} requeued={released}")
+        return (0, 0)
 
-    logger.info(f"[update-details-queue] PROCESSING_COMPLETE org={orgname} total_processed={total_links} downloads={download_count} content={table_count}")
-    
-    # Send completion signal via queue
+    # Another runner may still hold leases on this job; it will finalize
+    if crawl_jobs.remaining(job_id) > 0 or not crawl_jobs.set_status(job_id, JOB_FINALIZING, expected=JOB_RUNNING):
+        logger.info(f"[{log_tag}] JOB_DEFERRED job={job_id} org={orgname} remaining={crawl_jobs.remaining(job_id)}")
+        return (0, 0)
     try:
-        progress_queue.put({
-            'type': 'completed',
-            'download_count': download_count,
-            'table_count': table_count,
-            'total_links': total_links,
-            'progress_percent': 100
-        }, block=False)
-    except:
-        pass
-    
+        download_count, table_count = _save_detail_results(job_id, orgname, org_name_index, log_tag)
+    except Exception:
+        crawl_jobs.set_status(job_id, JOB_RUNNING)
+        raise
+    crawl_jobs.set_status(job_id, JOB_DONE)
+    # The final files now hold every record
+    record_log.remove()
+
+    logger.info(f"[{log_tag}] PROCESSING_COMPLETE org={orgname} job={job_id} total_processed={total_links} downloads={download_count} content={table_count}")
     return (download_count, table_count)
 
-def update_sumeventdf(currentsum: pd.DataFrame, orgname: str):
-    org_name_index = org2name.get(orgname)
-    beginwith = f"pbocsum"
-    oldsum_df = get_csvdf_for_pending(PBOC_DATA_PATH, beginwith)
-    oldsum = oldsum_df[oldsum_df["区域"] == orgname]
 
-    if oldsum.empty:
-        oldidls = []
-    else:
-        oldidls = oldsum["link"].tolist()
+def execute_detail_job(
+    job_id: str,
+    orgname: str,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    validate_hosts: bool = False,
+    log_tag: str = "update-details",
+    cancel: Optional[threading.Event] = None,
+):
+    """run_detail_job, in the scrape worker process when SCRAPE_WORKER_PROCESS is on.
+
+    Blocks until the job is finished either way; on_progress and cancel are
+    relayed to the worker. Raises if the worker failed or died (the job stays
+    resumable).
+    """
+    if not settings.SCRAPE_WORKER_PROCESS:
+        return run_detail_job(
+            job_id, orgname, on_progress=on_progress, validate_hosts=validate_hosts, log_tag=log_tag, cancel=cancel
+        )
+    return scrape_worker.run(
+        on_progress=on_progress, cancel=cancel, job_id=job_id, orgname=orgname, validate_hosts=validate_hosts, log_tag=log_tag
+    )
+
+
+def scrape_detail_pages(links, orgname: str, selected: bool = False):
+    """Scrape detail pages for download links and raw text content; save to temp subfolder.
     
-    currentidls = currentsum["link"].tolist()
-    newidls = [x for x in currentidls if x not in oldidls]
+    Runs as a persistent crawl job: an unfinished job for the org is resumed
+    (with any new links appended) instead of starting over. With selected,
+    only a job for exactly these links is resumed (start_or_resume_detail_job).
+
+    Returns tuple (download_count, content_count).
+    """
+    if not org2name.get(orgname):
+        return (0, 0)
+    if not links:
+        return (0, 0)
+    job_id = start_or_resume_detail_job(orgname, links, selected)
+    return execute_detail_job(job_id, orgname)
+
+def start_detail_run(job_id: str, orgname: str, cancel_on_detach: bool = False, validate_hosts: bool = False, log_tag: str = "update-details"):
+    """Run a crawl job in the background (or return its active run) for streaming and re-attaching clients."""
+    def target(run):
+        return execute_detail_job(
+            job_id, orgname, on_progress=run.progress, validate_hosts=validate_hosts, log_tag=log_tag, cancel=run.cancel
+        )
+
+    return job_runs.start(job_id, orgname, target, cancel_on_detach=cancel_on_detach)
+
+def update_sumeventdf(currentsum: pd.DataFrame, orgname: str):
+    org_name_index = org2name.get(orgname)
+    newidls = seen_index.unseen(SUM_LINK, currentsum["link"].tolist(), region=orgname)
     # Ensure a proper copy when subsetting to avoid SettingWithCopyWarning
     newdf = currentsum.loc[currentsum["link"].isin(newidls)].copy()
 
@@ -1875,33 +1735,68 @@ def update_sumeventdf(currentsum: pd.DataFrame, orgname: str):
         savedf(newdf, savename)
     return newdf
 
-@router.post("/update-list")
-async def update_list(request: UpdateListRequest):
-    org_name = request.orgName
-    start_page = request.startPage
-    end_page = request.endPage
+def run_list_update(
+    org_name: str,
+    mode: str = "range",
+    start_page: int = 1,
+    end_page: int = 1,
+    max_pages: int = 50,
+    use_cache: bool = True,
+):
+    """Scrape an org's list pages and save the new cases. Blocking: call from a worker thread.
 
+    Returns {"newCases", "unchangedPages", "pagesFetched"}.
+    """
     started_at = time.time()
-    logger.info(f"[update-list] org={org_name} pages={start_page}-{end_page} started")
+    logger.info(f"[update-list] org={org_name} mode={mode} pages={start_page}-{end_page} started")
 
-    sumeventdf = get_sumeventdf(org_name, start_page, end_page)
+    cache_batch = list_page_cache.batch() if use_cache else None
+    if mode == "range":
+        sumeventdf, pages_fetched = _crawl_sumeventdf_range(org_name, start_page, end_page, cache_batch)
+    else:
+        sumeventdf, pages_fetched = crawl_sumeventdf_until_known(
+            org_name,
+            max(1, max_pages),
+            cache_batch,
+            mode == "backfill",
+        )
+    unchanged_pages = cache_batch.unchanged if cache_batch is not None else 0
     scraped_rows = 0 if sumeventdf is None or sumeventdf.empty else len(sumeventdf)
     scraped_links = 0 if sumeventdf is None or sumeventdf.empty else sumeventdf.get("link", pd.Series()).nunique()
 
     if sumeventdf.empty:
         elapsed_ms = int((time.time() - started_at) * 1000)
         logger.info(
-            f"[update-list] org={org_name} pages={start_page}-{end_page} scraped_rows={scraped_rows} scraped_links={scraped_links} new_cases=0 elapsed_ms={elapsed_ms}"
+            f"[update-list] org={org_name} pages={start_page}-{end_page} scraped_rows={scraped_rows} scraped_links={scraped_links} unchanged_pages={unchanged_pages} new_cases=0 elapsed_ms={elapsed_ms}"
         )
-        return {"newCases": 0}
+        if cache_batch is not None:
+            cache_batch.commit()
+        return {"newCases": 0, "unchangedPages": unchanged_pages, "pagesFetched": pages_fetched}
 
     newsum = update_sumeventdf(sumeventdf, org_name)
+    # Only remember page validators once the rows they cover are saved
+    if cache_batch is not None:
+        cache_batch.commit()
     new_cases = 0 if newsum is None or newsum.empty else len(newsum)
     elapsed_ms = int((time.time() - started_at) * 1000)
     logger.info(
-        f"[update-list] org={org_name} pages={start_page}-{end_page} scraped_rows={scraped_rows} scraped_links={scraped_links} new_cases={new_cases} elapsed_ms={elapsed_ms}"
+        f"[update-list] org={org_name} pages={start_page}-{end_page} scraped_rows={scraped_rows} scraped_links={scraped_links} unchanged_pages={unchanged_pages} new_cases={new_cases} elapsed_ms={elapsed_ms}"
+    )
+    return {"newCases": new_cases, "unchangedPages": unchanged_pages, "pagesFetched": pages_fetched}
+
+@router.post("/update-list")
+async def update_list(request: UpdateListRequest):
+    if request.mode not in LIST_UPDATE_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode, expected one of {LIST_UPDATE_MODES}")
+    return await run_in_threadpool(
+        run_list_update,
+        request.orgName,
+        request.mode,
+        request.startPage,
+        request.endPage,
+        request.maxPages,
+        request.useCache,
     )
-    return {"newCases": new_cases}
 
 @router.get("/pending-details/{org_name}")
 async def get_pending_details(org_name: str):
@@ -1938,7 +1833,8 @@ async def update_details_selective(request: UpdateDetailsWithLinksRequest):
     
     # Use selected links if provided, otherwise use all pending
     if request.selectedLinks:
-        links_to_update = [link for link in request.selectedLinks if link in all_pending_links]
+        pending_set = set(all_pending_links)
+        links_to_update = [link for link in request.selectedLinks if link in pending_set]
     else:
         links_to_update = all_pending_links
     
@@ -1952,25 +1848,82 @@ async def update_details_selective(request: UpdateDetailsWithLinksRequest):
         )
         return {"updatedCases": 0}
     
-    dl_count, tbl_count = scrape_detail_pages(links_to_update, org_name)
+    selected = bool(request.selectedLinks)
+    job_id = await run_in_threadpool(start_or_resume_detail_job, org_name, links_to_update, selected)
+    dl_count, tbl_count = await run_in_threadpool(execute_detail_job, job_id, org_name)
+    job = await run_in_threadpool(crawl_jobs.get_job, job_id)
+    # Counts of the job that actually ran (an org-wide job may hold more links than were pending)
+    updated_cases = job["links"][DONE] if job else 0
+    failed_cases = job["links"][FAILED] if job else 0
     elapsed_ms = int((time.time() - started_at) * 1000)
     logger.info(
-        f"[update-details-selective] COMPLETED org={org_name} updated_cases={link_count} downloads={dl_count} tables={tbl_count} elapsed_ms={elapsed_ms}"
+        f"[update-details-selective] COMPLETED org={org_name} job={job_id} updated_cases={updated_cases} failed={failed_cases} downloads={dl_count} tables={tbl_count} elapsed_ms={elapsed_ms}"
     )
-    return {"updatedCases": link_count, "downloads": dl_count, "tables": tbl_count}
+    return {"updatedCases": updated_cases, "failedCases": failed_cases, "downloads": dl_count, "tables": tbl_count, "jobId": job_id}
 
 from fastapi.responses import StreamingResponse
 import json
 import asyncio
 import threading
-from queue import Queue
 
-# Global progress tracking
-progress_queues = {}
+def _sse(payload: Dict[str, Any]) -> str:
+    return f"data: {json.dumps(payload)}\n\n"
+
+async def _stream_detail_run(run, total_links: int):
+    """SSE events of a crawl job run; closing the stream detaches from the run (it is not stopped)."""
+    org_name = run.org
+    subscription = run.subscribe()
+    processed_links = 0
+    try:
+        while True:
+            progress_update = await subscription.get(timeout=settings.PROGRESS_HEARTBEAT_SECONDS)
+            if progress_update is None:
+                # Heartbeat with current progress to keep the connection alive
+                if processed_links > 0:
+                    progress_percent = round((processed_links / total_links) * 100, 1)
+                    yield _sse({'type': 'progress', 'orgName': org_name, 'jobId': run.job_id, 'currentLink': processed_links, 'totalLinks': total_links, 'progress': progress_percent, 'message': f'继续处理中... ({progress_percent}%)'})
+                else:
+                    yield ": keep-alive\n\n"
+                continue
+
+            if progress_update['type'] == 'progress':
+                processed_links = progress_update['current_link']
+                total_links = progress_update['total_links'] or total_links
+                progress_percent = progress_update['progress_percent']
+                yield _sse({'type': 'progress', 'orgName': org_name, 'jobId': run.job_id, 'currentLink': processed_links, 'totalLinks': total_links, 'progress': progress_percent, 'message': progress_update['message']})
+
+            elif progress_update['type'] == 'completed':
+                completion_message = f'详情更新完成！处理了 {total_links} 条案例，获取了 {progress_update["download_count"]} 个下载链接，提取了 {progress_update["table_count"]} 个内容'
+                yield _sse({'type': 'complete', 'orgName': org_name, 'jobId': run.job_id, 'updatedCases': total_links, 'downloads': progress_update['download_count'], 'tables': progress_update['table_count'], 'message': completion_message})
+                return
+
+            elif progress_update['type'] == 'cancelled':
+                yield _sse({'type': 'cancelled', 'orgName': org_name, 'jobId': run.job_id, 'currentLink': progress_update['current_link'], 'totalLinks': total_links, 'message': '更新已取消，可稍后继续'})
+                return
+
+            elif progress_update['type'] == 'error':
+                yield _sse({'type': 'error', 'orgName': org_name, 'jobId': run.job_id, 'error': progress_update['error'], 'message': '更新过程中出现错误'})
+                return
+    except Exception as error:
+        logger.error(f"[update-details-selective-stream] ERROR org={org_name} job={run.job_id} error={error}")
+        yield _sse({'type': 'error', 'orgName': org_name, 'jobId': run.job_id, 'error': str(error), 'message': '更新过程中出现错误'})
+    finally:
+        # Runs on client disconnect too: the run is cancelled if nobody re-attaches within the grace period
+        run.unsubscribe(subscription)
+
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+}
 
 @router.post("/update-details-selective-stream")
 async def update_details_selective_stream(request: UpdateDetailsWithLinksRequest):
-    """Update details for selected links with real-time progress streaming."""
+    """Update details for selected links with real-time progress streaming.
+
+    The first event carries the crawl job id; a client that lost the stream
+    can re-attach with GET /jobs/{job_id}/stream. If no client is attached for
+    SCRAPE_DETACH_GRACE_SECONDS the run is cancelled (the job stays resumable).
+    """
     org_name = request.orgName
     if not org2name.get(org_name):
         raise HTTPException(status_code=400, detail="Invalid organization name")
@@ -1980,106 +1933,43 @@ async def update_details_selective_stream(request: UpdateDetailsWithLinksRequest
     
     # Use selected links if provided, otherwise use all pending
     if request.selectedLinks:
-        links_to_update = [link for link in request.selectedLinks if link in all_pending_links]
+        pending_set = set(all_pending_links)
+        links_to_update = [link for link in request.selectedLinks if link in pending_set]
     else:
         links_to_update = all_pending_links
     
     total_links = len(links_to_update)
-    
-    # Create a unique progress queue for this request
-    progress_queue_id = f"{org_name}_{int(time.time())}"
-    progress_queue = Queue()
-    progress_queues[progress_queue_id] = progress_queue
-    
+    run = None
+    if links_to_update:
+        job_id = await run_in_threadpool(start_or_resume_detail_job, org_name, links_to_update, bool(request.selectedLinks))
+        job = await run_in_threadpool(crawl_jobs.get_job, job_id)
+        total_links = job["total"] if job else total_links
+        run = start_detail_run(job_id, org_name, cancel_on_detach=True, validate_hosts=True, log_tag="update-details-queue")
+
     async def generate_progress():
-        try:
-            # Send start event
-            yield f"data: {json.dumps({'type': 'start', 'orgName': org_name, 'totalLinks': total_links, 'message': f'开始更新案例详情... (共 {total_links} 个链接)'})}\n\n"
-            
-            if not links_to_update:
-                yield f"data: {json.dumps({'type': 'complete', 'orgName': org_name, 'updatedCases': 0, 'downloads': 0, 'tables': 0, 'message': '没有待更新的链接'})}\n\n"
-                return
-            
-            # This will hold the final results
-            results = {'dl_count': 0, 'tbl_count': 0, 'completed': False, 'error': None}
-            
-            def run_scraping():
-                try:
-                    dl_count, tbl_count = scrape_detail_pages_with_progress_queue(links_to_update, org_name, progress_queue_id)
-                    results['dl_count'] = dl_count
-                    results['tbl_count'] = tbl_count
-                    results['completed'] = True
-                except Exception as e:
-                    logger.error(f"[run_scraping] ERROR org={org_name} error_type={type(e).__name__} error_message={str(e)}")
-                    results['error'] = str(e)
-                    results['completed'] = True
-                    # Send error to queue
-                    progress_queue.put({'type': 'error', 'error': str(e)})
-            
-            # Start scraping in background thread
-            thread = threading.Thread(target=run_scraping)
-            thread.start()
-            
-            # Process real progress updates from the queue
-            processed_links = 0
-            while not results['completed']:
-                try:
-                    # Check for progress updates with timeout
-                    progress_update = progress_queue.get(timeout=2.0)
-                    
-                    if progress_update['type'] == 'progress':
-                        current_link = progress_update['current_link']
-                        progress_percent = progress_update['progress_percent']
-                        message = progress_update.get('message', f'正在处理第 {current_link}/{total_links} 个链接 ({progress_percent}%)')
-                        
-                        yield f"data: {json.dumps({'type': 'progress', 'orgName': org_name, 'currentLink': current_link, 'totalLinks': total_links, 'progress': progress_percent, 'message': message})}\n\n"
-                        processed_links = current_link
-                    
-                    elif progress_update['type'] == 'completed':
-                        # Update results with completion data
-                        results['dl_count'] = progress_update.get('download_count', 0)
-                        results['tbl_count'] = progress_update.get('table_count', 0)
-                        results['completed'] = True
-                        # Don't break here, let the main loop handle completion
-                    
-                    elif progress_update['type'] == 'error':
-                        yield f"data: {json.dumps({'type': 'error', 'orgName': org_name, 'error': progress_update['error'], 'message': '更新过程中出现错误'})}\n\n"
-                        break
-                        
-                except:
-                    # Timeout - check if thread is still alive and send heartbeat
-                    if thread.is_alive():
-                        # Send heartbeat with current progress to keep connection alive
-                        if processed_links > 0:
-                            progress_percent = round((processed_links / total_links) * 100, 1)
-                            yield f"data: {json.dumps({'type': 'progress', 'orgName': org_name, 'currentLink': processed_links, 'totalLinks': total_links, 'progress': progress_percent, 'message': f'继续处理中... ({progress_percent}%)'})}\n\n"
-                        await asyncio.sleep(0.5)
-                    else:
-                        # Thread finished but we didn't get completion - break and check results
-                        break
-            
-            # Wait for completion
-            thread.join(timeout=60)  # 60 second timeout
-            
-            if results['error']:
-                yield f"data: {json.dumps({'type': 'error', 'orgName': org_name, 'error': results['error'], 'message': '更新过程中出现错误'})}\n\n"
-            else:
-                # Send completion event
-                completion_message = f'详情更新完成！处理了 {total_links} 条案例，获取了 {results["dl_count"]} 个下载链接，提取了 {results["tbl_count"]} 个内容'
-                yield f"data: {json.dumps({'type': 'complete', 'orgName': org_name, 'updatedCases': total_links, 'downloads': results['dl_count'], 'tables': results['tbl_count'], 'message': completion_message})}\n\n"
-            
-        except Exception as error:
-            logger.error(f"[update-details-selective-stream] ERROR org={org_name} error={error}")
-            yield f"data: {json.dumps({'type': 'error', 'orgName': org_name, 'error': str(error), 'message': '更新过程中出现错误'})}\n\n"
-        finally:
-            # Clean up progress queue
-            if progress_queue_id in progress_queues:
-                del progress_queues[progress_queue_id]
-    
-    return StreamingResponse(generate_progress(), media_type="text/event-stream", headers={
-        "Cache-Control": "no-cache",
-        "Connection": "keep-alive",
-    })
+        yield _sse({'type': 'start', 'orgName': org_name, 'jobId': run.job_id if run else None, 'totalLinks': total_links, 'message': f'开始更新案例详情... (共 {total_links} 个链接)'})
+        if run is None:
+            yield _sse({'type': 'complete', 'orgName': org_name, 'updatedCases': 0, 'downloads': 0, 'tables': 0, 'message': '没有待更新的链接'})
+            return
+        async for event in _stream_detail_run(run, total_links):
+            yield event
+
+    return StreamingResponse(generate_progress(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+@router.get("/jobs/{job_id}/stream")
+async def stream_crawl_job(job_id: str):
+    """Re-attach to a crawl job run started in this process (progress SSE, final event if it already ended)."""
+    run = job_runs.get(job_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="No run for this job in this process")
+    return StreamingResponse(_stream_detail_run(run, run.total), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_crawl_job(job_id: str):
+    """Stop a running crawl job after its in-flight pages; remaining links stay queued for a resume."""
+    if not job_runs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not running in this process")
+    return {"jobId": job_id, "status": "cancelling"}
 
 @router.post("/update-details")
 async def update_details(request: UpdateDetailsRequest):
@@ -2098,7 +1988,7 @@ async def update_details(request: UpdateDetailsRequest):
         )
         return {"updatedCases": 0}
 
-    dl_count, tbl_count = scrape_detail_pages(links_to_update, org_name)
+    dl_count, tbl_count = await run_in_threadpool(scrape_detail_pages, links_to_update, org_name)
     elapsed_ms = int((time.time() - started_at) * 1000)
     logger.info(
         f"[update-details] org={org_name} updated_cases={link_count} downloads={dl_count} tables={tbl_count} elapsed_ms={elapsed_ms}"
@@ -2106,15 +1996,99 @@ async def update_details(request: UpdateDetailsRequest):
     # Return number of pages processed; optionally include counts
     return {"updatedCases": link_count, "downloads": dl_count, "tables": tbl_count}
 
+@router.post("/update-list-batch")
+async def update_list_batch(request: UpdateListBatchRequest):
+    """Update the case lists of several orgs concurrently, streaming each org's result as it finishes.
+
+    Each org runs run_list_update in a worker thread (static fetches to its own
+    hosts, pooled browsers for fallbacks); at most `concurrency` orgs at once.
+    """
+    if request.mode not in LIST_UPDATE_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode, expected one of {LIST_UPDATE_MODES}")
+    org_names = list(dict.fromkeys(request.orgNames))
+    invalid = [org for org in org_names if not org2name.get(org)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid organization name: {invalid}")
+    concurrency = max(1, request.concurrency or settings.LIST_BATCH_CONCURRENCY)
+
+    async def generate_results():
+        started_at = time.time()
+        total = len(org_names)
+        yield f"data: {json.dumps({'type': 'start', 'orgNames': org_names, 'total': total, 'message': f'开始更新案例列表... (共 {total} 个机构)'}, ensure_ascii=False)}\n\n"
+
+        semaphore = asyncio.Semaphore(concurrency)
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def run_org(org_name: str):
+            async with semaphore:
+                await events.put({'type': 'org_start', 'orgName': org_name, 'message': f'{org_name} 正在获取案例列表...'})
+                t0 = time.time()
+                try:
+                    result = await run_in_threadpool(
+                        run_list_update,
+                        org_name,
+                        request.mode,
+                        request.startPage,
+                        request.endPage,
+                        request.maxPages,
+                        request.useCache,
+                    )
+                    event = {'type': 'org_result', 'orgName': org_name, **result, 'message': f'{org_name} 更新完成，共获取 {result["newCases"]} 条新案例'}
+                except Exception as e:
+                    detail = e.detail if isinstance(e, HTTPException) else str(e)
+                    logger.error(f"[update-list-batch] ERROR org={org_name} error={detail}")
+                    event = {'type': 'org_error', 'orgName': org_name, 'error': detail, 'message': f'{org_name} 更新失败'}
+                event['elapsedMs'] = int((time.time() - t0) * 1000)
+                await events.put(event)
+
+        tasks = [asyncio.create_task(run_org(org_name)) for org_name in org_names]
+        finished = 0
+        new_cases = 0
+        failed = []
+        try:
+            while finished < total:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event['type'] == 'org_result':
+                    finished += 1
+                    new_cases += event.get('newCases', 0)
+                elif event['type'] == 'org_error':
+                    finished += 1
+                    failed.append(event['orgName'])
+                event['finished'] = finished
+                event['total'] = total
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+            elapsed_ms = int((time.time() - started_at) * 1000)
+            logger.info(f"[update-list-batch] orgs={total} concurrency={concurrency} new_cases={new_cases} failed={failed} elapsed_ms={elapsed_ms}")
+            yield f"data: {json.dumps({'type': 'complete', 'total': total, 'newCases': new_cases, 'failedOrgs': failed, 'elapsedMs': elapsed_ms, 'message': f'案例列表更新完成，共获取 {new_cases} 条新案例'}, ensure_ascii=False)}\n\n"
+        finally:
+            # Client went away: orgs not started yet are dropped (running crawls finish in their threads)
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(generate_results(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+    })
+
 def get_pboc_data_for_pending(orgname: str, data_type: str):
+    """Load the org's sum rows, or the dtl rows whose links belong to the org.
+
+    Only the org's partitions are read; dtl rows of other orgs can never match
+    this org's sum links, so callers comparing links see the same result.
+    """
     if data_type not in ["sum", "dtl"]:
         return pd.DataFrame()
     beginwith = f"pboc{data_type}"
-    all_data = get_csvdf_for_pending(PBOC_DATA_PATH, beginwith)
+    all_data = partition_store.load(beginwith, regions=[orgname])
     if all_data.empty:
         return pd.DataFrame()
     
-    # For dtl data, don't filter by region; for sum data, filter by region
+    # dtl partitions are already scoped to the org; sum is filtered by region
     if data_type == "dtl":
         org_data = all_data
     else:
@@ -2126,47 +2100,174 @@ def get_pboc_data_for_pending(orgname: str, data_type: str):
             org_data["发布日期"] = pd.to_datetime(org_data["date"], errors='coerce').dt.date
     return org_data
 
-@router.get("/pending-orgs", response_model=List[str])
-async def get_pending_orgs():
-    """
-    Get a list of organizations that have new cases to be updated.
+def run_scheduled_org_update(org_name: str) -> Dict[str, Any]:
+    """One scheduled incremental update: new list pages (until_known), then their details."""
+    result = run_list_update(org_name, mode="until_known", max_pages=settings.CRAWL_SCHEDULE_MAX_PAGES)
+    if settings.CRAWL_SCHEDULE_DETAILS:
+        links = get_new_links_for_org(org_name)
+        dl_count, tbl_count = scrape_detail_pages(links, org_name) if links else (0, 0)
+        result.update({"updatedCases": len(links), "downloads": dl_count, "tables": tbl_count})
+    return result
+
+def _org_last_case_at(org_name: str) -> Optional[float]:
+    """Publish time of the org's newest stored case (epoch seconds), for schedule ordering."""
+    row = seen_index.freshness().get(org_name)
+    if not row or not row["max_sum_date"]:
+        return None
+    return pd.Timestamp(row["max_sum_date"]).timestamp()
+
+crawl_scheduler = CrawlScheduler(
+    crawl_schedule_store,
+    orgs=lambda: cityList,
+    run_org=run_scheduled_org_update,
+    last_case_at=_org_last_case_at,
+    interval=settings.CRAWL_SCHEDULE_INTERVAL_HOURS * 3600,
+    min_gap=settings.CRAWL_SCHEDULE_MIN_GAP_SECONDS,
+)
+
+@router.get("/schedule")
+async def get_crawl_schedule():
+    """Scheduler state and per-org next run, last run and last new case times."""
+    return await run_in_threadpool(crawl_scheduler.snapshot)
+
+@router.get("/schedule/runs")
+async def list_schedule_runs(
+    org_name: Optional[str] = Query(None, description="Organization filter"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """History of scheduled (and run-now) org updates, newest first."""
+    return crawl_schedule_store.runs(org_name, limit)
+
+@router.post("/schedule/{org_name}/run-now")
+async def run_schedule_now(org_name: str):
+    """Move an org to the front of the schedule."""
+    if not crawl_scheduler.running:
+        raise HTTPException(status_code=409, detail="Scheduler is not running")
+    if not await run_in_threadpool(crawl_scheduler.run_now, org_name):
+        raise HTTPException(status_code=404, detail="Organization not scheduled")
+    return {"orgName": org_name, "status": "queued"}
+
+async def _per_process_stats(name: str, local: Dict[str, Any]) -> Dict[str, Any]:
+    """Stats of this (API) process and of the scrape worker, which runs detail jobs with its own copies."""
+    worker = None
+    if settings.SCRAPE_WORKER_PROCESS:
+        remote = await run_in_threadpool(scrape_worker.remote_stats)
+        worker = remote.get(name) if remote else None
+    return {"api": local, "worker": worker}
+
+@router.get("/driver-pool")
+async def get_driver_pool_stats():
+    """Current browser pool usage (Selenium drivers, or Playwright contexts with BROWSER_ENGINE=playwright).
+
+    "api" is the pool of list-page fallbacks in this process, "worker" the
+    scrape worker's pool for detail jobs (null when the worker is off or not started).
     """
-    pending_orgs = []
-    for org_name in cityList:
-        try:
-            sum_df = get_pboc_data_for_pending(org_name, "sum")
-            dtl_df = get_pboc_data_for_pending(org_name, "dtl")
+    return await _per_process_stats("driver_pool", driver_pool.stats())
 
-            if sum_df.empty:
-                continue
+@router.get("/scrape-worker")
+async def get_scrape_worker_stats():
+    """Scrape worker process state: pid, memory (worker and API), running jobs and crash count."""
+    return {"enabled": settings.SCRAPE_WORKER_PROCESS, **scrape_worker.stats()}
 
-            max_sum_date = sum_df["发布日期"].max()
-            
-            if dtl_df.empty:
-                pending_orgs.append(org_name)
-                continue
+@router.get("/hosts")
+async def get_host_health():
+    """Cached per-host resolution/reachability, HTTPS fallbacks and circuit breaker states.
 
-            # 从关联的sum表获取发布日期，而不是从dtl表
-            # 通过link字段关联，获取dtl中对应的sum发布日期
-            if not dtl_df.empty and 'link' in dtl_df.columns and 'link' in sum_df.columns:
-                # 获取dtl中的所有link
-                dtl_links = dtl_df['link'].dropna().unique()
-                # 从sum_df中获取这些link对应的最大发布日期
-                related_sum_dates = sum_df[sum_df['link'].isin(dtl_links)]['发布日期']
-                max_dtl_date = related_sum_dates.max() if not related_sum_dates.empty else pd.NaT
-            else:
-                max_dtl_date = pd.NaT
+    Per process like /driver-pool; the worker's breaker and HTTPS findings are also mirrored into "api".
+    """
+    return await _per_process_stats("hosts", host_health.stats())
+
+@router.get("/pacing")
+async def get_host_pacing():
+    """Current per-host request rate, observed latency and AIMD increases/backoffs (per process, like /driver-pool)."""
+    return await _per_process_stats("pacing", host_limiter.snapshot())
+
+@router.get("/archive")
+async def get_html_archive():
+    """Fetches, distinct URLs, stored blobs and raw bytes per page kind in the HTML archive."""
+    return await run_in_threadpool(html_archive.stats)
+
+@router.post("/archive/reparse")
+async def reparse_html_archive(request: ArchiveReparseRequest):
+    """Re-run list/detail extraction over archived pages (parallel, no network)."""
+    if request.kind not in (LIST_PAGE, DETAIL_PAGE):
+        raise HTTPException(status_code=400, detail="kind must be 'list' or 'detail'")
+    unknown = [name for name in request.orgNames or [] if name not in org2name]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid organization name: {', '.join(unknown)}")
+    since = time.time() - request.sinceDays * 86400 if request.sinceDays else None
+    return await run_in_threadpool(run_archive_reparse, request.kind, request.orgNames, since)
+
+@router.get("/jobs")
+async def list_crawl_jobs(
+    org_name: Optional[str] = Query(None, description="Organization filter"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """List persistent crawl jobs with per-state link counts."""
+    return crawl_jobs.list_jobs(org_name, limit)
+
+@router.get("/jobs/{job_id}")
+async def get_crawl_job(job_id: str):
+    """Crawl job state, link counts and links that failed for good."""
+    job = crawl_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job["failedLinks"] = crawl_jobs.failed_links(job_id)
+    run = job_runs.get(job_id)
+    job["run"] = run.snapshot() if run is not None else None
+    return job
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_crawl_job(job_id: str):
+    """Resume an interrupted crawl job in the background from its remaining links."""
+    job = crawl_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != JOB_RUNNING:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    start_detail_run(job_id, job["org"])
+    return {"jobId": job_id, "status": "resumed", "remaining": crawl_jobs.remaining(job_id)}
+
+def _org_is_pending(row: Optional[Dict[str, Any]]) -> bool:
+    """An org is pending when its newest detailed case is older than its newest case."""
+    if not row or not row["sum_count"]:
+        return False
+    if row["max_detailed_date"] is None:
+        return True
+    return row["max_sum_date"] is not None and row["max_detailed_date"] < row["max_sum_date"]
 
-            if pd.isna(max_dtl_date) or max_dtl_date < max_sum_date:
-                pending_orgs.append(org_name)
-        except Exception as e:
-            # Log the error or handle as needed
-            logger.info(f"[pending-orgs] error org={org_name} err={e}")
-            continue
-            
+@router.get("/pending-orgs", response_model=List[str])
+async def get_pending_orgs(request: Request, response: Response):
+    """
+    Get a list of organizations that have new cases to be updated.
+    """
+    etag = make_etag(compute_dataset_etag(PBOC_DATA_PATH, ("pbocsum", "pbocdtl")), "pending-orgs", cityList)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+
+    freshness = await run_in_threadpool(seen_index.freshness)
+    pending_orgs = [org_name for org_name in cityList if _org_is_pending(freshness.get(org_name))]
     logger.info(f"[pending-orgs] total_pending={len(pending_orgs)} orgs={pending_orgs}")
     return pending_orgs
 
+@router.get("/freshness")
+async def get_org_freshness():
+    """Per-org freshness: newest case, newest case with details, pending link count."""
+    freshness = await run_in_threadpool(seen_index.freshness)
+    orgs = []
+    for org_name in cityList:
+        row = freshness.get(org_name)
+        orgs.append({
+            "org": org_name,
+            "sumCount": row["sum_count"] if row else 0,
+            "maxSumDate": row["max_sum_date"] if row else None,
+            "maxDetailedDate": row["max_detailed_date"] if row else None,
+            "pendingCount": row["pending"] if row else 0,
+            "hasPending": _org_is_pending(row),
+        })
+    return {"orgs": orgs}
+
 @router.post("/", response_model=Case)
 async def create_case(
     case_data: CaseCreate,
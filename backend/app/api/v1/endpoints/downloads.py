@@ -1,14 +1,20 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse, Response
 import logging
 import pandas as pd
-import os
-import glob
 from io import BytesIO
 import zipfile
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import quote
+
+from starlette.background import BackgroundTask
+
+from app.services.export_cache import ExportCache, export_cache
+from app.services.partition_store import partition_store
+from app.utils.dataset import compute_dataset_etag
+from app.utils.responses import range_file_response
 
 router = APIRouter()
 logger = logging.getLogger("uvicorn.error")
@@ -21,24 +27,6 @@ except Exception:
     PBOC_DATA_PATH = "../pboc"
 
 
-def _read_csvs(folder: str, beginwith: str) -> pd.DataFrame:
-    files = glob.glob(os.path.join(folder, f"**/{beginwith}*.csv"), recursive=True)
-    dflist = []
-    for fp in files:
-        try:
-            df = pd.read_csv(fp, low_memory=False)
-            # Drop unnamed index column if present
-            if len(df.columns) > 0 and (df.columns[0] == "Unnamed: 0" or df.columns[0] == ""):
-                df = df.drop(columns=[df.columns[0]])
-            dflist.append(df)
-        except Exception:
-            continue
-    if not dflist:
-        return pd.DataFrame()
-    out = pd.concat(dflist, ignore_index=True)
-    return out
-
-
 def _parse_date_column(df: pd.DataFrame) -> pd.Series:
     # Prefer 发布日期 then date
     if df is None or df.empty:
@@ -51,8 +39,26 @@ def _parse_date_column(df: pd.DataFrame) -> pd.Series:
     return pd.Series([pd.NaT] * len(df), index=df.index)
 
 
+def _serve_cached_export(request: Request, key: str, entry: dict) -> Response:
+    # Properly encode the filename to handle Chinese characters
+    safe_filename = quote(entry["filename"].encode('utf-8'), safe='')
+    # The entry stays pinned (not evictable) until the file has been sent
+    try:
+        return range_file_response(
+            request,
+            entry["path"],
+            media_type=entry["media_type"],
+            headers={"Content-Disposition": f"attachment; filename*=UTF-8''{safe_filename}"},
+            background=BackgroundTask(export_cache.release, key),
+        )
+    except Exception:
+        export_cache.release(key)
+        raise
+
+
 @router.get("/pboc-export")
 async def export_pboc(
+    request: Request,
     regions: Optional[str] = Query(None, description="Comma-separated Chinese region names (e.g., 北京,天津)"),
     start: Optional[str] = Query(None, description="Start date YYYY-MM-DD (inclusive)"),
     end: Optional[str] = Query(None, description="End date YYYY-MM-DD (inclusive)"),
@@ -64,6 +70,9 @@ async def export_pboc(
     - regions: comma-separated list of 区域 (e.g., 北京,天津). If omitted, includes all.
     - start/end: date range filter applied on 发布日期/日期 (inclusive). If omitted, no date filtering.
     - datasets: which tables to include, defaults to all three.
+
+    Results are cached on disk keyed by the filters and the dataset etag, so a
+    repeat request is served from the stored ZIP (with Range support).
     """
     try:
         requested = [d.strip().lower() for d in (datasets or "").split(",") if d.strip()]
@@ -91,12 +100,22 @@ async def export_pboc(
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid end date format, expected YYYY-MM-DD")
 
+        # Serve from the export cache when the same export was already built for this dataset version
+        dataset_etag = compute_dataset_etag(PBOC_DATA_PATH, set(requested) | {"pbocsum"})
+        cache_key = ExportCache.make_key(region_list, start, end, requested, dataset_etag)
+        cached = export_cache.get(cache_key)
+        if cached:
+            logger.info(f"[downloads] export cache hit key={cache_key}")
+            return _serve_cached_export(request, cache_key, cached)
+
         # Load dfs as needed
         # Load sum if needed for its own export, for cat join, or to filter dtl by sum links
         need_sum = ("pbocsum" in requested) or ("pboccat" in requested) or ("pbocdtl" in requested)
-        df_sum = _read_csvs(PBOC_DATA_PATH, "pbocsum") if need_sum else pd.DataFrame()
-        df_dtl = _read_csvs(PBOC_DATA_PATH, "pbocdtl") if "pbocdtl" in requested else pd.DataFrame()
-        df_cat = _read_csvs(PBOC_DATA_PATH, "pboccat") if "pboccat" in requested else pd.DataFrame()
+        # Partition pruning reads only the requested regions/months (a superset; rows are filtered below).
+        # dtl/cat also read unplaced rows, which the fallback filters below may still keep.
+        df_sum = partition_store.load("pbocsum", region_list, start, end) if need_sum else pd.DataFrame()
+        df_dtl = partition_store.load("pbocdtl", region_list, start, end, include_unknown=True) if "pbocdtl" in requested else pd.DataFrame()
+        df_cat = partition_store.load("pboccat", region_list, start, end, include_unknown=True) if "pboccat" in requested else pd.DataFrame()
         logger.info(f"[downloads] loaded shapes sum={getattr(df_sum, 'shape', None)} dtl={getattr(df_dtl, 'shape', None)} cat={getattr(df_cat, 'shape', None)}")
 
         # Filtering helpers
@@ -185,7 +204,8 @@ async def export_pboc(
                     if c in cat_df.columns:
                         link_col = c
                         break
-                if link_col and not df_sum.empty and "link" in df_sum.columns:
+                # df_sum may be empty-with-columns when every sum partition was pruned
+                if link_col and "link" in df_sum.columns:
                     # Select minimal columns for join performance
                     join_cols = [c for c in ["link", "区域", "date", "发布日期"] if c in df_sum.columns]
                     sum_min = df_sum[join_cols].drop_duplicates()
@@ -237,15 +257,8 @@ async def export_pboc(
         mem_zip.seek(0)
 
         zip_name = f"pboc_export_{region_tag}_{date_tag}_{timestamp}.zip"
-        # Properly encode the filename to handle Chinese characters
-        from urllib.parse import quote
-        safe_filename = quote(zip_name.encode('utf-8'), safe='')
-        # Return as bytes to avoid iterability issues with BytesIO in StreamingResponse
-        return Response(
-            content=mem_zip.getvalue(),
-            media_type="application/zip",
-            headers={"Content-Disposition": f"attachment; filename*=UTF-8''{safe_filename}"},
-        )
+        entry = export_cache.put(cache_key, mem_zip.getvalue(), zip_name, "application/zip")
+        return _serve_cached_export(request, cache_key, entry)
 
     except HTTPException:
         raise
@@ -0,0 +1,98 @@
+from typing import Any, Dict
+import asyncio
+import json
+import logging
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.services.progress_bus import DOWNLOAD, EXTRACT, SCRAPE, TERMINAL_TYPES, UPLINK, progress_bus, topic_of
+
+router = APIRouter()
+logger = logging.getLogger("uvicorn.error")
+
+KINDS = (SCRAPE, DOWNLOAD, EXTRACT, UPLINK)
+
+
+def _topic(kind: str, key: str) -> str:
+    if kind not in KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown progress kind (expected one of {', '.join(KINDS)})")
+    return topic_of(kind, key)
+
+
+@router.get("")
+async def list_progress_topics() -> Dict[str, Any]:
+    """Active and recently finished progress topics with subscriber and delivery counters."""
+    return progress_bus.stats()
+
+
+@router.get("/{kind}/{key}/latest")
+async def get_latest_progress(kind: str, key: str):
+    """Latest event of a job (polling fallback)."""
+    event = progress_bus.latest(_topic(kind, key))
+    if event is None:
+        raise HTTPException(status_code=404, detail="No progress for this job")
+    return event
+
+
+@router.get("/{kind}/{key}/events")
+async def stream_progress(kind: str, key: str):
+    """Server-Sent Events of a job's progress; ends after its final event.
+
+    kind is scrape (crawl job id), download (download session id), extract or
+    uplink (the progress_id passed when starting the job).
+    """
+    topic = _topic(kind, key)
+
+    async def generate():
+        subscription = progress_bus.subscribe(topic)
+        try:
+            while True:
+                event = await subscription.get(timeout=settings.PROGRESS_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+                if event.get("type") in TERMINAL_TYPES:
+                    return
+        finally:
+            subscription.close()
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "Connection": "keep-alive",
+    })
+
+
+@router.websocket("/{kind}/{key}/ws")
+async def progress_websocket(websocket: WebSocket, kind: str, key: str):
+    """WebSocket variant of /events: one JSON message per event, closed after the final one."""
+    if kind not in KINDS:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    subscription = progress_bus.subscribe(topic_of(kind, key))
+
+    async def send_events():
+        async for event in subscription:
+            await websocket.send_text(json.dumps(event, ensure_ascii=False, default=str))
+        await websocket.close()
+
+    async def watch_disconnect():
+        # Incoming messages are ignored; this only notices the client leaving while the job is quiet
+        while True:
+            await websocket.receive_text()
+
+    tasks = [asyncio.create_task(send_events()), asyncio.create_task(watch_disconnect())]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if not task.cancelled() and task.exception() is not None and not isinstance(task.exception(), WebSocketDisconnect):
+                logger.info(f"[progress] WS_ERROR topic={subscription.topic} err={task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional, Tuple, Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import Optional, Dict, Any, Tuple
 import pandas as pd
 import glob
 import os
 import time
 import logging
 
+from app.utils.dataset import compute_dataset_etag
+from app.utils.responses import conditional_response, make_etag
+from app.utils.singleflight import SingleFlight
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
@@ -15,12 +19,15 @@ PBOC_DATA_PATH = "../pboc"
 
 # Simple in-process cache for the joined dataset
 _DATA_CACHE: Dict[str, Any] = {
-    "df": None,          # Cached DataFrame
-    "etag": None,        # Files mtime signature
+    "snapshot": None,    # (DataFrame, files mtime signature), published together
     "ts": 0.0,           # Built timestamp
 }
 _CACHE_TTL_SECONDS = 300  # skip filesystem etag checks within this window
 
+# Coalesces concurrent dataset loads (cold misses and background refreshes)
+_LOAD_FLIGHT = SingleFlight()
+_LOAD_KEY = "joined-dataset"
+
 
 def _read_csvs(folder: str, prefix: str, debug: list | None = None) -> pd.DataFrame:
     t0 = time.time()
@@ -129,52 +136,17 @@ def _load_joined_dataset(debug: list | None = None) -> pd.DataFrame:
     return merged
 
 
-def _compute_files_etag() -> Tuple[int, int]:
-    """Compute an etag from the newest mtime and file count of matching CSVs.
-
-    Returns (max_mtime, file_count). If no files, returns (0, 0).
-    """
-    patterns = [
-        os.path.join(PBOC_DATA_PATH, "**", "pbocsum*.csv"),
-        os.path.join(PBOC_DATA_PATH, "**", "pbocdtl*.csv"),
-        os.path.join(PBOC_DATA_PATH, "**", "pboccat*.csv"),
-    ]
-    files: list[str] = []
-    for pat in patterns:
-        files.extend(glob.glob(pat, recursive=True))
-    if not files:
-        return (0, 0)
-    try:
-        mtimes = [int(os.path.getmtime(fp)) for fp in files]
-        return (max(mtimes), len(files))
-    except Exception:
-        # If any issue, fall back to time-based invalidation
-        return (0, len(files))
+def _compute_files_etag() -> str:
+    """Version of the CSV shards (paths, mtimes and sizes); empty if no files."""
+    return compute_dataset_etag(PBOC_DATA_PATH)
 
 
-def _get_joined_dataset_cached(debug: list | None = None, force_reload: bool = False) -> pd.DataFrame:
-    """Return cached joined dataset, reloading if files changed or forced.
+def _build_dataset_cache(etag: str, debug: list | None = None) -> Tuple[pd.DataFrame, str]:
+    """Load the joined dataset, prepare helper columns and publish it to the cache.
 
-    Also prepares helper columns once (e.g., parsed publish date) to avoid
+    Prepares helper columns once (e.g., parsed publish date) to avoid
     recomputation on every request.
     """
-    now = time.time()
-    # If we have a cached df and it's fresh, return immediately (no glob)
-    if (not force_reload) and _DATA_CACHE.get("df") is not None and (now - float(_DATA_CACHE.get("ts") or 0)) < _CACHE_TTL_SECONDS:
-        return _DATA_CACHE["df"]  # type: ignore
-
-    # Otherwise, compute filesystem etag and compare
-    current_etag = _compute_files_etag()
-    cached_etag = _DATA_CACHE.get("etag")
-    if (not force_reload) and _DATA_CACHE.get("df") is not None and cached_etag == current_etag:
-        # Refresh timestamp and reuse df
-        _DATA_CACHE["ts"] = now
-        return _DATA_CACHE["df"]  # type: ignore
-
-    # (Re)load
-    if debug is not None:
-        logger.info("cache miss or force reload; loading dataset")
-        debug.append("cache: reload dataset")  # type: ignore
     df = _load_joined_dataset(debug)
 
     # Build helper columns once
@@ -200,14 +172,63 @@ def _get_joined_dataset_cached(debug: list | None = None, force_reload: bool = F
             except Exception:
                 pass
 
-    _DATA_CACHE["df"] = df
-    _DATA_CACHE["etag"] = current_etag
-    _DATA_CACHE["ts"] = now
-    return df
+    # One assignment, so readers never pair this frame with another version's etag
+    _DATA_CACHE["snapshot"] = (df, etag)
+    _DATA_CACHE["ts"] = time.time()
+    logger.info(f"dataset cache rebuilt rows={len(df)} etag={etag}")
+    return df, etag
+
+
+def _get_joined_dataset_cached(debug: list | None = None, force_reload: bool = False) -> Tuple[pd.DataFrame, str]:
+    """Return (joined dataset, its files etag), reloading if files changed or forced.
+
+    Loads are single-flight: concurrent cache misses share one load. When the
+    files change but a previous snapshot exists, that snapshot keeps being
+    served while a background refresh builds the new one (stale-while-revalidate).
+    """
+    now = time.time()
+    cached = _DATA_CACHE.get("snapshot")
+    # If we have a cached df and it's fresh, return immediately (no glob)
+    if (not force_reload) and cached is not None and (now - float(_DATA_CACHE.get("ts") or 0)) < _CACHE_TTL_SECONDS:
+        return cached
+
+    # Otherwise, compute filesystem etag and compare
+    current_etag = _compute_files_etag()
+    if (not force_reload) and cached is not None and cached[1] == current_etag:
+        # Refresh timestamp and reuse df
+        _DATA_CACHE["ts"] = now
+        return cached
+
+    if (not force_reload) and cached is not None:
+        # Serve the previous snapshot; defer the next etag check by one TTL window
+        _DATA_CACHE["ts"] = now
+        started = _LOAD_FLIGHT.start(
+            _LOAD_KEY, lambda: _build_dataset_cache(current_etag), name="search-dataset-refresh"
+        )
+        if debug is not None:
+            debug.append(f"cache: stale snapshot served, background refresh {'started' if started else 'in progress'}")  # type: ignore
+        return cached
+
+    # Cold cache or forced reload: wait for a (possibly shared) load
+    if debug is not None:
+        logger.info("cache miss or force reload; loading dataset")
+        debug.append("cache: reload dataset")  # type: ignore
+    return _LOAD_FLIGHT.do(_LOAD_KEY, lambda: _build_dataset_cache(current_etag, debug))
+
+
+def warm_dataset_cache() -> int:
+    """Load the joined dataset and its search helper columns; return row count.
+
+    Used by the startup warm-up so the first search does not pay the load.
+    """
+    df, _ = _get_joined_dataset_cached()
+    return len(df)
 
 
 @router.get("/cases")
 def search_cases(
+    request: Request,
+    response: Response,
     q: Optional[str] = Query(None, description="关键词：企业名称/违法类型/处罚内容/文号/分类/标题"),
     entity_name: Optional[str] = Query(None, description="企业名称（精确或模糊匹配）"),
     region: Optional[str] = Query(None, description="区域（sum.区域）"),
@@ -231,7 +252,21 @@ def search_cases(
             logger.info(msg)
 
         # Use cached dataset to avoid re-reading CSVs on every request
-        df = _get_joined_dataset_cached(debug=debug, force_reload=force_reload)
+        df, data_etag = _get_joined_dataset_cached(debug=debug, force_reload=force_reload)
+
+        # Conditional GET against the snapshot actually served; debug requests always recompute
+        if not verbose and not force_reload:
+            etag = make_etag(
+                data_etag or "",
+                "search",
+                [q, entity_name, region, province, industry, start_date, end_date, min_amount, max_amount],
+                page,
+                page_size,
+            )
+            not_modified = conditional_response(request, response, etag)
+            if not_modified is not None:
+                return not_modified
+
         if df.empty:
             resp = {
                 "total": 0,
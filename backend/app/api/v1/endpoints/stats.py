@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 import pandas as pd
 import glob
 import os
 
+from app.services.partition_store import partition_store
+from app.utils.dataset import compute_dataset_etag
+from app.utils.responses import conditional_response, make_etag
+
 router = APIRouter()
 
 PBOC_DATA_PATH = "../pboc" 
@@ -37,19 +41,20 @@ def get_pboc_data(orgname: str, data_type: str):
     """
     Gets the data for a given organization and data type ('sum' or 'dtl').
     For 'dtl' data, gets all data and links with sum data by link field to get dates.
+
+    Only the organization's partitions are read (see partition_store).
     """
     if data_type not in ["sum", "dtl"]:
         return pd.DataFrame()
 
-    beginwith = f"pboc{data_type}"
-    all_data = get_csvdf(PBOC_DATA_PATH, beginwith)
-    
-    if all_data.empty:
+    # pbocsum is needed for both: directly for 'sum', as link/date source for 'dtl'
+    sum_data = partition_store.load("pbocsum", regions=[orgname])
+    if sum_data.empty:
         return pd.DataFrame()
 
     if data_type == "sum":
         # For sum data, filter by orgname as before
-        org_data = all_data[all_data["区域"] == orgname]
+        org_data = sum_data[sum_data["区域"] == orgname]
         
         if not org_data.empty:
             org_data = org_data.copy()
@@ -57,9 +62,8 @@ def get_pboc_data(orgname: str, data_type: str):
                 org_data["发布日期"] = pd.to_datetime(org_data["date"], errors='coerce').dt.date
     else:
         # For dtl data, follow the process: link -> sum data -> filter by region
-        # Step 1: Get sum data first
-        sum_data = get_csvdf(PBOC_DATA_PATH, "pbocsum")
-        if sum_data.empty:
+        all_data = partition_store.load("pbocdtl", regions=[orgname])
+        if all_data.empty:
             return pd.DataFrame()
         
         # Step 2: Filter sum data by orgname (region)
@@ -118,11 +122,16 @@ def get_stats_for_df(df: pd.DataFrame):
 
 
 @router.get("/{org_name}")
-async def get_organization_stats(org_name: str):
+async def get_organization_stats(org_name: str, request: Request, response: Response):
     """
     Get statistics for a given organization from the local CSV files.
     """
     try:
+        etag = make_etag(compute_dataset_etag(PBOC_DATA_PATH, ("pbocsum", "pbocdtl")), "stats", org_name)
+        not_modified = conditional_response(request, response, etag)
+        if not_modified is not None:
+            return not_modified
+
         # Get stats for the summary data (pbocsum)
         sum_df = get_pboc_data(org_name, "sum")
         sum_stats = get_stats_for_df(sum_df)
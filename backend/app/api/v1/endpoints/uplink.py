@@ -1,3 +1,4 @@
+import asyncio
 import glob
 import logging
 import os
@@ -6,12 +7,15 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 import pandas as pd
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import Response
 from pydantic import BaseModel
 
 from app.core.config import settings
 from app.core.database import db, get_database, connect_to_mongo
+from app.services.progress_bus import UPLINK, progress_bus, topic_of
+from app.utils.dataset import compute_dataset_etag
+from app.utils.responses import conditional_response, make_etag
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -21,6 +25,24 @@ router = APIRouter()
 # Request models
 class UplinkUpdateRequest(BaseModel):
     selected_ids: List[str]
+    progress_id: Optional[str] = None  # Stream processing_log lines via /progress/uplink/{progress_id}
+
+
+class _ProgressLog(list):
+    """processing_log that also publishes each line on the progress bus."""
+
+    def __init__(self, progress_id: Optional[str]):
+        super().__init__()
+        self.topic = topic_of(UPLINK, progress_id) if progress_id else None
+
+    def append(self, line: str) -> None:
+        super().append(line)
+        if self.topic:
+            progress_bus.publish(self.topic, {"type": "progress", "step": len(self), "message": line})
+
+    def finish(self, event: Dict[str, Any]) -> None:
+        if self.topic:
+            progress_bus.publish(self.topic, event)
 
 # Local PBOC CSV root (relative to backend/)
 PBOC_DATA_PATH = "../pboc"
@@ -325,9 +347,27 @@ def _stats_for_cat(df_cat: pd.DataFrame, df_sum: Optional[pd.DataFrame] = None)
 
 
 @router.get("/info")
-async def uplink_info():
+async def uplink_info(request: Request, response: Response):
     """Return CSV dataset stats plus current Mongo collection size and pending update count."""
     try:
+        # 连接数据库
+        await _ensure_db()
+        database = await get_database()
+        col = database["pbocdtl"]
+        collection_size = await col.count_documents({})
+
+        # Version = CSV shards + collection size + newest _id (changes on insert/delete)
+        latest = await col.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        etag = make_etag(
+            compute_dataset_etag(PBOC_DATA_PATH),
+            "uplink-info",
+            collection_size,
+            str(latest["_id"]) if latest else "",
+        )
+        not_modified = conditional_response(request, response, etag)
+        if not_modified is not None:
+            return not_modified
+
         sum_df = _read_csvs(PBOC_DATA_PATH, "pbocsum")
         dtl_df = _read_csvs(PBOC_DATA_PATH, "pbocdtl")
         cat_df = _read_csvs(PBOC_DATA_PATH, "pboccat")
@@ -335,12 +375,6 @@ async def uplink_info():
         dtl_stats = _stats_for_df(dtl_df)
         cat_stats = _stats_for_cat(cat_df, sum_df)
 
-        # 连接数据库
-        await _ensure_db()
-        database = await get_database()
-        col = database["pbocdtl"]
-        collection_size = await col.count_documents({})
-
         # pending by comparing uids: 本地CSV中存在但MongoDB中不存在的uid
         dtllink = _build_dtllink_df()
         pending = 0
@@ -468,8 +502,18 @@ async def uplink_clear():
 @router.post("/update")
 async def uplink_update(request: UplinkUpdateRequest):
     """Insert selected dtl rows (from CSV) into Mongo pbocdtl by link-dedup."""
+    processing_log = _ProgressLog(request.progress_id)
+    try:
+        result = await _uplink_update(request, processing_log)
+    except HTTPException as e:
+        processing_log.finish({"type": "error", "error": str(e.detail)})
+        raise
+    processing_log.finish({"type": "completed", **{k: v for k, v in result.items() if k != "processing_log"}})
+    return result
+
+
+async def _uplink_update(request: UplinkUpdateRequest, processing_log: List[str]) -> Dict[str, Any]:
     start_time = datetime.now()
-    processing_log = []
 
     try:
         logger.info("开始执行uplink更新操作")
@@ -477,7 +521,7 @@ async def uplink_update(request: UplinkUpdateRequest):
 
         # 构建数据
         data_start = datetime.now()
-        dtllink = _build_dtllink_df()
+        dtllink = await asyncio.to_thread(_build_dtllink_df)
         data_time = (datetime.now() - data_start).total_seconds()
         processing_log.append(f"[{datetime.now().strftime('%H:%M:%S')}] 数据构建完成，耗时: {data_time:.2f}秒")
 
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import cases, documents, stats, attachments, search, downloads, uplink, dashboard, org, pending
+from .endpoints import cases, documents, stats, attachments, search, downloads, uplink, dashboard, org, pending, progress
 
 api_router = APIRouter()
 
@@ -13,3 +13,4 @@ api_router.include_router(uplink.router, prefix="/uplink", tags=["uplink"])
 api_router.include_router(pending.router, prefix="/uplink", tags=["uplink"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(org.router, prefix="/org", tags=["org"])
+api_router.include_router(progress.router, prefix="/progress", tags=["progress"])
@@ -40,6 +40,92 @@ class Settings(BaseSettings):
     # LLM Request Tunables
     OPENAI_TIMEOUT_SECONDS: int = 480  # Min request timeout for long contexts
     OPENAI_MAX_RETRIES: int = 5        # Retry attempts for transient connection issues
+
+    # Export Cache Settings
+    EXPORT_CACHE_DIR: str = "../temp/export_cache"
+    EXPORT_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB, LRU-evicted beyond this
+
+    # Partitioned Data Layout (dataset/区域=<org>/ym=<YYYY-MM>/part-*.csv)
+    PBOC_PARTITION_PATH: str = "../pboc_partitioned"
+    PBOC_PARTITION_SYNC_INTERVAL_SECONDS: int = 300  # loads request a background sync when older
+
+    # Startup Warm-up (load dataset, build search indexes, open Mongo pool)
+    WARMUP_ON_STARTUP: bool = True
+    WARMUP_MONGO: bool = True  # Mongo is optional; failure is reported, not fatal
+
+    # List Page Fetching (static HTML first, Selenium only as fallback)
+    LIST_FETCH_STATIC: bool = True
+    LIST_FETCH_CONCURRENCY: int = 4
+    LIST_FETCH_TIMEOUT_SECONDS: int = 20
+    LIST_CRAWL_BATCH: int = 3         # Pages fetched per step in until_known mode
+    LIST_CRAWL_MAX_PAGE: int = 4096   # Upper bound when probing for the last list page
+    LIST_PAGE_CACHE_PATH: str = "../temp/list_page_cache.json"  # ETag/Last-Modified/hash per list page URL
+    LIST_BATCH_CONCURRENCY: int = 4   # Orgs crawled at once by /cases/update-list-batch
+
+    # Chrome WebDriver Pool
+    DRIVER_POOL_SIZE: int = 2            # Max concurrent browsers
+    DRIVER_POOL_PREWARM: int = 0         # Browsers launched during startup warm-up
+    DRIVER_POOL_MAX_PAGES: int = 200     # Recycle a browser after this many page loads
+    DRIVER_POOL_ACQUIRE_TIMEOUT_SECONDS: int = 300
+
+    # Browser Engine ("selenium": one Chrome per pooled driver; "playwright": one
+    # Chromium with an isolated context per page, needs `pip install playwright`)
+    BROWSER_ENGINE: str = "selenium"
+    PLAYWRIGHT_MAX_CONTEXTS: int = 8              # Pages open at once in the shared browser (raise SCRAPE_CONCURRENCY to match)
+    PLAYWRIGHT_BLOCKED_RESOURCES: str = "image,font,media"
+    PLAYWRIGHT_NAV_TIMEOUT_SECONDS: int = 45
+
+    # Detail Scraping Concurrency (global workers, per-host token buckets)
+    SCRAPE_CONCURRENCY: int = 2              # Pages in flight across all hosts
+    SCRAPE_HOST_RATE_PER_SECOND: float = 0.3 # ~1 request per 3.3s per host (old sleep averaged 3.5s)
+    SCRAPE_HOST_BURST: int = 1
+    SCRAPE_ADAPTIVE_PACING: bool = True          # AIMD per host between the min and max rates below
+    SCRAPE_HOST_MIN_RATE_PER_SECOND: float = 0.05
+    SCRAPE_HOST_MAX_RATE_PER_SECOND: float = 1.0
+    SCRAPE_LATENCY_TARGET_SECONDS: float = 3.0   # Page loads slower than 2x this back off
+    SCRAPE_RATE_INCREASE: float = 0.02           # Added per healthy page load
+    SCRAPE_RATE_DECREASE_FACTOR: float = 0.5     # Applied on errors/timeouts
+
+    # Scrape Worker Process (detail jobs run in a separate process; browsers,
+    # parsing and result writing never share the API process's memory)
+    SCRAPE_WORKER_PROCESS: bool = True
+    SCRAPE_WORKER_SHUTDOWN_TIMEOUT_SECONDS: int = 10
+    SCRAPE_DETACH_GRACE_SECONDS: int = 30  # A streamed run with no client left is cancelled after this
+
+    # Progress Event Bus (SSE/WebSocket progress of scraping, downloads, text extraction, uplink)
+    PROGRESS_BUFFER_SIZE: int = 256        # Undelivered events kept per subscriber (progress snapshots coalesce)
+    PROGRESS_RETAIN_SECONDS: int = 600     # Latest event of a finished job stays available this long
+    PROGRESS_HEARTBEAT_SECONDS: int = 15
+
+    # Persistent Crawl Jobs (per-link state, leases, retries, resume)
+    CRAWL_JOB_DB_PATH: str = "../temp/crawl_jobs.sqlite3"
+    CRAWL_JOB_CLAIM_BATCH: int = 10        # Links leased per claim
+    CRAWL_JOB_LEASE_SECONDS: int = 900     # Lease covers a whole claimed batch
+    CRAWL_JOB_MAX_ATTEMPTS: int = 3
+
+    # Raw HTML archive of fetched list/detail pages (offline re-parse)
+    HTML_ARCHIVE_ENABLED: bool = True
+    HTML_ARCHIVE_PATH: str = "../temp/html_archive"
+    REPARSE_WORKERS: int = 0  # Parser processes for /cases/archive/reparse (0 = one per core)
+
+    # Seen-link index (keys already stored in the CSV shards, for pending detection)
+    SEEN_INDEX_DB_PATH: str = "../temp/seen_index.sqlite3"
+
+    # Host Health (DNS/reachability cache, HTTPS memory, circuit breaker)
+    HOST_DNS_TTL_SECONDS: int = 600
+    HOST_REACHABILITY_TTL_SECONDS: int = 300
+    HOST_NEGATIVE_TTL_SECONDS: int = 60      # Re-probe an unreachable host after this
+    HOST_CONNECT_TIMEOUT_SECONDS: float = 10
+    HOST_BREAKER_THRESHOLD: int = 5          # Consecutive failures that open the breaker
+    HOST_BREAKER_COOLDOWN_SECONDS: int = 300 # Skip the host this long before a trial request
+
+    # Scheduled Incremental Crawl (every org in cityList, one at a time)
+    CRAWL_SCHEDULE_ENABLED: bool = False
+    CRAWL_SCHEDULE_INTERVAL_HOURS: float = 24   # Each org is updated once per interval
+    CRAWL_SCHEDULE_MIN_GAP_SECONDS: int = 300   # Pause between consecutive org runs
+    CRAWL_SCHEDULE_MAX_PAGES: int = 10          # Page budget per list (until_known mode)
+    CRAWL_SCHEDULE_DETAILS: bool = True         # Also scrape details of newly listed cases
+    CRAWL_SCHEDULE_DB_PATH: str = "../temp/crawl_schedule.sqlite3"
     
     class Config:
         env_file = ".env"
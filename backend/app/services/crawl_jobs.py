@@ -0,0 +1,286 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Link states
+QUEUED = "queued"
+FETCHING = "fetching"
+DONE = "done"
+FAILED = "failed"
+
+# Job states
+JOB_RUNNING = "running"
+JOB_FINALIZING = "finalizing"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+ACTIVE_JOB_STATES = (JOB_RUNNING,)
+
+# Identifies this process; leases held by another boot are stale after a restart
+BOOT_ID = uuid.uuid4().hex[:12]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    org TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    meta TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_org_status ON jobs(org, status);
+CREATE TABLE IF NOT EXISTS job_links (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    result TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (job_id, url)
+);
+CREATE INDEX IF NOT EXISTS idx_job_links_state ON job_links(job_id, state);
+"""
+
+
+class CrawlJobStore:
+    """SQLite-backed crawl jobs with per-link state, leases and retries.
+
+    A link moves queued -> fetching (leased to one worker) -> done/failed.
+    Failed attempts are re-queued until max_attempts. Leases that expire, or
+    that belong to a previous process (BOOT_ID), are returned to the queue so
+    an interrupted job resumes where it stopped.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _conn(self):
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    conn = sqlite3.connect(self.path, timeout=30)
+                    try:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.executescript(_SCHEMA)
+                        conn.commit()
+                    finally:
+                        conn.close()
+                    self._initialized = True
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # Jobs
+
+    def create_job(self, org: str, links: Iterable[str], kind: str = "details", meta: Optional[Dict[str, Any]] = None) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO jobs (id, org, kind, status, created_at, updated_at, meta) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, org, kind, JOB_RUNNING, now, now, json.dumps(meta or {}, ensure_ascii=False)),
+            )
+            self._insert_links(conn, job_id, links, start_idx=0)
+            conn.execute("COMMIT")
+        logger.info(f"[crawl-jobs] CREATE job={job_id} org={org} kind={kind}")
+        return job_id
+
+    @staticmethod
+    def _insert_links(conn, job_id: str, links: Iterable[str], start_idx: int) -> int:
+        now = time.time()
+        added = 0
+        for url in links:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO job_links (job_id, idx, url, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, start_idx + added, url, QUEUED, now),
+            )
+            added += cur.rowcount
+        return added
+
+    def add_links(self, job_id: str, links: Iterable[str]) -> int:
+        """Append links not yet in the job; returns how many were added."""
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT COALESCE(MAX(idx), -1) + 1 FROM job_links WHERE job_id = ?", (job_id,)).fetchone()
+            added = self._insert_links(conn, job_id, links, start_idx=row[0])
+            conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+            conn.execute("COMMIT")
+        return added
+
+    def find_active(self, org: str, kind: str = "details", selection: Optional[str] = None) -> Optional[str]:
+        """Most recent unfinished job for org, if any.
+
+        With selection, only the job created for that link selection (see
+        selection_key); without, only org-wide jobs, never a selection's.
+        """
+        with self._conn() as conn:
+            row = conn.execute(
+                f"SELECT id FROM jobs WHERE org = ? AND kind = ? AND status IN ({','.join('?' * len(ACTIVE_JOB_STATES))}) "
+                "AND json_extract(meta, '$.selection') IS ? ORDER BY created_at DESC LIMIT 1",
+                (org, kind, *ACTIVE_JOB_STATES, selection),
+            ).fetchone()
+        return row["id"] if row else None
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._conn() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = {
+                r["state"]: r["n"]
+                for r in conn.execute(
+                    "SELECT state, COUNT(*) AS n FROM job_links WHERE job_id = ? GROUP BY state", (job_id,)
+                )
+            }
+        job = dict(row)
+        job["meta"] = json.loads(job["meta"] or "{}")
+        job["links"] = {state: counts.get(state, 0) for state in (QUEUED, FETCHING, DONE, FAILED)}
+        job["total"] = sum(counts.values())
+        return job
+
+    def list_jobs(self, org: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._conn() as conn:
+            if org:
+                rows = conn.execute(
+                    "SELECT id FROM jobs WHERE org = ? ORDER BY created_at DESC LIMIT ?", (org, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [job for job in (self.get_job(r["id"]) for r in rows) if job]
+
+    def set_status(self, job_id: str, status: str, expected: Optional[str] = None) -> bool:
+        """Update job status; with expected, only if the current status matches (atomic)."""
+        with self._conn() as conn:
+            if expected is None:
+                cur = conn.execute("UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?", (status, time.time(), job_id))
+            else:
+                cur = conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                    (status, time.time(), job_id, expected),
+                )
+        return cur.rowcount == 1
+
+    # Links
+
+    def recover_stale(self, job_id: str) -> int:
+        """Re-queue links leased by a previous process or whose lease has expired."""
+        with self._conn() as conn:
+            cur = conn.execute(
+                "UPDATE job_links SET state = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE job_id = ? AND state = ? AND (lease_expires < ? OR lease_owner NOT LIKE ?)",
+                (QUEUED, time.time(), job_id, FETCHING, time.time(), f"{BOOT_ID}:%"),
+            )
+        if cur.rowcount:
+            logger.info(f"[crawl-jobs] RECOVER job={job_id} requeued={cur.rowcount}")
+        return cur.rowcount
+
+    def claim(self, job_id: str, owner: str, limit: int, lease_seconds: float) -> List[Tuple[int, str]]:
+        """Lease up to limit queued links to owner; returns [(idx, url)] in link order."""
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT idx, url FROM job_links WHERE job_id = ? AND (state = ? OR (state = ? AND lease_expires < ?)) "
+                "ORDER BY idx LIMIT ?",
+                (job_id, QUEUED, FETCHING, now, limit),
+            ).fetchall()
+            for r in rows:
+                conn.execute(
+                    "UPDATE job_links SET state = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, updated_at = ? "
+                    "WHERE job_id = ? AND url = ?",
+                    (FETCHING, owner, now + lease_seconds, now, job_id, r["url"]),
+                )
+            conn.execute("COMMIT")
+        return [(r["idx"], r["url"]) for r in rows]
+
+    def complete(self, job_id: str, url: str, result: Any) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE job_links SET state = ?, result = ?, last_error = NULL, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE job_id = ? AND url = ?",
+                (DONE, json.dumps(result, ensure_ascii=False), time.time(), job_id, url),
+            )
+
+    def fail(self, job_id: str, url: str, error: str, max_attempts: int, retryable: bool = True) -> str:
+        """Record a failed attempt; re-queue while attempts remain. Returns the new state."""
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT attempts FROM job_links WHERE job_id = ? AND url = ?", (job_id, url)).fetchone()
+            attempts = row["attempts"] if row else max_attempts
+            state = QUEUED if retryable and attempts < max_attempts else FAILED
+            conn.execute(
+                "UPDATE job_links SET state = ?, last_error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE job_id = ? AND url = ?",
+                (state, error[:1000], time.time(), job_id, url),
+            )
+            conn.execute("COMMIT")
+        return state
+
+    def release(self, job_id: str, owner: str) -> int:
+        """Re-queue links still leased by owner (not attempted), e.g. after a cancelled run."""
+        with self._conn() as conn:
+            cur = conn.execute(
+                "UPDATE job_links SET state = ?, attempts = MAX(attempts - 1, 0), lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE job_id = ? AND state = ? AND lease_owner = ?",
+                (QUEUED, time.time(), job_id, FETCHING, owner),
+            )
+        return cur.rowcount
+
+    def remaining(self, job_id: str) -> int:
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM job_links WHERE job_id = ? AND state IN (?, ?)", (job_id, QUEUED, FETCHING)
+            ).fetchone()
+        return row[0]
+
+    def results(self, job_id: str) -> List[Tuple[int, str, Any]]:
+        """Results of done links as [(idx, url, result)] in link order."""
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT idx, url, result FROM job_links WHERE job_id = ? AND state = ? ORDER BY idx", (job_id, DONE)
+            ).fetchall()
+        return [(r["idx"], r["url"], json.loads(r["result"]) if r["result"] else None) for r in rows]
+
+    def failed_links(self, job_id: str) -> List[Dict[str, Any]]:
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT url, attempts, last_error FROM job_links WHERE job_id = ? AND state = ? ORDER BY idx",
+                (job_id, FAILED),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+
+def selection_key(links: Iterable[str]) -> str:
+    """Stable id of a set of links, for jobs that must cover exactly those links."""
+    return hashlib.sha256("\n".join(sorted(set(links))).encode("utf-8")).hexdigest()[:16]
+
+
+def new_owner() -> str:
+    """Lease owner id for one runner in this process."""
+    return f"{BOOT_ID}:{uuid.uuid4().hex[:8]}"
+
+
+crawl_jobs = CrawlJobStore(settings.CRAWL_JOB_DB_PATH)
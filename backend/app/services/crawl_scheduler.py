@@ -0,0 +1,304 @@
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Run states
+RUN_RUNNING = "running"
+RUN_OK = "ok"
+RUN_FAILED = "failed"
+RUN_INTERRUPTED = "interrupted"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule (
+    org TEXT PRIMARY KEY,
+    next_run_at REAL NOT NULL,
+    last_run_at REAL,
+    last_new_case_at REAL,
+    last_status TEXT
+);
+CREATE TABLE IF NOT EXISTS schedule_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    org TEXT NOT NULL,
+    trigger TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_schedule_runs_org ON schedule_runs(org, started_at);
+"""
+
+
+class CrawlScheduleStore:
+    """SQLite-backed per-org schedule (next run, last run, last new case) and run history."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _conn(self):
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    conn = sqlite3.connect(self.path, timeout=30)
+                    try:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.executescript(_SCHEMA)
+                        conn.commit()
+                    finally:
+                        conn.close()
+                    self._initialized = True
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._conn() as conn:
+            rows = conn.execute("SELECT * FROM schedule ORDER BY next_run_at").fetchall()
+        return [dict(r) for r in rows]
+
+    def add(self, org: str, next_run_at: float, last_new_case_at: Optional[float]) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO schedule (org, next_run_at, last_new_case_at) VALUES (?, ?, ?)",
+                (org, next_run_at, last_new_case_at),
+            )
+
+    def set_next_run(self, org: str, next_run_at: float) -> bool:
+        with self._conn() as conn:
+            cur = conn.execute("UPDATE schedule SET next_run_at = ? WHERE org = ?", (next_run_at, org))
+        return cur.rowcount == 1
+
+    def start_run(self, org: str, trigger: str) -> int:
+        with self._conn() as conn:
+            cur = conn.execute(
+                "INSERT INTO schedule_runs (org, trigger, status, started_at) VALUES (?, ?, ?, ?)",
+                (org, trigger, RUN_RUNNING, time.time()),
+            )
+        return cur.lastrowid
+
+    def finish_run(
+        self,
+        run_id: int,
+        org: str,
+        status: str,
+        next_run_at: float,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        found_new_cases: bool = False,
+    ) -> None:
+        now = time.time()
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "UPDATE schedule_runs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                (status, now, json.dumps(result or {}, ensure_ascii=False), (error or "")[:1000] or None, run_id),
+            )
+            conn.execute(
+                "UPDATE schedule SET last_run_at = ?, last_status = ?, next_run_at = ?, "
+                "last_new_case_at = CASE WHEN ? THEN ? ELSE last_new_case_at END WHERE org = ?",
+                (now, status, next_run_at, found_new_cases, now, org),
+            )
+            conn.execute("COMMIT")
+
+    def interrupt_running(self) -> int:
+        """Mark runs left 'running' by a previous process as interrupted."""
+        with self._conn() as conn:
+            cur = conn.execute(
+                "UPDATE schedule_runs SET status = ?, finished_at = ? WHERE status = ?",
+                (RUN_INTERRUPTED, time.time(), RUN_RUNNING),
+            )
+        return cur.rowcount
+
+    def runs(self, org: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._conn() as conn:
+            if org:
+                rows = conn.execute(
+                    "SELECT * FROM schedule_runs WHERE org = ? ORDER BY id DESC LIMIT ?", (org, limit)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM schedule_runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        runs = []
+        for r in rows:
+            run = dict(r)
+            run["result"] = json.loads(run["result"]) if run["result"] else None
+            runs.append(run)
+        return runs
+
+
+class CrawlScheduler:
+    """Background thread running incremental updates for every org, one at a time.
+
+    Each org runs once per `interval` seconds. New orgs are spread evenly over
+    one interval, most stale first (longest since a new case was found), and
+    keep their slot afterwards, so work is paced instead of arriving in bursts.
+    When several orgs are due (e.g. after downtime) the most stale goes first,
+    and consecutive runs are at least `min_gap` seconds apart.
+
+    run_org(org) does the actual work and returns a result dict; a positive
+    result["newCases"] counts as finding new cases. last_case_at(org) seeds the
+    staleness of orgs seen for the first time (epoch seconds or None).
+    """
+
+    def __init__(
+        self,
+        store: CrawlScheduleStore,
+        orgs: Callable[[], Iterable[str]],
+        run_org: Callable[[str], Dict[str, Any]],
+        last_case_at: Callable[[str], Optional[float]],
+        interval: float,
+        min_gap: float,
+    ):
+        self.store = store
+        self._orgs = orgs
+        self._run_org = run_org
+        self._last_case_at = last_case_at
+        self.interval = max(60.0, interval)
+        self.min_gap = max(0.0, min_gap)
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._manual: Dict[str, float] = {}  # org -> regular slot displaced by run_now
+        self.current: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        interrupted = self.store.interrupt_running()
+        if interrupted:
+            logger.info(f"[crawl-schedule] INTERRUPTED_RUNS count={interrupted}")
+        self._thread = threading.Thread(target=self._loop, name="crawl-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"[crawl-schedule] START interval={self.interval}s min_gap={self.min_gap}s")
+
+    def stop(self) -> None:
+        """Stop after the current org (the thread is a daemon, so shutdown never waits on a crawl)."""
+        self._stopping = True
+        self._wake.set()
+
+    def run_now(self, org: str) -> bool:
+        """Make org due immediately; False if it is not scheduled."""
+        self._sync_orgs()
+        entry = next((e for e in self.store.entries() if e["org"] == org), None)
+        if entry is None:
+            return False
+        self._manual.setdefault(org, entry["next_run_at"])
+        self.store.set_next_run(org, time.time())
+        self._wake.set()
+        return True
+
+    def _sync_orgs(self) -> None:
+        known = {e["org"] for e in self.store.entries()}
+        new_orgs = [org for org in self._orgs() if org not in known]
+        if not new_orgs:
+            return
+        seeded: List[Tuple[str, Optional[float]]] = []
+        for org in new_orgs:
+            try:
+                seeded.append((org, self._last_case_at(org)))
+            except Exception as e:
+                logger.info(f"[crawl-schedule] seed_error org={org} err={e}")
+                seeded.append((org, None))
+        # Most stale first; orgs without any case count as the most stale
+        seeded.sort(key=lambda item: item[1] or 0.0)
+        spacing = self.interval / len(seeded)
+        first = time.time() + self.min_gap
+        for i, (org, last_case) in enumerate(seeded):
+            self.store.add(org, first + i * spacing, last_case)
+        logger.info(f"[crawl-schedule] PLAN orgs={len(seeded)} spacing={round(spacing)}s")
+
+    def _next_due(self) -> Tuple[Optional[Dict[str, Any]], float]:
+        """(most stale due entry, 0) or (None, seconds until the next one)."""
+        entries = self.store.entries()
+        if not entries:
+            return None, self.interval
+        now = time.time()
+        due = [e for e in entries if e["next_run_at"] <= now]
+        if due:
+            return min(due, key=lambda e: e["last_new_case_at"] or 0.0), 0.0
+        return None, min(e["next_run_at"] for e in entries) - now
+
+    def _run_entry(self, entry: Dict[str, Any]) -> None:
+        org = entry["org"]
+        slot = self._manual.pop(org, None)
+        trigger = "manual" if slot is not None else "schedule"
+        run_id = self.store.start_run(org, trigger)
+        self.current = {"org": org, "run_id": run_id, "started_at": time.time()}
+        # A manual run keeps the org's regular slot
+        if slot is not None and slot > time.time():
+            next_run_at = slot
+        else:
+            next_run_at = (slot if slot is not None else entry["next_run_at"]) + self.interval
+        if next_run_at <= time.time():
+            next_run_at = time.time() + self.interval
+        logger.info(f"[crawl-schedule] RUN_START org={org} run={run_id}")
+        t0 = time.time()
+        try:
+            result = self._run_org(org) or {}
+        except Exception as e:
+            logger.error(f"[crawl-schedule] RUN_FAILED org={org} run={run_id} err={e}")
+            self.store.finish_run(run_id, org, RUN_FAILED, next_run_at, error=f"{type(e).__name__}: {e}")
+        else:
+            new_cases = int(result.get("newCases") or 0)
+            self.store.finish_run(run_id, org, RUN_OK, next_run_at, result=result, found_new_cases=new_cases > 0)
+            logger.info(
+                f"[crawl-schedule] RUN_DONE org={org} run={run_id} new_cases={new_cases} elapsed={round(time.time() - t0, 1)}s"
+            )
+        finally:
+            self.current = None
+
+    def _loop(self) -> None:
+        while not self._stopping:
+            try:
+                self._sync_orgs()
+                entry, wait_s = self._next_due()
+            except Exception as e:
+                logger.error(f"[crawl-schedule] LOOP_ERROR err={e}")
+                entry, wait_s = None, self.min_gap or 60
+            if entry is None:
+                # Re-check at least hourly so new orgs and config are picked up
+                self._wake.wait(min(max(wait_s, 1.0), 3600))
+                self._wake.clear()
+                continue
+            self._run_entry(entry)
+            self._wake.wait(self.min_gap)
+            self._wake.clear()
+        logger.info("[crawl-schedule] STOP")
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.time()
+        entries = self.store.entries()
+        for e in entries:
+            e["next_run_in_seconds"] = round(max(0.0, e["next_run_at"] - now))
+        return {
+            "enabled": settings.CRAWL_SCHEDULE_ENABLED,
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "min_gap_seconds": self.min_gap,
+            "current": self.current,
+            "orgs": entries,
+        }
+
+
+crawl_schedule_store = CrawlScheduleStore(settings.CRAWL_SCHEDULE_DB_PATH)
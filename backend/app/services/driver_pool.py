@@ -0,0 +1,192 @@
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class PooledDriver:
+    """Thin proxy over a WebDriver that counts page loads for the recycle policy."""
+
+    def __init__(self, driver: Any, pool_id: int):
+        self._driver = driver
+        self.pool_id = pool_id
+        self.pages = 0
+        self.created_at = time.time()
+
+    def get(self, url: str) -> None:
+        self.pages += 1
+        self._driver.get(url)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._driver, name)
+
+    @property
+    def raw(self) -> Any:
+        return self._driver
+
+
+class DriverPool:
+    """Bounded pool of warm WebDriver instances shared by scraping jobs.
+
+    - acquire() hands out an idle, health-checked driver, launching a new one
+      while below `size`, otherwise waiting for a checkin.
+    - release() resets the browser (cookies, extra windows, about:blank) and
+      returns it to the pool; drivers that fail the reset, or have served
+      `max_pages` page loads, are quit and replaced lazily.
+    - discard() quits a driver the caller knows is broken.
+    """
+
+    def __init__(self, factory: Callable[[], Any], size: int = 2, max_pages: int = 200, acquire_timeout: float = 300):
+        self._factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+        self._cond = threading.Condition()
+        self._idle: List[PooledDriver] = []
+        self._total = 0  # idle + checked out + being launched
+        self._next_id = 1
+        self._closed = False
+        self.counters = {"launched": 0, "recycled": 0, "discarded": 0, "acquired": 0}
+
+    def _launch(self) -> PooledDriver:
+        with self._cond:
+            pool_id = self._next_id
+            self._next_id += 1
+        try:
+            driver = self._factory()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self.counters["launched"] += 1
+        logger.info(f"[driver-pool] LAUNCH id={pool_id} total={self._total}")
+        return PooledDriver(driver, pool_id)
+
+    @staticmethod
+    def _healthy(pd_: PooledDriver) -> bool:
+        try:
+            pd_.raw.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _quit(self, pd_: PooledDriver) -> None:
+        try:
+            pd_.raw.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def prewarm(self, count: Optional[int] = None) -> int:
+        """Launch idle drivers up to count (default: pool size); returns how many were started."""
+        target = min(self.size, count if count is not None else self.size)
+        started = 0
+        while True:
+            with self._cond:
+                if self._closed or self._total >= target:
+                    break
+                self._total += 1
+            pd_ = self._launch()
+            with self._cond:
+                self._idle.append(pd_)
+                self._cond.notify()
+            started += 1
+        return started
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledDriver:
+        """Check out a healthy driver, waiting up to timeout seconds for one to free up."""
+        deadline = time.time() + (self.acquire_timeout if timeout is None else timeout)
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("driver pool is shut down")
+                candidate = None
+                if self._idle:
+                    candidate = self._idle.pop()
+                elif self._total < self.size:
+                    self._total += 1
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError(f"no WebDriver available within {self.acquire_timeout}s")
+                    self._cond.wait(remaining)
+                    continue
+            if candidate is None:
+                pd_ = self._launch()
+            elif self._healthy(candidate):
+                pd_ = candidate
+            else:
+                logger.info(f"[driver-pool] UNHEALTHY id={candidate.pool_id} pages={candidate.pages}")
+                with self._cond:
+                    self.counters["discarded"] += 1
+                self._quit(candidate)
+                continue
+            with self._cond:
+                self.counters["acquired"] += 1
+            return pd_
+
+    def release(self, pd_: Optional[PooledDriver]) -> None:
+        """Return a driver to the pool after resetting it, or recycle it."""
+        if pd_ is None:
+            return
+        if self._closed:
+            self._quit(pd_)
+            return
+        if self.max_pages and pd_.pages >= self.max_pages:
+            logger.info(f"[driver-pool] RECYCLE id={pd_.pool_id} pages={pd_.pages}")
+            with self._cond:
+                self.counters["recycled"] += 1
+            self._quit(pd_)
+            return
+        try:
+            raw = pd_.raw
+            handles = raw.window_handles
+            for handle in handles[1:]:
+                raw.switch_to.window(handle)
+                raw.close()
+            raw.switch_to.window(handles[0])
+            raw.delete_all_cookies()
+            raw.get("about:blank")
+        except Exception as e:
+            logger.info(f"[driver-pool] RESET_FAILED id={pd_.pool_id} err={e}")
+            with self._cond:
+                self.counters["discarded"] += 1
+            self._quit(pd_)
+            return
+        with self._cond:
+            self._idle.append(pd_)
+            self._cond.notify()
+
+    def discard(self, pd_: Optional[PooledDriver]) -> None:
+        """Quit a driver that is known to be broken; a fresh one is launched on demand."""
+        if pd_ is None:
+            return
+        logger.info(f"[driver-pool] DISCARD id={pd_.pool_id} pages={pd_.pages}")
+        with self._cond:
+            self.counters["discarded"] += 1
+        self._quit(pd_)
+
+    def shutdown(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for pd_ in idle:
+            self._quit(pd_)
+        logger.info(f"[driver-pool] SHUTDOWN quit={len(idle)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "total": self._total,
+                "idle": len(self._idle),
+                "in_use": self._total - len(self._idle),
+                "max_pages": self.max_pages,
+                **self.counters,
+            }
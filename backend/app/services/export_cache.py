@@ -0,0 +1,170 @@
+from typing import Dict, Iterable, Optional, Set
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class ExportCache:
+    """Disk-backed, size-bounded LRU cache for export artifacts (e.g. ZIPs).
+
+    Each entry is stored as `<key>.bin` plus a `<key>.json` sidecar holding the
+    download filename and media type. Recency is tracked with the artifact's
+    mtime, which is bumped on every hit, so eviction survives restarts.
+
+    get() and put() pin the entry they return until release(key), so an
+    eviction triggered by another request cannot unlink a file that is still
+    being served; evicting a pinned entry is deferred to its last release.
+    Pins older than pin_ttl (a response that never finished) stop counting.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, pin_ttl: float = 3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.pin_ttl = pin_ttl
+        self._lock = threading.Lock()
+        self._pins: Dict[str, int] = {}
+        self._pinned_at: Dict[str, float] = {}
+        self._doomed: Set[str] = set()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        regions: Optional[Iterable[str]],
+        start: Optional[str],
+        end: Optional[str],
+        datasets: Iterable[str],
+        dataset_etag: str,
+    ) -> str:
+        """Build a stable cache key from normalized filter params and dataset version."""
+        payload = {
+            "regions": sorted(set(regions)) if regions else [],
+            "start": start or "",
+            "end": end or "",
+            "datasets": sorted(set(datasets)),
+            "etag": dataset_etag,
+        }
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return f"{base}.bin", f"{base}.json"
+
+    def _pin_locked(self, key: str) -> None:
+        self._pins[key] = self._pins.get(key, 0) + 1
+        self._pinned_at[key] = time.monotonic()
+
+    def _pinned_locked(self, key: str) -> bool:
+        return key in self._pins and time.monotonic() - self._pinned_at[key] < self.pin_ttl
+
+    def _remove(self, key: str) -> None:
+        for fp in self._paths(key):
+            try:
+                os.remove(fp)
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """Return {"path", "filename", "media_type"} for a cached entry, or None.
+
+        A returned entry is pinned; call release(key) once it has been served.
+        """
+        data_path, meta_path = self._paths(key)
+        with self._lock:
+            if key in self._doomed or not (os.path.exists(data_path) and os.path.exists(meta_path)):
+                return None
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                # Mark as recently used
+                now = time.time()
+                os.utime(data_path, (now, now))
+            except (OSError, ValueError) as e:
+                logger.info(f"[export-cache] read_meta_error key={key} err={e}")
+                return None
+            self._pin_locked(key)
+        return {
+            "path": data_path,
+            "filename": meta.get("filename", f"{key}.bin"),
+            "media_type": meta.get("media_type", "application/octet-stream"),
+        }
+
+    def put(self, key: str, data: bytes, filename: str, media_type: str) -> Dict[str, str]:
+        """Atomically store an artifact, then evict least-recently-used entries.
+
+        The stored entry is pinned like a get(); call release(key) once served.
+        """
+        data_path, meta_path = self._paths(key)
+        tmp_suffix = f".tmp-{uuid.uuid4().hex}"
+        with open(data_path + tmp_suffix, "wb") as f:
+            f.write(data)
+        with open(meta_path + tmp_suffix, "w", encoding="utf-8") as f:
+            json.dump({"filename": filename, "media_type": media_type, "created": time.time()}, f, ensure_ascii=False)
+        with self._lock:
+            os.replace(meta_path + tmp_suffix, meta_path)
+            os.replace(data_path + tmp_suffix, data_path)
+            self._doomed.discard(key)
+            self._pin_locked(key)
+        logger.info(f"[export-cache] STORE key={key} size={len(data)} file={filename}")
+        self._evict()
+        return {"path": data_path, "filename": filename, "media_type": media_type}
+
+    def release(self, key: str) -> None:
+        """Drop a pin taken by get()/put(); unlinks the entry if it was evicted meanwhile."""
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+                return
+            self._pins.pop(key, None)
+            self._pinned_at.pop(key, None)
+            if key not in self._doomed:
+                return
+            self._doomed.discard(key)
+            self._remove(key)
+        logger.info(f"[export-cache] EVICT key={key} deferred=1")
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.directory):
+                if not name.endswith(".bin"):
+                    continue
+                fp = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(fp)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name[:-4]))
+                total += st.st_size
+            if total <= self.max_bytes:
+                return
+            # Oldest first
+            entries.sort()
+            for _, size, key in entries:
+                if total <= self.max_bytes:
+                    break
+                if key in self._doomed:
+                    total -= size
+                    continue
+                if self._pinned_locked(key):
+                    # Still being served: its last release() unlinks it
+                    self._doomed.add(key)
+                    total -= size
+                    logger.info(f"[export-cache] EVICT_DEFERRED key={key} size={size}")
+                    continue
+                self._remove(key)
+                total -= size
+                logger.info(f"[export-cache] EVICT key={key} size={size}")
+
+
+export_cache = ExportCache(settings.EXPORT_CACHE_DIR, settings.EXPORT_CACHE_MAX_BYTES)
@@ -0,0 +1,302 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+import socket
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class _HostState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ip: Optional[str] = None
+        self.dns_expires = 0.0
+        self.reachable: Optional[bool] = None
+        self.reach_expires = 0.0
+        self.needs_https = False
+        self.breaker = CLOSED
+        self.failures = 0  # consecutive
+        self.open_until = 0.0
+        self.trial_in_flight = False
+        self.last_error: Optional[str] = None
+
+
+class HostHealthRegistry:
+    """Per-host DNS/reachability cache with a circuit breaker.
+
+    - DNS answers are cached for dns_ttl; reachability probes (TCP connect)
+      for reach_ttl when the host is up and negative_ttl when it is down.
+      Concurrent checks of the same host wait for one probe.
+    - A plain-HTTP host whose port 80 is closed but 443 answers is remembered
+      as needing HTTPS; preferred_url() rewrites its links.
+    - After breaker_threshold consecutive failures (probes or page loads
+      reported via record_failure) the breaker opens and the host is skipped
+      for breaker_cooldown seconds; then a single trial request is let
+      through (half-open) and its outcome closes or re-opens the breaker.
+    - listener, when set, is told every recorded outcome; apply() replays
+      one, so the scrape worker process can mirror its findings into the API.
+    """
+
+    def __init__(
+        self,
+        dns_ttl: float = 600,
+        reach_ttl: float = 300,
+        negative_ttl: float = 60,
+        connect_timeout: float = 10,
+        breaker_threshold: int = 5,
+        breaker_cooldown: float = 300,
+    ):
+        self.dns_ttl = dns_ttl
+        self.reach_ttl = reach_ttl
+        self.negative_ttl = negative_ttl
+        self.connect_timeout = connect_timeout
+        self.breaker_threshold = max(1, breaker_threshold)
+        self.breaker_cooldown = breaker_cooldown
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+        self.counters = {"probes": 0, "cache_hits": 0, "rejected": 0, "trips": 0}
+        # listener(kind, url, error) for "success" / "failure" / "https" outcomes, e.g. to mirror them in another process
+        self.listener: Optional[Callable[[str, str, str], None]] = None
+
+    def _notify(self, kind: str, url: str, error: str = "") -> None:
+        if self.listener is not None:
+            try:
+                self.listener(kind, url, error)
+            except Exception as e:
+                logger.info(f"[host-health] listener_error kind={kind} err={e}")
+
+    def apply(self, kind: str, url: str, error: str = "") -> None:
+        """Replay an outcome observed elsewhere (see listener)."""
+        if kind == "success":
+            self.record_success(url)
+        elif kind == "failure":
+            self.record_failure(url, error)
+        elif kind == "https":
+            self.mark_https(url)
+
+    def _state(self, host: str) -> _HostState:
+        with self._lock:
+            st = self._hosts.get(host)
+            if st is None:
+                st = _HostState()
+                self._hosts[host] = st
+            return st
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    # Circuit breaker
+
+    def _allow_locked(self, st: _HostState, now: float) -> bool:
+        if st.breaker == OPEN:
+            if now < st.open_until:
+                return False
+            st.breaker = HALF_OPEN
+            st.trial_in_flight = False
+        if st.breaker == HALF_OPEN:
+            if st.trial_in_flight:
+                return False
+            st.trial_in_flight = True
+        return True
+
+    def _open_locked(self, st: _HostState, now: float) -> bool:
+        """Whether the breaker still rejects the host; unlike _allow_locked it takes no trial."""
+        return st.breaker == OPEN and now < st.open_until
+
+    def _success_locked(self, st: _HostState) -> None:
+        st.failures = 0
+        st.breaker = CLOSED
+        st.trial_in_flight = False
+        st.last_error = None
+
+    def _failure_locked(self, host: str, st: _HostState, error: str) -> None:
+        st.failures += 1
+        st.last_error = error[:300]
+        st.trial_in_flight = False
+        if st.breaker == HALF_OPEN or (st.breaker == CLOSED and st.failures >= self.breaker_threshold):
+            st.breaker = OPEN
+            st.open_until = time.monotonic() + self.breaker_cooldown
+            # Probe afresh once the cooldown is over
+            st.reach_expires = 0.0
+            self._count("trips")
+            logger.warning(f"[host-health] BREAKER_OPEN host={host} failures={st.failures} cooldown={self.breaker_cooldown}s err={st.last_error}")
+
+    def allow(self, url: str) -> bool:
+        """False while the host's breaker is open (or a half-open trial is already running)."""
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            return False
+        st = self._state(host)
+        with st.lock:
+            allowed = self._allow_locked(st, time.monotonic())
+        if not allowed:
+            self._count("rejected")
+        return allowed
+
+    def release(self, url: str) -> None:
+        """Give back a half-open trial taken by allow() whose request was never sent."""
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            return
+        st = self._state(host)
+        with st.lock:
+            if st.breaker == HALF_OPEN:
+                st.trial_in_flight = False
+
+    def record_success(self, url: str) -> None:
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            return
+        st = self._state(host)
+        with st.lock:
+            if st.breaker != CLOSED:
+                logger.info(f"[host-health] BREAKER_CLOSED host={host}")
+            self._success_locked(st)
+        self._notify("success", url)
+
+    def record_failure(self, url: str, error: str = "") -> None:
+        host = (urlparse(url).hostname or "").lower()
+        if not host:
+            return
+        st = self._state(host)
+        with st.lock:
+            self._failure_locked(host, st, error)
+        self._notify("failure", url, error)
+
+    # Resolution and reachability
+
+    def _resolve_locked(self, host: str, st: _HostState, now: float) -> str:
+        if st.ip and now < st.dns_expires:
+            return st.ip
+        st.ip = socket.gethostbyname(host)
+        st.dns_expires = now + self.dns_ttl
+        logger.info(f"[host-health] HOSTNAME_RESOLVED hostname={host} ip={st.ip}")
+        return st.ip
+
+    def _connect(self, ip: str, port: int) -> Optional[str]:
+        """None if a TCP connection succeeds, else the error."""
+        try:
+            with socket.create_connection((ip, port), timeout=self.connect_timeout):
+                return None
+        except OSError as e:
+            return f"{type(e).__name__}: {e}"
+
+    def _probe_locked(self, host: str, st: _HostState, url_port: Optional[int], scheme: str) -> Tuple[bool, str]:
+        self._count("probes")
+        try:
+            ip = self._resolve_locked(host, st, time.monotonic())
+        except (socket.gaierror, UnicodeError) as e:
+            return False, f"dns: {e}"
+        if url_port:
+            ports = [url_port]
+        elif scheme == "https" or st.needs_https:
+            ports = [443]
+        else:
+            ports = [80, 443]
+        err = ""
+        for port in ports:
+            err = self._connect(ip, port) or ""
+            if not err:
+                if scheme == "http" and port == 443 and not url_port and not st.needs_https:
+                    st.needs_https = True
+                    logger.info(f"[host-health] HTTPS_ONLY hostname={host}")
+                logger.info(f"[host-health] CONNECTION_SUCCESS hostname={host} port={port}")
+                return True, ""
+            logger.warning(f"[host-health] CONNECTION_FAILED hostname={host} port={port} err={err}")
+        return False, err
+
+    def check(self, url: str) -> bool:
+        """Whether url's host resolves and accepts connections, using cached results within their TTL.
+
+        Rejects the host while its breaker is open, but does not take the
+        half-open trial: a caller that already passed allow() holds it, and
+        the probe's outcome closes or re-opens the breaker either way.
+        """
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        if not host:
+            return False
+        try:
+            url_port = parsed.port
+        except ValueError:
+            return False
+        st = self._state(host)
+        with st.lock:
+            now = time.monotonic()
+            if self._open_locked(st, now):
+                self._count("rejected")
+                return False
+            if st.breaker == CLOSED and st.reachable is not None and now < st.reach_expires:
+                self._count("cache_hits")
+                return st.reachable
+            needed_https = st.needs_https
+            ok, err = self._probe_locked(host, st, url_port, parsed.scheme)
+            st.reachable = ok
+            st.reach_expires = time.monotonic() + (self.reach_ttl if ok else self.negative_ttl)
+            if ok:
+                self._success_locked(st)
+            else:
+                self._failure_locked(host, st, err)
+            learned_https = st.needs_https and not needed_https
+        if learned_https:
+            self._notify("https", url)
+        self._notify("success" if ok else "failure", url, err)
+        return ok
+
+    def preferred_url(self, url: str) -> str:
+        """url with http upgraded to https when the host is known to need it."""
+        if not url.startswith("http://"):
+            return url
+        host = (urlparse(url).hostname or "").lower()
+        with self._lock:
+            st = self._hosts.get(host)
+        if st is not None and st.needs_https:
+            return "https://" + url[len("http://"):]
+        return url
+
+    def mark_https(self, url: str) -> None:
+        """Remember that url's host only answers over HTTPS."""
+        host = (urlparse(url).hostname or "").lower()
+        if host:
+            st = self._state(host)
+            with st.lock:
+                st.needs_https = True
+            self._notify("https", url)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._hosts.items())
+            counters = dict(self.counters)
+        hosts = {}
+        for host, st in items:
+            hosts[host] = {
+                "ip": st.ip,
+                "reachable": st.reachable,
+                "needs_https": st.needs_https,
+                "breaker": st.breaker,
+                "consecutive_failures": st.failures,
+                "open_for_seconds": round(max(0.0, st.open_until - now), 1) if st.breaker == OPEN else 0,
+                "last_error": st.last_error,
+            }
+        return {**counters, "hosts": hosts}
+
+
+host_health = HostHealthRegistry(
+    dns_ttl=settings.HOST_DNS_TTL_SECONDS,
+    reach_ttl=settings.HOST_REACHABILITY_TTL_SECONDS,
+    negative_ttl=settings.HOST_NEGATIVE_TTL_SECONDS,
+    connect_timeout=settings.HOST_CONNECT_TIMEOUT_SECONDS,
+    breaker_threshold=settings.HOST_BREAKER_THRESHOLD,
+    breaker_cooldown=settings.HOST_BREAKER_COOLDOWN_SECONDS,
+)
@@ -0,0 +1,194 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import gzip
+import hashlib
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Page kinds
+LIST_PAGE = "list"
+DETAIL_PAGE = "detail"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetches (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    org TEXT NOT NULL,
+    url TEXT NOT NULL,
+    final_url TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    is_text INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fetches_kind_org ON fetches(kind, org, url);
+"""
+
+
+class HtmlArchive:
+    """Compressed, content-addressed archive of fetched list and detail pages.
+
+    Bodies are gzip blobs under objects/<sha[:2]>/<sha>.html.gz, keyed by the
+    SHA-256 of the raw body, so a page fetched again unchanged costs one index
+    row. The SQLite index records every fetch (kind, org index, requested and
+    final URL, time), like the request/response records of a WARC file.
+
+    Sources are stored exactly as they were handed to the parser: text as
+    UTF-8 (is_text=1), or raw bytes when the parser had to honour a <meta>
+    charset, so a re-parse sees the same input as the original run.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.path = os.path.join(root, "index.sqlite3")
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _conn(self):
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    os.makedirs(self.root, exist_ok=True)
+                    conn = sqlite3.connect(self.path, timeout=30)
+                    try:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        conn.executescript(_SCHEMA)
+                        conn.commit()
+                    finally:
+                        conn.close()
+                    self._initialized = True
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def blob_path(self, sha: str) -> str:
+        return os.path.join(self.root, "objects", sha[:2], f"{sha}.html.gz")
+
+    def store(self, kind: str, org: str, url: str, final_url: str, source: Union[str, bytes]) -> Optional[str]:
+        """Archive one fetched page; returns its digest (None if archiving failed).
+
+        Never raises: a full disk must not fail the crawl that produced the page.
+        """
+        is_text = isinstance(source, str)
+        data = source.encode("utf-8") if is_text else bytes(source)
+        sha = hashlib.sha256(data).hexdigest()
+        try:
+            path = self.blob_path(sha)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with gzip.open(tmp, "wb", compresslevel=6) as fh:
+                    fh.write(data)
+                os.replace(tmp, path)
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT INTO fetches (kind, org, url, final_url, sha256, is_text, size, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (kind, org or "", url, final_url or url, sha, int(is_text), len(data), time.time()),
+                )
+        except (OSError, sqlite3.Error) as e:
+            logger.info(f"[html-archive] store_error url={url} err={e}")
+            return None
+        return sha
+
+    def latest(self, kind: str, orgs: Optional[Sequence[str]] = None, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Newest fetch per (org, url) of a kind, oldest first."""
+        where = ["kind = ?"]
+        params: List[Any] = [kind]
+        if orgs:
+            where.append(f"org IN ({','.join('?' * len(orgs))})")
+            params.extend(orgs)
+        if since:
+            where.append("fetched_at >= ?")
+            params.append(since)
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT f.* FROM fetches f JOIN ("
+                f"SELECT MAX(id) AS id FROM fetches WHERE {' AND '.join(where)} GROUP BY org, url"
+                ") latest ON latest.id = f.id ORDER BY f.id",
+                params,
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT kind, COUNT(*) AS fetches, COUNT(DISTINCT url) AS urls, COUNT(DISTINCT sha256) AS blobs, "
+                "SUM(size) AS raw_bytes FROM fetches GROUP BY kind"
+            ).fetchall()
+        return {"root": self.root, "kinds": {r["kind"]: {k: r[k] for k in r.keys() if k != "kind"} for r in rows}}
+
+
+def load_source(root: str, sha: str, is_text: bool) -> Union[str, bytes]:
+    with gzip.open(os.path.join(root, "objects", sha[:2], f"{sha}.html.gz"), "rb") as fh:
+        data = fh.read()
+    return data.decode("utf-8") if is_text else data
+
+
+def _reparse_one(task: Tuple[str, str, str, str, str, str, bool]) -> Tuple[str, str, Any, Optional[str]]:
+    """Worker: re-run extraction on one archived page -> (org, url, result, error)."""
+    # Imported in the worker so spawned processes only load the parser
+    from app.services.pboc_parser import parse_detail_page, parse_list_page
+
+    root, kind, org, url, sha, final_url, is_text = task
+    zongbu = org == "zongbu"
+    try:
+        source = load_source(root, sha, is_text)
+        if kind == LIST_PAGE:
+            return org, url, parse_list_page(source, final_url, zongbu), None
+        return org, url, parse_detail_page(source, final_url, zongbu), None
+    except Exception as e:
+        return org, url, None, f"{type(e).__name__}: {e}"
+
+
+def reparse(
+    archive: HtmlArchive,
+    kind: str,
+    orgs: Optional[Sequence[str]] = None,
+    since: Optional[float] = None,
+    workers: int = 0,
+) -> Iterator[Tuple[str, str, Any, Optional[str]]]:
+    """Re-run the current extraction over the newest archived copy of every page.
+
+    Pages are parsed in a process pool (workers=0: one per core) and yielded
+    as (org, url, result, error) in archive order; result is what
+    parse_list_page / parse_detail_page returns for the page today.
+    """
+    entries = archive.latest(kind, orgs, since)
+    if not entries:
+        return
+    tasks = [(archive.root, kind, e["org"], e["url"], e["sha256"], e["final_url"], bool(e["is_text"])) for e in entries]
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    # A spawned worker costs about a second of imports; small batches stay in-process
+    workers = max(1, min(workers or cores, len(tasks) // 50))
+    logger.info(f"[html-archive] REPARSE_START kind={kind} pages={len(tasks)} workers={workers}")
+    t0 = time.time()
+    if workers == 1:
+        yield from map(_reparse_one, tasks)
+    else:
+        # spawn: the server process runs threads, which fork would copy mid-state
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            yield from pool.map(_reparse_one, tasks, chunksize=max(1, min(64, len(tasks) // (workers * 4))))
+    logger.info(f"[html-archive] REPARSE_DONE kind={kind} pages={len(tasks)} elapsed={round(time.time() - t0, 2)}s")
+
+
+html_archive = HtmlArchive(settings.HTML_ARCHIVE_PATH)
+
+
+def archive_page(kind: str, org: str, url: str, final_url: str, source: Union[str, bytes]) -> None:
+    if settings.HTML_ARCHIVE_ENABLED:
+        html_archive.store(kind, org, url, final_url, source)
@@ -0,0 +1,209 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import threading
+import time
+
+from app.core.config import settings
+from app.services.progress_bus import SCRAPE, Subscription, progress_bus, topic_of
+
+logger = logging.getLogger("uvicorn.error")
+
+# Run states
+RUN_RUNNING = "running"
+RUN_COMPLETED = "completed"
+RUN_CANCELLED = "cancelled"
+RUN_FAILED = "failed"
+
+# Finished runs kept for clients that re-attach late
+_KEEP_FINISHED = 50
+
+
+class JobRun:
+    """One in-process execution of a crawl job, with its live progress and listeners.
+
+    Progress dicts ({'type': 'progress' | 'completed' | 'cancelled' |
+    'error', ...}) are published on the progress bus topic "scrape:<job_id>";
+    a new subscriber first receives the latest one, so re-attaching resumes
+    the stream. With cancel_on_detach, losing the last subscriber cancels the
+    run after grace seconds unless a client re-attaches in the meantime; the
+    timer is armed from the start, so a client that leaves before its stream
+    ever subscribed also stops the run.
+    """
+
+    def __init__(self, job_id: str, org: str, cancel_on_detach: bool, grace: float):
+        self.job_id = job_id
+        self.org = org
+        self.cancel_on_detach = cancel_on_detach
+        self.grace = grace
+        self.cancel = threading.Event()
+        self.state = RUN_RUNNING
+        self.finished = 0
+        self.total = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.started_at = time.time()
+        self.ended_at: Optional[float] = None
+        self.topic = topic_of(SCRAPE, job_id)
+        self._lock = threading.Lock()
+        self._detach_timer: Optional[threading.Timer] = None
+        self._attached = False
+        # Replaces the final event of an earlier run of the same job
+        progress_bus.publish(self.topic, {"type": "start", "job_id": job_id, "org": org})
+        progress_bus.watch(self.topic, self._on_subscribers)
+        if cancel_on_detach and not progress_bus.subscriber_count(self.topic):
+            with self._lock:
+                self._arm_detach_timer()
+
+    @property
+    def done(self) -> bool:
+        return self.state != RUN_RUNNING
+
+    def _publish(self, event: Dict[str, Any]) -> None:
+        progress_bus.publish(self.topic, event)
+
+    def progress(self, finished: int, total: int) -> None:
+        self.finished, self.total = finished, total
+        percent = round((finished / total) * 100, 1) if total else 100
+        self._publish({
+            "type": "progress",
+            "current_link": finished,
+            "total_links": total,
+            "progress_percent": percent,
+            "message": f"已处理第 {finished}/{total} 个链接 ({percent}%)",
+        })
+
+    def finish(self, result: Any = None, error: Optional[str] = None) -> None:
+        self.result, self.error = result, error
+        self.ended_at = time.time()
+        if error is not None:
+            self.state = RUN_FAILED
+            self._publish({"type": "error", "error": error})
+        elif self.cancel.is_set():
+            self.state = RUN_CANCELLED
+            self._publish({"type": "cancelled", "current_link": self.finished, "total_links": self.total})
+        else:
+            self.state = RUN_COMPLETED
+            download_count, table_count = result or (0, 0)
+            self._publish({
+                "type": "completed",
+                "download_count": download_count,
+                "table_count": table_count,
+                "total_links": self.total,
+                "progress_percent": 100,
+            })
+        progress_bus.watch(self.topic, None)
+        with self._lock:
+            if self._detach_timer is not None:
+                self._detach_timer.cancel()
+                self._detach_timer = None
+
+    def subscribe(self) -> Subscription:
+        """Listen to this run's progress (call on the event loop)."""
+        return progress_bus.subscribe(self.topic)
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        sub.close()
+
+    def _arm_detach_timer(self) -> bool:
+        # Caller holds self._lock
+        if self.done or not self.cancel_on_detach or self._detach_timer is not None:
+            return False
+        self._detach_timer = threading.Timer(self.grace, self._cancel_detached)
+        self._detach_timer.daemon = True
+        self._detach_timer.start()
+        return True
+
+    def _on_subscribers(self, count: int) -> None:
+        with self._lock:
+            if count:
+                if self._detach_timer is not None:
+                    self._detach_timer.cancel()
+                    self._detach_timer = None
+                    if self._attached:
+                        logger.info(f"[job-runs] REATTACH job={self.job_id} org={self.org}")
+                self._attached = True
+                return
+            if not self._arm_detach_timer():
+                return
+        logger.info(f"[job-runs] DETACHED job={self.job_id} org={self.org} cancel_in={self.grace}s")
+
+    def _cancel_detached(self) -> None:
+        with self._lock:
+            self._detach_timer = None
+            if progress_bus.subscriber_count(self.topic) or self.done:
+                return
+        logger.info(f"[job-runs] CANCEL job={self.job_id} org={self.org} reason=no_subscribers progress={self.finished}/{self.total}")
+        self.cancel.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        subscribers = progress_bus.subscriber_count(self.topic)
+        return {
+            "jobId": self.job_id,
+            "org": self.org,
+            "state": self.state,
+            "finished": self.finished,
+            "total": self.total,
+            "subscribers": subscribers,
+            "cancelRequested": self.cancel.is_set(),
+            "error": self.error,
+            "startedAt": self.started_at,
+            "endedAt": self.ended_at,
+        }
+
+
+class JobRunRegistry:
+    """Crawl job runs of this process, by job id.
+
+    start() runs target(run) on a daemon thread, or returns the job's run if
+    one is already active, so two requests for the same job share a single
+    execution instead of racing for its leases.
+    """
+
+    def __init__(self, grace: float):
+        self.grace = grace
+        self._lock = threading.Lock()
+        self._runs: "OrderedDict[str, JobRun]" = OrderedDict()
+
+    def start(self, job_id: str, org: str, target: Callable[[JobRun], Any], cancel_on_detach: bool = False) -> JobRun:
+        with self._lock:
+            run = self._runs.get(job_id)
+            if run is not None and not run.done:
+                return run
+            run = JobRun(job_id, org, cancel_on_detach, self.grace)
+            self._runs[job_id] = run
+            self._runs.move_to_end(job_id)
+            finished = [jid for jid, r in self._runs.items() if r.done]
+            for jid in finished[: max(0, len(finished) - _KEEP_FINISHED)]:
+                del self._runs[jid]
+
+        def runner() -> None:
+            try:
+                result = target(run)
+            except Exception as e:
+                logger.error(f"[job-runs] ERROR job={job_id} org={org} error_type={type(e).__name__} err={e}")
+                run.finish(error=str(e))
+            else:
+                run.finish(result=result)
+
+        threading.Thread(target=runner, name=f"crawl-job-{job_id[:8]}", daemon=True).start()
+        return run
+
+    def get(self, job_id: str) -> Optional[JobRun]:
+        with self._lock:
+            return self._runs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        run = self.get(job_id)
+        if run is None or run.done:
+            return False
+        run.cancel.set()
+        return True
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            runs = list(self._runs.values())
+        return [run.snapshot() for run in reversed(runs)]
+
+
+job_runs = JobRunRegistry(settings.SCRAPE_DETACH_GRACE_SECONDS)
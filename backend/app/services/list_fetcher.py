@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional, Union
+import asyncio
+import logging
+import re
+import time
+
+import httpx
+import pandas as pd
+
+from app.core.config import settings
+from app.services.html_archive import LIST_PAGE, archive_page
+from app.services.page_cache import PageCacheBatch, content_hash
+from app.services.pboc_parser import ListPageParseError, parse_list_page
+from app.services.rate_limit import HostRateLimiter
+
+logger = logging.getLogger("uvicorn.error")
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+}
+
+# Result marker for pages whose content is unchanged since the last committed run
+NOT_MODIFIED = "not_modified"
+
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset", re.IGNORECASE)
+
+
+def _page_source(resp: httpx.Response) -> Union[str, bytes]:
+    """Pick the decoding the browser would: HTTP charset, then <meta> charset, then UTF-8."""
+    if resp.charset_encoding:
+        return resp.text
+    if _META_CHARSET_RE.search(resp.content[:4096]):
+        return resp.content  # lxml honours the meta declaration on bytes
+    return resp.content.decode("utf-8", errors="replace")
+
+
+async def _fetch_one(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    url: str,
+    zongbu: bool,
+    cache_batch: Optional[PageCacheBatch] = None,
+    org: str = "",
+    limiter: Optional[HostRateLimiter] = None,
+):
+    """Fetch and parse one list page.
+
+    Returns a DataFrame, NOT_MODIFIED when the page is unchanged (304 or same
+    content hash; not parsed), or None when the page needs the browser.
+    """
+    cached = cache_batch.get(url) if cache_batch is not None else None
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+    async with sem:
+        t0 = time.monotonic()
+        try:
+            resp = await client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            if limiter is not None:
+                limiter.record(url, time.monotonic() - t0, ok=False)
+            logger.info(f"[list-fetch] http_error url={url} err={e}")
+            return None
+    if limiter is not None:
+        # Errors and 429/5xx statuses slow the host down for the browser fallback and detail pages
+        limiter.record(url, time.monotonic() - t0, ok=True, status=resp.status_code)
+    if resp.status_code == 304 and cached:
+        logger.info(f"[list-fetch] not_modified url={url}")
+        cache_batch.mark_unchanged(url)
+        return NOT_MODIFIED
+    # Anti-bot challenges answer with 202/412 and a JS payload instead of the list
+    if resp.status_code != 200:
+        logger.info(f"[list-fetch] fallback url={url} status={resp.status_code}")
+        return None
+    digest = content_hash(resp.content)
+    if cached and cached.get("content_hash") == digest:
+        logger.info(f"[list-fetch] unchanged url={url} hash={digest[:12]}")
+        cache_batch.mark_unchanged(url)
+        return NOT_MODIFIED
+    source = _page_source(resp)
+    await asyncio.to_thread(archive_page, LIST_PAGE, org, url, str(resp.url), source)
+    try:
+        df = parse_list_page(source, str(resp.url), zongbu)
+    except (ListPageParseError, ValueError) as e:
+        logger.info(f"[list-fetch] fallback url={url} parse_error={e}")
+        return None
+    if df.empty:
+        # Rows rendered by JS (or an interstitial page) look like an empty list
+        logger.info(f"[list-fetch] fallback url={url} reason=no_rows")
+        return None
+    logger.info(f"[list-fetch] page_ok url={url} items={len(df)}")
+    if cache_batch is not None:
+        cache_batch.stage(
+            url,
+            etag=resp.headers.get("etag"),
+            last_modified=resp.headers.get("last-modified"),
+            content_hash=digest,
+        )
+    return df
+
+
+async def fetch_list_pages(
+    urls: List[str],
+    zongbu: bool,
+    cache_batch: Optional[PageCacheBatch] = None,
+    org: str = "",
+    limiter: Optional[HostRateLimiter] = None,
+) -> Dict[str, Union[pd.DataFrame, str, None]]:
+    """Fetch list pages concurrently over plain HTTP and parse them with lxml.
+
+    Returns {url: DataFrame, NOT_MODIFIED or None}; None marks pages that must
+    be retried with Selenium (non-200, anti-bot interstitial, JS-rendered or
+    unparseable). With a cache batch, conditional requests are sent and
+    unchanged pages are neither parsed nor returned as rows. Changed pages are
+    archived under org (the org index) for offline re-parsing. Each response
+    (time taken, HTTP status) is reported to limiter to pace its host.
+    """
+    if not urls:
+        return {}
+    sem = asyncio.Semaphore(max(1, settings.LIST_FETCH_CONCURRENCY))
+    timeout = httpx.Timeout(settings.LIST_FETCH_TIMEOUT_SECONDS)
+    async with httpx.AsyncClient(
+        headers=DEFAULT_HEADERS, timeout=timeout, follow_redirects=True, verify=False
+    ) as client:
+        results = await asyncio.gather(*[_fetch_one(client, sem, url, zongbu, cache_batch, org, limiter) for url in urls])
+    return dict(zip(urls, results))
+
+
+def fetch_list_pages_sync(
+    urls: List[str],
+    zongbu: bool,
+    cache_batch: Optional[PageCacheBatch] = None,
+    org: str = "",
+    limiter: Optional[HostRateLimiter] = None,
+) -> Dict[str, Union[pd.DataFrame, str, None]]:
+    """Blocking wrapper for worker threads (must not be called on the event loop thread)."""
+    return asyncio.run(fetch_list_pages(urls, zongbu, cache_batch, org, limiter))
@@ -0,0 +1,121 @@
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def rows_hash(df: pd.DataFrame) -> str:
+    """Hash of parsed list rows; used where raw bytes are not comparable (browser path)."""
+    cols = [c for c in ["name", "date", "link", "sum"] if c in df.columns]
+    return content_hash(df[cols].to_csv(index=False).encode("utf-8"))
+
+
+class ListPageCache:
+    """Persistent per-URL validators for list pages (ETag, Last-Modified, content hash).
+
+    Entries are staged in a batch while a run fetches pages and only written
+    once the caller has saved the scraped rows (batch.commit()). A run that
+    fails midway therefore never marks pages as seen whose rows were not
+    persisted.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f).get("pages", {})
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                logger.info(f"[page-cache] load_error path={self.path} err={e}")
+                self._entries = {}
+        return self._entries
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._load().get(url)
+            return dict(entry) if entry else None
+
+    def _write(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            entries = self._load()
+            for url, entry in updates.items():
+                merged = dict(entries.get(url) or {})
+                merged.update(entry)
+                entries[url] = merged
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp-{uuid.uuid4().hex}"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"pages": entries}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+    def batch(self) -> "PageCacheBatch":
+        return PageCacheBatch(self)
+
+
+class PageCacheBatch:
+    """Validators observed during one run, persisted together on commit()."""
+
+    def __init__(self, cache: ListPageCache):
+        self.cache = cache
+        self._staged: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.unchanged = 0
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(url)
+
+    def stage(self, url: str, **fields: Any) -> None:
+        fields["checked_at"] = time.time()
+        with self._lock:
+            self._staged.setdefault(url, {}).update(fields)
+
+    def mark_unchanged(self, url: str) -> None:
+        with self._lock:
+            self.unchanged += 1
+        self.stage(url)
+
+    def scratch(self) -> "PageCacheBatch":
+        """Empty batch on the same cache, for pages whose rows may not all be kept."""
+        return PageCacheBatch(self.cache)
+
+    def adopt(self, other: "PageCacheBatch", urls) -> int:
+        """Take over other's staged validators for urls; the rest of other is dropped."""
+        urls = set(urls)
+        with other._lock:
+            taken = {url: fields for url, fields in other._staged.items() if url in urls}
+            unchanged, other._staged, other.unchanged = other.unchanged, {}, 0
+        with self._lock:
+            for url, fields in taken.items():
+                self._staged.setdefault(url, {}).update(fields)
+            self.unchanged += unchanged
+        return len(taken)
+
+    def commit(self) -> int:
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        if staged:
+            self.cache._write(staged)
+        return len(staged)
+
+
+list_page_cache = ListPageCache(settings.LIST_PAGE_CACHE_PATH)
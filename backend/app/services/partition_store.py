@@ -0,0 +1,453 @@
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.dataset import DATASET_PREFIXES, list_dataset_files
+
+logger = logging.getLogger("uvicorn.error")
+
+# Flat CSV shards written by the scrapers (relative to backend/)
+PBOC_DATA_PATH = "../pboc"
+
+REGION_KEY = "区域"
+MONTH_KEY = "ym"
+UNKNOWN = "__unknown__"
+_MANIFEST = "_manifest.json"
+# Placement keys of every ingested shard, kept next to the manifest and extended per ingest
+_LINK_KEYS = "_link_keys.csv"
+_UID_KEYS = "_uid_keys.csv"
+
+
+def _read_shard(fp: str, usecols=None) -> pd.DataFrame:
+    """Read a flat shard as strings, dropping the legacy unnamed index column."""
+    df = pd.read_csv(fp, dtype=str, low_memory=False, usecols=usecols)
+    if len(df.columns) > 0 and (str(df.columns[0]).startswith("Unnamed: 0") or df.columns[0] == ""):
+        df = df.drop(columns=[df.columns[0]])
+    return df
+
+
+def _month_of(df: pd.DataFrame) -> pd.Series:
+    """Year-month partition value from 发布日期/date (same preference as the exporters)."""
+    for col in ["发布日期", "date"]:
+        if col in df.columns:
+            dt = pd.to_datetime(df[col], errors="coerce")
+            return dt.dt.strftime("%Y-%m").fillna(UNKNOWN)
+    return pd.Series([UNKNOWN] * len(df), index=df.index)
+
+
+def _clean_region(values: pd.Series) -> pd.Series:
+    out = values.fillna(UNKNOWN).astype(str).str.strip()
+    out = out.str.replace(os.sep, "_", regex=False).str.replace("=", "_", regex=False)
+    return out.where(out != "", UNKNOWN)
+
+
+def _merge_keys(old: pd.DataFrame, new: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Append new key rows; an existing key keeps its first mapping, as in a full scan."""
+    if new.empty:
+        return old
+    if old.empty:
+        return new.reset_index(drop=True)
+    return pd.concat([old, new], ignore_index=True).drop_duplicates(subset=[key], keep="first")
+
+
+def _month_bound(value) -> Optional[str]:
+    if value is None or value == "":
+        return None
+    try:
+        return pd.Timestamp(value).strftime("%Y-%m")
+    except Exception:
+        return None
+
+
+class _ReadWriteLock:
+    """Many readers or one writer; waiting writers hold off new readers."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def reading(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+class PartitionedStore:
+    """Hive-style partitioned copy of the PBOC CSV shards.
+
+    Layout: `<root>/<dataset>/区域=<org>/ym=<YYYY-MM>/part-<shard>.csv`.
+
+    - pbocsum is partitioned by its own 区域 and publish month.
+    - pbocdtl inherits 区域/month from the pbocsum row sharing its link.
+    - pboccat inherits them through uid -> pbocdtl.link (or id as link).
+    Rows that cannot be placed go to `区域=__unknown__` and are re-homed when
+    new pbocsum shards arrive.
+
+    The flat shards remain the source of truth; `sync()` ingests new shards
+    incrementally and rebuilds everything if a shard was modified or removed.
+    The link -> 区域/month and uid -> link maps used for placement are stored
+    with the layout and extended with each ingest, so a new shard only reads
+    its own key columns. Readers never see a half-written layout: in-place
+    ingests and the swap of a rebuilt root happen under the write side of a
+    read/write lock, and `load()` reads under its read side.
+
+    `load()` never syncs itself: the startup warm-up syncs, writers of new
+    shards call `request_sync()`, and a load finding the last sync older than
+    sync_interval seconds requests one in the background.
+    """
+
+    def __init__(self, source_path: str, root: str, sync_interval: float = 300):
+        self.source_path = source_path
+        self.root = root
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._rw = _ReadWriteLock()
+        # (link map, uid map) of the current root once read
+        self._keys: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+        self._synced_at: Optional[float] = None
+        self._sync_state = threading.Lock()
+        self._sync_thread: Optional[threading.Thread] = None
+        self._sync_again = False
+
+    # ---------------------------------------------------------------- layout
+    def _partition_dir(self, root: str, dataset: str, region: str, month: str) -> str:
+        return os.path.join(root, dataset, f"{REGION_KEY}={region}", f"{MONTH_KEY}={month}")
+
+    def _part_name(self, fp: str) -> str:
+        rel = os.path.relpath(fp, self.source_path)
+        stem = os.path.splitext(os.path.basename(fp))[0]
+        return f"{stem}-{hashlib.sha1(rel.encode('utf-8')).hexdigest()[:8]}"
+
+    def _write_partitions(self, root: str, dataset: str, df: pd.DataFrame,
+                          regions: pd.Series, months: pd.Series, part_name: str) -> int:
+        if df.empty:
+            return 0
+        keys = pd.DataFrame({"r": regions.values, "m": months.values}, index=df.index)
+        written = 0
+        for (region, month), idx in keys.groupby(["r", "m"]).groups.items():
+            folder = self._partition_dir(root, dataset, region, month)
+            os.makedirs(folder, exist_ok=True)
+            df.loc[idx].to_csv(os.path.join(folder, f"part-{part_name}.csv"), index=False)
+            written += 1
+        return written
+
+    # ------------------------------------------------------------ key maps
+    def _link_map(self, files: Iterable[str]) -> pd.DataFrame:
+        """link -> (区域, ym) from the given pbocsum shards (reads only the key columns)."""
+        wanted = {"link", REGION_KEY, "date", "发布日期"}
+        frames = []
+        for fp in files:
+            try:
+                frames.append(_read_shard(fp, usecols=lambda c: c in wanted))
+            except Exception:
+                continue
+        if not frames:
+            return pd.DataFrame(columns=["link", "_r", "_m"])
+        sums = pd.concat(frames, ignore_index=True)
+        if "link" not in sums.columns:
+            return pd.DataFrame(columns=["link", "_r", "_m"])
+        regions = sums[REGION_KEY] if REGION_KEY in sums.columns else pd.Series([None] * len(sums), index=sums.index)
+        out = pd.DataFrame({"link": sums["link"], "_r": _clean_region(regions), "_m": _month_of(sums)})
+        return out.dropna(subset=["link"]).drop_duplicates(subset=["link"], keep="first")
+
+    def _uid_map(self, files: Iterable[str]) -> pd.DataFrame:
+        """uid -> link from the given pbocdtl shards."""
+        frames = []
+        for fp in files:
+            try:
+                frames.append(_read_shard(fp, usecols=lambda c: c in {"uid", "link"}))
+            except Exception:
+                continue
+        if not frames:
+            return pd.DataFrame(columns=["uid", "link"])
+        dtl = pd.concat(frames, ignore_index=True)
+        if not {"uid", "link"}.issubset(dtl.columns):
+            return pd.DataFrame(columns=["uid", "link"])
+        return dtl[["uid", "link"]].dropna().drop_duplicates(subset=["uid"], keep="first")
+
+    def _read_keys(self, root: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+        """The stored key maps of root, or None if it has none (built before they were kept)."""
+        try:
+            link_map = pd.read_csv(os.path.join(root, _LINK_KEYS), dtype=str, keep_default_na=False)
+            uid_map = pd.read_csv(os.path.join(root, _UID_KEYS), dtype=str, keep_default_na=False)
+        except (OSError, ValueError):
+            return None
+        if not {"link", "_r", "_m"}.issubset(link_map.columns) or not {"uid", "link"}.issubset(uid_map.columns):
+            return None
+        return link_map, uid_map
+
+    def _write_keys(self, root: str, link_map: pd.DataFrame, uid_map: pd.DataFrame) -> None:
+        os.makedirs(root, exist_ok=True)
+        for name, df in ((_LINK_KEYS, link_map), (_UID_KEYS, uid_map)):
+            tmp = os.path.join(root, f"{name}.tmp")
+            df.to_csv(tmp, index=False)
+            os.replace(tmp, os.path.join(root, name))
+
+    def _keys_for(self, dataset: str, df: pd.DataFrame, link_map: pd.DataFrame,
+                  uid_map: Optional[pd.DataFrame]):
+        if dataset == "pbocsum":
+            regions = df[REGION_KEY] if REGION_KEY in df.columns else pd.Series([None] * len(df), index=df.index)
+            return _clean_region(regions), _month_of(df)
+
+        if dataset == "pbocdtl":
+            links = df["link"] if "link" in df.columns else pd.Series([None] * len(df), index=df.index)
+        else:
+            links = pd.Series([None] * len(df), index=df.index, dtype=object)
+            if "uid" in df.columns and uid_map is not None and not uid_map.empty:
+                links = df["uid"].map(uid_map.set_index("uid")["link"])
+            if "id" in df.columns:
+                links = links.fillna(df["id"])
+
+        indexed = link_map.set_index("link")
+        regions = links.map(indexed["_r"]).fillna(UNKNOWN)
+        months = links.map(indexed["_m"]).fillna(UNKNOWN)
+        return regions, months
+
+    # ---------------------------------------------------------------- sync
+    def _source_files(self) -> Dict[str, Dict[str, str]]:
+        files: Dict[str, Dict[str, str]] = {}
+        for dataset in DATASET_PREFIXES:
+            entries = {}
+            for fp in list_dataset_files(self.source_path, [dataset]):
+                try:
+                    st = os.stat(fp)
+                except OSError:
+                    continue
+                entries[os.path.relpath(fp, self.source_path)] = f"{st.st_mtime_ns}:{st.st_size}"
+            files[dataset] = entries
+        return files
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(os.path.join(self.root, _MANIFEST), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _write_manifest(self, root: str, files: Dict[str, Dict[str, str]]) -> None:
+        os.makedirs(root, exist_ok=True)
+        tmp = os.path.join(root, f"{_MANIFEST}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"files": files, "synced_at": datetime.now().isoformat()}, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(root, _MANIFEST))
+
+    def _ingest(self, root: str, new_files: Dict[str, List[str]],
+                keys: Tuple[pd.DataFrame, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Partition new_files into root, extending and storing the key maps; returns them."""
+        def paths(dataset: str) -> List[str]:
+            return [os.path.join(self.source_path, rel) for rel in new_files.get(dataset, [])]
+
+        link_map = _merge_keys(keys[0], self._link_map(paths("pbocsum")), "link")
+        uid_map = _merge_keys(keys[1], self._uid_map(paths("pbocdtl")), "uid")
+        for dataset in DATASET_PREFIXES:
+            for rel in new_files.get(dataset, []):
+                fp = os.path.join(self.source_path, rel)
+                try:
+                    df = _read_shard(fp)
+                except Exception as e:
+                    logger.info(f"[partition-store] read_error file={rel} err={e}")
+                    continue
+                regions, months = self._keys_for(dataset, df, link_map, uid_map)
+                self._write_partitions(root, dataset, df, regions, months, self._part_name(fp))
+        # New pbocsum rows may place previously unknown dtl/cat rows
+        if new_files.get("pbocsum"):
+            for dataset in ("pbocdtl", "pboccat"):
+                self._rehome_unknown(root, dataset, link_map, uid_map)
+        self._write_keys(root, link_map, uid_map)
+        return link_map, uid_map
+
+    def _rehome_unknown(self, root: str, dataset: str, link_map: pd.DataFrame,
+                        uid_map: Optional[pd.DataFrame]) -> None:
+        unknown_dir = os.path.join(root, dataset, f"{REGION_KEY}={UNKNOWN}")
+        for fp in glob.glob(os.path.join(unknown_dir, "*", "part-*.csv")):
+            try:
+                df = pd.read_csv(fp, dtype=str, low_memory=False)
+                regions, months = self._keys_for(dataset, df, link_map, uid_map)
+                if (regions == UNKNOWN).all():
+                    continue
+                os.remove(fp)
+                stem = os.path.splitext(os.path.basename(fp))[0][len("part-"):]
+                self._write_partitions(root, dataset, df, regions, months, f"{stem}-r{uuid.uuid4().hex[:6]}")
+            except Exception as e:
+                logger.info(f"[partition-store] rehome_error file={fp} err={e}")
+
+    def _empty_keys(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        return pd.DataFrame(columns=["link", "_r", "_m"]), pd.DataFrame(columns=["uid", "link"])
+
+    def sync(self) -> None:
+        """Bring the partitioned layout up to date with the flat shards."""
+        with self._lock:
+            current = self._source_files()
+            manifest = self._load_manifest()
+            previous = manifest.get("files")
+            keys = self._keys or self._read_keys(self.root)
+
+            if previous is not None and keys is not None:
+                changed = any(
+                    rel not in current.get(ds, {}) or current[ds][rel] != sig
+                    for ds, entries in previous.items() for rel, sig in entries.items()
+                )
+                new_files = {
+                    ds: [rel for rel in entries if rel not in previous.get(ds, {})]
+                    for ds, entries in current.items()
+                }
+                if not changed and not any(new_files.values()):
+                    self._keys = keys
+                    self._synced_at = time.monotonic()
+                    return
+                if not changed:
+                    counts = {ds: len(rels) for ds, rels in new_files.items()}
+                    logger.info(f"[partition-store] INGEST new={counts}")
+                    with self._rw.writing():
+                        self._keys = self._ingest(self.root, new_files, keys)
+                        self._write_manifest(self.root, current)
+                    self._synced_at = time.monotonic()
+                    return
+
+            # First build, a shard was modified/removed or the key maps are missing:
+            # rebuild off to the side, then swap
+            logger.info("[partition-store] REBUILD")
+            tmp_root = f"{self.root}.tmp-{uuid.uuid4().hex[:8]}"
+            keys = self._ingest(tmp_root, {ds: list(entries) for ds, entries in current.items()}, self._empty_keys())
+            self._write_manifest(tmp_root, current)
+            old_root = None
+            with self._rw.writing():
+                if os.path.exists(self.root):
+                    old_root = f"{self.root}.old-{uuid.uuid4().hex[:8]}"
+                    os.replace(self.root, old_root)
+                os.replace(tmp_root, self.root)
+                self._keys = keys
+            self._synced_at = time.monotonic()
+            if old_root:
+                shutil.rmtree(old_root, ignore_errors=True)
+
+    def _sync_loop(self) -> None:
+        while True:
+            try:
+                self.sync()
+            except Exception as e:
+                logger.warning(f"[partition-store] sync_error err={e}")
+            with self._sync_state:
+                if not self._sync_again:
+                    self._sync_thread = None
+                    return
+                self._sync_again = False
+
+    def request_sync(self) -> None:
+        """Sync in a background thread; a request during a running sync makes it run once more."""
+        with self._sync_state:
+            if self._sync_thread is not None:
+                self._sync_again = True
+                return
+            self._sync_thread = threading.Thread(target=self._sync_loop, name="partition-sync", daemon=True)
+            self._sync_thread.start()
+
+    # ---------------------------------------------------------------- read
+    def partition_files(self, dataset: str, regions: Optional[Iterable[str]] = None,
+                        start=None, end=None, include_unknown: bool = False) -> List[str]:
+        """List part files whose partition can match the region/date filter."""
+        ds_dir = os.path.join(self.root, dataset)
+        if not os.path.isdir(ds_dir):
+            return []
+        # Partition names went through _clean_region, so the filter values must too
+        wanted = set(_clean_region(pd.Series(list(regions), dtype=object))) if regions else None
+        if wanted is not None and include_unknown:
+            wanted.add(UNKNOWN)
+        start_m, end_m = _month_bound(start), _month_bound(end)
+
+        files: List[str] = []
+        for region_dir in sorted(os.listdir(ds_dir)):
+            if not region_dir.startswith(f"{REGION_KEY}="):
+                continue
+            if wanted is not None and region_dir.split("=", 1)[1] not in wanted:
+                continue
+            for month_dir in sorted(os.listdir(os.path.join(ds_dir, region_dir))):
+                month = month_dir.split("=", 1)[1] if "=" in month_dir else UNKNOWN
+                if month == UNKNOWN:
+                    if (start_m or end_m) and not include_unknown:
+                        continue
+                else:
+                    if start_m and month < start_m:
+                        continue
+                    if end_m and month > end_m:
+                        continue
+                files.extend(glob.glob(os.path.join(ds_dir, region_dir, month_dir, "part-*.csv")))
+        return files
+
+    def load(self, dataset: str, regions: Optional[Iterable[str]] = None,
+             start=None, end=None, include_unknown: bool = False) -> pd.DataFrame:
+        """Load a dataset reading only partitions that can match the filter.
+
+        Pruning is coarse (a superset of matching rows), so callers keep their
+        own row-level filters. Only partitions are read here; a sync is
+        requested in the background when the last one is older than
+        sync_interval. Falls back to reading every flat shard if the
+        partitioned layout cannot be used (e.g. not built yet).
+        """
+        if self._synced_at is None or time.monotonic() - self._synced_at > self.sync_interval:
+            self.request_sync()
+        try:
+            with self._rw.reading():
+                if not os.path.exists(os.path.join(self.root, _MANIFEST)):
+                    raise FileNotFoundError("partitioned layout not built yet")
+                files = self.partition_files(dataset, regions, start, end, include_unknown)
+                frames = [pd.read_csv(fp, dtype=str, low_memory=False) for fp in files]
+                if frames:
+                    return pd.concat(frames, ignore_index=True)
+                # Keep the dataset's columns when every partition was pruned
+                any_part = self.partition_files(dataset)[:1]
+                if any_part:
+                    return pd.read_csv(any_part[0], dtype=str, nrows=0)
+                return pd.DataFrame()
+        except Exception as e:
+            logger.warning(f"[partition-store] load_fallback dataset={dataset} err={e}")
+            frames = []
+            for fp in list_dataset_files(self.source_path, [dataset]):
+                try:
+                    frames.append(_read_shard(fp))
+                except Exception:
+                    continue
+            return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+partition_store = PartitionedStore(
+    PBOC_DATA_PATH, settings.PBOC_PARTITION_PATH, sync_interval=settings.PBOC_PARTITION_SYNC_INTERVAL_SECONDS
+)
@@ -0,0 +1,151 @@
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+import pandas as pd
+from lxml import html as lxml_html
+
+# List page XPaths (same as the Selenium path in cases.py, so both produce identical rows)
+ZONGBU_TITLE_XPATH = "//div[2]/ul/li/a"
+ZONGBU_DATE_XPATH = "//div[2]/ul/li/span"
+BRANCH_CELL_XPATH = '//td[@class="hei12jj"]'
+BRANCH_LINK_XPATH = '//font[@class="hei12"]/a'
+
+LIST_COLUMNS = ["name", "date", "link", "sum"]
+
+# Detail page XPaths
+DETAIL_DOWNLOAD_XPATH = "//td[@class='hei14jj']//a"
+DETAIL_ZONGBU_CONTENT_XPATH = "//*[@id='easysiteText']"
+DETAIL_BRANCH_CONTENT_XPATH = "//td[@class='hei14jj']"
+
+_BLOCK_TAGS = frozenset([
+    "address", "article", "blockquote", "caption", "center", "dd", "div", "dl", "dt", "h1", "h2", "h3",
+    "h4", "h5", "h6", "hr", "li", "ol", "p", "pre", "section", "table", "tbody", "tfoot", "thead", "tr", "ul",
+])
+_SKIP_TAGS = frozenset(["script", "style", "noscript", "template"])
+
+
+class ListPageParseError(ValueError):
+    """Raised when a list page does not have the expected structure."""
+
+
+def parse_html(source) -> lxml_html.HtmlElement:
+    """Parse raw HTML (str or bytes); bytes let lxml honour the page's meta charset."""
+    return lxml_html.fromstring(source)
+
+
+def element_text(el) -> str:
+    """Whitespace-normalised text content, close to Selenium's `.text`."""
+    return " ".join("".join(el.itertext()).split())
+
+
+def block_text(el) -> str:
+    """Rendered-style text of an element, close to Selenium's `.text` on a block.
+
+    Block elements and <br> start new lines, table cells are separated by a
+    space, whitespace inside a line is collapsed and blank lines are dropped.
+    """
+    parts = []
+
+    def walk(node):
+        tag = node.tag if isinstance(node.tag, str) else ""
+        if tag in _SKIP_TAGS:
+            return
+        if tag == "br":
+            parts.append("\n")
+        elif tag in _BLOCK_TAGS:
+            parts.append("\n")
+        if node.text and tag:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if tag in _BLOCK_TAGS:
+            parts.append("\n")
+        elif tag in ("td", "th"):
+            parts.append(" ")
+
+    walk(el)
+    lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def table_rows(rows) -> pd.DataFrame:
+    """DataFrame of the td texts of each tr element (rows without cells are skipped)."""
+    data = []
+    for tr in rows:
+        cells = [block_text(td) for td in tr.xpath("./td")]
+        if cells:
+            data.append(cells)
+    return pd.DataFrame(data)
+
+
+def parse_list_page(source, page_url: str, zongbu: bool) -> pd.DataFrame:
+    """Extract name/date/link/sum rows from a list page.
+
+    Links are resolved against page_url, matching Selenium's `get_attribute("href")`.
+    Raises ListPageParseError when titles and links cannot be paired.
+    """
+    doc = parse_html(source)
+    namels, datels, linkls, sumls = [], [], [], []
+    if zongbu:
+        titles = doc.xpath(ZONGBU_TITLE_XPATH)
+        dates = doc.xpath(ZONGBU_DATE_XPATH)
+        if len(dates) < len(titles):
+            raise ListPageParseError(f"titles={len(titles)} dates={len(dates)}")
+        for j, a in enumerate(titles):
+            namels.append(element_text(a))
+            datels.append(element_text(dates[j]))
+            linkls.append(_abs_href(a, page_url))
+            sumls.append("")
+    else:
+        cells = doc.xpath(BRANCH_CELL_XPATH)
+        total = len(cells) // 3
+        for j in range(total):
+            namels.append(element_text(cells[j * 3]))
+            datels.append(element_text(cells[j * 3 + 1]))
+            sumls.append(element_text(cells[j * 3 + 2]))
+        for a in doc.xpath(BRANCH_LINK_XPATH):
+            linkls.append(_abs_href(a, page_url))
+        if len(linkls) != total:
+            raise ListPageParseError(f"rows={total} links={len(linkls)}")
+    return pd.DataFrame({"name": namels, "date": datels, "link": linkls, "sum": sumls}, columns=LIST_COLUMNS)
+
+
+def _abs_href(a, page_url: str) -> Optional[str]:
+    href = a.get("href")
+    return urljoin(page_url, href) if href else None
+
+
+def parse_detail_page(source, page_url: str, zongbu: bool) -> Tuple[List[str], Optional[str]]:
+    """Extract (download_urls, raw_content) from a detail page.
+
+    raw_content is only returned when the page has meaningful content beyond
+    its download links: for headquarters the easysiteText block (> 20 chars),
+    for branches the hei14jj cell when it holds a table or enough non-link text.
+    """
+    doc = parse_html(source)
+    downloads = [href for href in (_abs_href(a, page_url) for a in doc.xpath(DETAIL_DOWNLOAD_XPATH)) if href]
+
+    if zongbu:
+        nodes = doc.xpath(DETAIL_ZONGBU_CONTENT_XPATH)
+        if not nodes:
+            return downloads, None
+        content = block_text(nodes[0])
+        return downloads, (content if len(content) > 20 else None)
+
+    nodes = doc.xpath(DETAIL_BRANCH_CONTENT_XPATH)
+    if not nodes:
+        return downloads, None
+    content = block_text(nodes[0])
+    if len(nodes[0].xpath(".//tr")) > 1:  # More than just header
+        return downloads, (content or None)
+    if len(content) > 50:
+        # Not just a list of download links
+        meaningful_lines = [
+            line for line in content.split("\n")
+            if line.strip() and not line.strip().startswith("http") and "下载" not in line and "文件" not in line
+        ]
+        if len(meaningful_lines) > 2:
+            return downloads, content
+    return downloads, None
@@ -0,0 +1,245 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+import asyncio
+import logging
+import threading
+
+try:
+    from playwright.async_api import async_playwright
+except ImportError:  # optional: only needed with BROWSER_ENGINE=playwright
+    async_playwright = None
+
+logger = logging.getLogger("uvicorn.error")
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class PlaywrightEngine:
+    """One headless Chromium process serving many isolated browser contexts.
+
+    Each page gets its own context (cookies, cache and storage are not shared),
+    which costs a few MB instead of a Chrome process per job. Requests for
+    blocked resource types (images, fonts, media by default) are aborted at
+    the network layer before they are sent.
+
+    All methods are coroutines and must run on the loop that called start().
+    """
+
+    def __init__(
+        self,
+        max_contexts: int = 8,
+        headless: bool = True,
+        blocked_types: Iterable[str] = ("image", "font", "media"),
+        nav_timeout: float = 45,
+    ):
+        self.max_contexts = max(1, max_contexts)
+        self.headless = headless
+        self.blocked_types = frozenset(t.strip() for t in blocked_types if t.strip())
+        self.nav_timeout = nav_timeout
+        self._pw = None
+        self._browser = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self.counters = {"contexts": 0, "pages": 0, "blocked": 0, "errors": 0}
+
+    @property
+    def started(self) -> bool:
+        return self._browser is not None
+
+    async def start(self) -> None:
+        if self._browser is not None:
+            return
+        if async_playwright is None:
+            raise RuntimeError("playwright is not installed (pip install playwright && playwright install chromium)")
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._browser is not None:
+                return
+            self._pw = await async_playwright().start()
+            self._browser = await self._pw.chromium.launch(
+                headless=self.headless, args=["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"]
+            )
+            self._sem = asyncio.Semaphore(self.max_contexts)
+        logger.info(f"[playwright] LAUNCH max_contexts={self.max_contexts} blocked={sorted(self.blocked_types)}")
+
+    async def _route(self, route) -> None:
+        if route.request.resource_type in self.blocked_types:
+            self.counters["blocked"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def open_page(self) -> Tuple[Any, Any]:
+        """New isolated (context, page); the caller closes the context."""
+        await self.start()
+        context = await self._browser.new_context(user_agent=USER_AGENT, ignore_https_errors=True)
+        if self.blocked_types:
+            await context.route("**/*", self._route)
+        page = await context.new_page()
+        page.set_default_navigation_timeout(self.nav_timeout * 1000)
+        self.counters["contexts"] += 1
+        return context, page
+
+    async def goto(self, page, url: str) -> Optional[int]:
+        """Navigate and wait for the DOM; returns the HTTP status when known."""
+        self.counters["pages"] += 1
+        try:
+            response = await page.goto(url, wait_until="domcontentloaded")
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+        return response.status if response is not None else None
+
+    async def fetch(self, url: str) -> Tuple[str, str]:
+        """Load url in a fresh context; returns (final_url, html). At most max_contexts run at once."""
+        await self.start()
+        async with self._sem:
+            context, page = await self.open_page()
+            try:
+                await self.goto(page, url)
+                return page.url, await page.content()
+            finally:
+                await context.close()
+
+    async def close(self) -> None:
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            finally:
+                self._browser = None
+                if self._pw is not None:
+                    await self._pw.stop()
+                    self._pw = None
+            logger.info("[playwright] CLOSED")
+
+
+class PlaywrightPage:
+    """Blocking, Selenium-like view of one engine page (get / page_source / current_url)."""
+
+    def __init__(self, pool: "PlaywrightPool", context: Any, page: Any, pool_id: int):
+        self._pool = pool
+        self._context = context
+        self._page = page
+        self.pool_id = pool_id
+        self.pages = 0
+        self.last_status: Optional[int] = None
+
+    def get(self, url: str) -> None:
+        self.pages += 1
+        self.last_status = self._pool.call(self._pool.engine.goto(self._page, url), self._pool.engine.nav_timeout + 15)
+
+    @property
+    def page_source(self) -> str:
+        return self._pool.call(self._page.content())
+
+    @property
+    def current_url(self) -> str:
+        return self._page.url
+
+
+class PlaywrightPool:
+    """DriverPool-compatible pool backed by a PlaywrightEngine.
+
+    The engine runs on its own event loop thread; worker threads (scrape
+    engine, list fallback) block on acquire()/get() as they would with
+    Selenium drivers. Each acquire() opens a fresh context, and release()
+    closes it, so no cookies or state leak between pages.
+    """
+
+    def __init__(self, engine: PlaywrightEngine, size: int = 8, acquire_timeout: float = 300):
+        self.engine = engine
+        self.size = max(1, size)
+        self.acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._in_use = 0
+        self._next_id = 1
+        self._closed = False
+        self.counters = {"acquired": 0, "discarded": 0}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="playwright-loop", daemon=True)
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def call(self, coro, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the engine loop and wait for its result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def prewarm(self, count: Optional[int] = None) -> int:
+        """Launch the browser process (contexts are opened per page); returns 1 if it was started."""
+        if self._closed or (count is not None and count <= 0) or self.engine.started:
+            return 0
+        self.call(self.engine.start(), 120)
+        return 1
+
+    def acquire(self, timeout: Optional[float] = None) -> PlaywrightPage:
+        if self._closed:
+            raise RuntimeError("driver pool is shut down")
+        if not self._slots.acquire(timeout=self.acquire_timeout if timeout is None else timeout):
+            raise TimeoutError(f"no browser context available within {self.acquire_timeout}s")
+        try:
+            context, page = self.call(self.engine.open_page(), 120)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            pool_id = self._next_id
+            self._next_id += 1
+            self._in_use += 1
+            self.counters["acquired"] += 1
+        return PlaywrightPage(self, context, page, pool_id)
+
+    def release(self, page: Optional[PlaywrightPage]) -> None:
+        if page is None:
+            return
+        try:
+            self.call(page._context.close(), 30)
+        except Exception as e:
+            logger.info(f"[playwright] CONTEXT_CLOSE_FAILED id={page.pool_id} err={e}")
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def discard(self, page: Optional[PlaywrightPage]) -> None:
+        if page is not None:
+            with self._lock:
+                self.counters["discarded"] += 1
+        self.release(page)
+
+    def shutdown(self) -> None:
+        self._closed = True
+        if self._loop is None:
+            return
+        try:
+            self.call(self.engine.close(), 30)
+        except Exception as e:
+            logger.info(f"[playwright] SHUTDOWN_ERROR err={e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        logger.info("[playwright] SHUTDOWN")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "engine": "playwright",
+                "size": self.size,
+                "in_use": self._in_use,
+                "browser_running": self.engine.started,
+                **self.counters,
+                **{f"engine_{k}": v for k, v in self.engine.counters.items()},
+            }
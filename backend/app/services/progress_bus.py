@@ -0,0 +1,235 @@
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+# Topic kinds: f"{kind}:{id}"
+SCRAPE = "scrape"
+DOWNLOAD = "download"
+EXTRACT = "extract"
+UPLINK = "uplink"
+
+# Snapshot events: a newer one replaces an undelivered older one
+COALESCED_TYPES = frozenset({"progress"})
+# Final events: never dropped, and they end a subscription's iteration
+TERMINAL_TYPES = frozenset({"complete", "completed", "cancelled", "error"})
+
+
+def topic_of(kind: str, key: str) -> str:
+    return f"{kind}:{key}"
+
+
+def _coalesces(last: Dict[str, Any], event: Dict[str, Any]) -> bool:
+    return event.get("type") in COALESCED_TYPES and last.get("type") == event.get("type")
+
+
+class Subscription:
+    """One listener's bounded buffer on a topic; consumed on the event loop.
+
+    Progress snapshots coalesce (only the newest undelivered one is kept);
+    when the buffer is full the oldest non-final event is dropped, so a slow
+    client costs at most maxsize events and never blocks publishers. Events
+    carry the topic's publish sequence; one at or below the last received is
+    ignored (the retained event replayed on subscribe may also be in a
+    pending flush).
+    """
+
+    def __init__(self, bus: "ProgressBus", topic: str, maxsize: int):
+        self.topic = topic
+        self._bus = bus
+        self._maxsize = max(2, maxsize)
+        self._events: Deque[Dict[str, Any]] = deque()
+        self._wake = asyncio.Event()
+        self.closed = False
+        self.finished = False
+        self.last_seq = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def _push(self, seq: int, event: Dict[str, Any]) -> None:
+        if seq <= self.last_seq:
+            return
+        self.last_seq = seq
+        if self._events and _coalesces(self._events[-1], event):
+            self._events[-1] = event
+            self.coalesced += 1
+        else:
+            if len(self._events) >= self._maxsize:
+                for i, old in enumerate(self._events):
+                    if old.get("type") not in TERMINAL_TYPES:
+                        del self._events[i]
+                        self.dropped += 1
+                        break
+            self._events.append(event)
+        self._wake.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None if nothing arrived within timeout."""
+        if not self._events:
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if not self._events:
+            return None
+        event = self._events.popleft()
+        if event.get("type") in TERMINAL_TYPES:
+            self.finished = True
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        if self.finished or self.closed:
+            raise StopAsyncIteration
+        event = None
+        while event is None:
+            event = await self.get()
+        return event
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._bus._unsubscribe(self)
+
+
+class _Topic:
+    def __init__(self):
+        self.subscribers: Set[Subscription] = set()
+        self.last: Optional[Dict[str, Any]] = None
+        self.outbox: List[Tuple[int, Dict[str, Any]]] = []
+        self.updated_at = time.time()
+        self.published = 0
+        self.watcher: Optional[Callable[[int], None]] = None
+
+
+class ProgressBus:
+    """In-process pub/sub for progress of long-running jobs (scraping, downloads, text extraction, uplink).
+
+    publish() may be called from any thread and never blocks: events are
+    batched per topic and handed to the event loop with one
+    call_soon_threadsafe per batch, coalescing progress snapshots on the way.
+    Subscribers read from their own bounded buffer on the loop. Each topic
+    retains its latest event, which a new subscriber receives first, so
+    clients can join (or re-join) a job at any time.
+    """
+
+    def __init__(self, buffer_size: int, retain_seconds: float):
+        self.buffer_size = buffer_size
+        self.retain_seconds = retain_seconds
+        self._lock = threading.Lock()
+        self._topics: Dict[str, _Topic] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _prune(self, now: float) -> None:
+        stale = [
+            name for name, t in self._topics.items()
+            if not t.subscribers and t.watcher is None and now - t.updated_at > self.retain_seconds
+        ]
+        for name in stale:
+            del self._topics[name]
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            t = self._topics.get(topic)
+            if t is None:
+                self._prune(now)
+                t = self._topics[topic] = _Topic()
+            t.last = event
+            t.updated_at = now
+            t.published += 1
+            if not t.subscribers or self._loop is None or self._loop.is_closed():
+                return
+            schedule = not t.outbox
+            if t.outbox and _coalesces(t.outbox[-1][1], event):
+                t.outbox[-1] = (t.published, event)
+            else:
+                t.outbox.append((t.published, event))
+            loop = self._loop
+        if schedule:
+            loop.call_soon_threadsafe(self._flush, topic)
+
+    def _flush(self, topic: str) -> None:
+        with self._lock:
+            t = self._topics.get(topic)
+            if t is None:
+                return
+            events, t.outbox = t.outbox, []
+            subscribers = list(t.subscribers)
+        for sub in subscribers:
+            for seq, event in events:
+                sub._push(seq, event)
+
+    def subscribe(self, topic: str, maxsize: Optional[int] = None) -> Subscription:
+        """Listen on topic (call on the event loop); the retained latest event is delivered first."""
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        sub = Subscription(self, topic, maxsize or self.buffer_size)
+        with self._lock:
+            t = self._topics.get(topic)
+            if t is None:
+                t = self._topics[topic] = _Topic()
+            if t.last is not None:
+                sub._push(t.published, t.last)
+            t.subscribers.add(sub)
+            count, watcher = len(t.subscribers), t.watcher
+        if watcher is not None:
+            watcher(count)
+        return sub
+
+    def _unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            t = self._topics.get(sub.topic)
+            if t is None or sub not in t.subscribers:
+                return
+            t.subscribers.discard(sub)
+            t.updated_at = time.time()
+            count, watcher = len(t.subscribers), t.watcher
+        if watcher is not None:
+            watcher(count)
+
+    def watch(self, topic: str, watcher: Optional[Callable[[int], None]]) -> None:
+        """Call watcher(subscriber_count) whenever a client joins or leaves topic (None to stop)."""
+        with self._lock:
+            t = self._topics.get(topic)
+            if t is None:
+                t = self._topics[topic] = _Topic()
+            t.watcher = watcher
+            t.updated_at = time.time()
+
+    def subscriber_count(self, topic: str) -> int:
+        with self._lock:
+            t = self._topics.get(topic)
+            return len(t.subscribers) if t is not None else 0
+
+    def latest(self, topic: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            t = self._topics.get(topic)
+            return t.last if t is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(time.time())
+            return {
+                name: {
+                    "subscribers": len(t.subscribers),
+                    "published": t.published,
+                    "last_type": t.last.get("type") if t.last else None,
+                    "coalesced": sum(s.coalesced for s in t.subscribers),
+                    "dropped": sum(s.dropped for s in t.subscribers),
+                    "updated_at": t.updated_at,
+                }
+                for name, t in self._topics.items()
+            }
+
+
+progress_bus = ProgressBus(settings.PROGRESS_BUFFER_SIZE, settings.PROGRESS_RETAIN_SECONDS)
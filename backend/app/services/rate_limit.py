@@ -0,0 +1,193 @@
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = max(rate, 1e-6)
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available and return 0, else return seconds until one is."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            wait = self.try_acquire()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def set_rate(self, rate: float) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = max(rate, 1e-6)
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class _HostPace:
+    """Observed response behaviour of one host."""
+
+    def __init__(self):
+        self.latency_ewma: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+        self.increases = 0
+        self.backoffs = 0
+        self.last_backoff = 0.0
+
+
+class HostRateLimiter:
+    """One token bucket per host, created on first use with the default rate.
+
+    With adaptive pacing, each host's rate follows its responses (AIMD):
+    every healthy response (no error, latency EWMA within latency_target)
+    adds `increase` requests/s up to max_rate; an error or timeout, a 429 or
+    5xx status, or a response slower than twice the target, multiplies the
+    rate by `decrease` down to min_rate. Backoffs are at most one per current request interval,
+    so a burst of failures from requests already in flight counts once.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1.0,
+        adaptive: bool = False,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        latency_target: float = 3.0,
+        increase: float = 0.02,
+        decrease: float = 0.5,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.adaptive = adaptive
+        self.min_rate = min(rate, min_rate) if min_rate else rate
+        self.max_rate = max(rate, max_rate) if max_rate else rate
+        self.latency_target = latency_target
+        self.increase = increase
+        self.decrease = min(max(decrease, 0.05), 0.95)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._paces: Dict[str, _HostPace] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None:
+                b = TokenBucket(self.rate, self.burst)
+                self._buckets[host] = b
+            return b
+
+    def try_acquire(self, host: str) -> float:
+        return self.bucket(host).try_acquire()
+
+    def acquire(self, url: str) -> None:
+        self.bucket(host_of(url)).acquire()
+
+    def set_rate(self, host: str, rate: float) -> None:
+        self.bucket(host).set_rate(rate)
+
+    def record(self, url: str, latency: float, ok: bool, status: Optional[int] = None) -> None:
+        """Feed one response (seconds taken, success, HTTP status if known) into the host's pacing."""
+        error_status = status is not None and (status == 429 or status >= 500)
+        ok = ok and not error_status
+        host = host_of(url)
+        bucket = self.bucket(host)
+        with self._lock:
+            pace = self._paces.setdefault(host, _HostPace())
+            pace.requests += 1
+            if not ok:
+                pace.errors += 1
+            else:
+                pace.latency_ewma = latency if pace.latency_ewma is None else 0.8 * pace.latency_ewma + 0.2 * latency
+            if not self.adaptive:
+                return
+            rate = bucket.rate
+            now = time.monotonic()
+            if not ok or latency > 2 * self.latency_target:
+                if now - pace.last_backoff < 1.0 / rate:
+                    return
+                new_rate = max(self.min_rate, rate * self.decrease)
+                pace.backoffs += 1
+                pace.last_backoff = now
+                if error_status:
+                    reason = f"status={status}"
+                else:
+                    reason = "error" if not ok else f"slow latency={round(latency, 2)}s"
+                logger.info(f"[pacing] BACKOFF host={host} rate={round(rate, 4)}->{round(new_rate, 4)} reason={reason}")
+            elif pace.latency_ewma <= self.latency_target:
+                new_rate = min(self.max_rate, rate + self.increase)
+                if new_rate > rate:
+                    pace.increases += 1
+            else:
+                return
+        bucket.set_rate(new_rate)
+
+    def stats(self, host: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            items = [(h, b, self._paces.get(h)) for h, b in self._buckets.items() if host is None or h == host]
+        out = {}
+        for h, b, pace in items:
+            out[h] = {
+                "rate_per_second": round(b.rate, 4),
+                "interval_seconds": round(1.0 / b.rate, 2),
+                "burst": b.capacity,
+            }
+            if pace is not None:
+                out[h].update({
+                    "latency_ewma_seconds": round(pace.latency_ewma, 3) if pace.latency_ewma is not None else None,
+                    "requests": pace.requests,
+                    "errors": pace.errors,
+                    "increases": pace.increases,
+                    "backoffs": pace.backoffs,
+                })
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "adaptive": self.adaptive,
+            "default_rate_per_second": self.rate,
+            "min_rate_per_second": self.min_rate,
+            "max_rate_per_second": self.max_rate,
+            "latency_target_seconds": self.latency_target,
+            "hosts": self.stats(),
+        }
+
+
+host_limiter = HostRateLimiter(
+    settings.SCRAPE_HOST_RATE_PER_SECOND,
+    settings.SCRAPE_HOST_BURST,
+    adaptive=settings.SCRAPE_ADAPTIVE_PACING,
+    min_rate=settings.SCRAPE_HOST_MIN_RATE_PER_SECOND,
+    max_rate=settings.SCRAPE_HOST_MAX_RATE_PER_SECOND,
+    latency_target=settings.SCRAPE_LATENCY_TARGET_SECONDS,
+    increase=settings.SCRAPE_RATE_INCREASE,
+    decrease=settings.SCRAPE_RATE_DECREASE_FACTOR,
+)
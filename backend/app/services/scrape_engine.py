@@ -0,0 +1,153 @@
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+import logging
+import threading
+import time
+
+from app.services.driver_pool import DriverPool
+from app.services.rate_limit import HostRateLimiter, host_of
+
+logger = logging.getLogger("uvicorn.error")
+
+# (index in links, url, result or None, exception or None)
+ScrapeOutcome = Tuple[int, str, Any, Optional[BaseException]]
+
+
+# Status of the last navigation from the Navigation Timing API (Chrome 109+), 0 when unknown
+_NAVIGATION_STATUS_JS = (
+    "const entry = performance.getEntriesByType('navigation')[0];"
+    "return entry ? (entry.responseStatus || 0) : 0;"
+)
+
+
+class ScrapeCancelled(Exception):
+    """The link was not scraped because the run was cancelled."""
+
+
+def response_status(browser: Any) -> Optional[int]:
+    """HTTP status of the browser's last page load, or None when it cannot be told.
+
+    Browsers do not raise on error pages, so a 500 or 429 only shows here.
+    Playwright pages keep it as last_status; Chrome is asked for it.
+    """
+    if hasattr(browser, "last_status"):
+        return browser.last_status
+    try:
+        status = browser.execute_script(_NAVIGATION_STATUS_JS)
+    except Exception:
+        return None
+    return status if isinstance(status, int) and status > 0 else None
+
+
+def load_page(browser: Any, url: str, limiter: HostRateLimiter) -> None:
+    """browser.get(url), reporting the load time, failure and HTTP status to the limiter."""
+    t0 = time.monotonic()
+    try:
+        browser.get(url)
+    except Exception:
+        limiter.record(url, time.monotonic() - t0, ok=False)
+        raise
+    latency = time.monotonic() - t0
+    limiter.record(url, latency, ok=True, status=response_status(browser))
+
+
+class _PacedBrowser:
+    """The pooled browser as scrape_one sees it: page loads go through load_page."""
+
+    def __init__(self, browser: Any, limiter: HostRateLimiter):
+        self._browser = browser
+        self._limiter = limiter
+
+    def get(self, url: str) -> None:
+        load_page(self._browser, url, self._limiter)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._browser, name)
+
+
+def iter_scrape(
+    links: List[str],
+    scrape_one: Callable[[Any, str], Any],
+    pool: DriverPool,
+    limiter: HostRateLimiter,
+    concurrency: int,
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[ScrapeOutcome]:
+    """Scrape links concurrently, yielding outcomes in completion order.
+
+    Links are queued per host and dispatched round-robin whenever a worker is
+    free and the host's token bucket allows another request, so one slow or
+    strictly limited host never holds up the others. Each worker borrows a
+    browser from the pool for a single page. Each page load it makes (time
+    taken, whether it raised, HTTP status) is reported to the limiter to pace
+    the host; checks that reject a link before it is requested are not.
+
+    Once cancel is set no further links are dispatched and no more host
+    tokens are taken; pages already loading finish, and links that were
+    dispatched but had not got a browser yet yield ScrapeCancelled.
+    """
+    queues: "OrderedDict[str, Deque[Tuple[int, str]]]" = OrderedDict()
+    for idx, url in enumerate(links):
+        queues.setdefault(host_of(url), deque()).append((idx, url))
+
+    def cancelled() -> bool:
+        return cancel is not None and cancel.is_set()
+
+    def run(url: str) -> Any:
+        if cancelled():
+            raise ScrapeCancelled(url)
+        browser = pool.acquire()
+        if cancelled():
+            pool.release(browser)
+            raise ScrapeCancelled(url)
+        try:
+            return scrape_one(_PacedBrowser(browser, limiter), url)
+        finally:
+            pool.release(browser)
+
+    concurrency = max(1, concurrency)
+    in_flight: Dict[Future, Tuple[int, str]] = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="scrape") as executor:
+        while queues or in_flight:
+            if queues and cancelled():
+                dropped = sum(len(q) for q in queues.values())
+                queues.clear()
+                logger.info(f"[scrape-engine] CANCELLED undispatched={dropped} in_flight={len(in_flight)}")
+            dispatched = False
+            next_token: Optional[float] = None
+            for host in list(queues.keys()):
+                if len(in_flight) >= concurrency:
+                    break
+                wait_s = limiter.try_acquire(host)
+                if wait_s > 0:
+                    next_token = wait_s if next_token is None else min(next_token, wait_s)
+                    continue
+                idx, url = queues[host].popleft()
+                if not queues[host]:
+                    del queues[host]
+                else:
+                    # Rotate so hosts take turns
+                    queues.move_to_end(host)
+                in_flight[executor.submit(run, url)] = (idx, url)
+                dispatched = True
+
+            if dispatched:
+                timeout: Optional[float] = 0
+            elif len(in_flight) >= concurrency or not queues:
+                timeout = None
+            else:
+                timeout = next_token
+
+            if not in_flight:
+                if cancel is not None:
+                    cancel.wait(timeout or 0)
+                else:
+                    time.sleep(timeout or 0)
+                continue
+
+            done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx, url = in_flight.pop(fut)
+                err = fut.exception()
+                yield (idx, url, None if err else fut.result(), err)
@@ -0,0 +1,103 @@
+from typing import Any, Dict, Iterator
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger("uvicorn.error")
+
+# Writers of the same file (e.g. a resumed job next to its original runner) share a lock,
+# so long records are never interleaved
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _path_lock(path: str) -> threading.Lock:
+    key = os.path.abspath(path)
+    with _path_locks_guard:
+        return _path_locks.setdefault(key, threading.Lock())
+
+
+class ScrapeRecordLog:
+    """Append-only JSONL log of scrape results, one record per finished page.
+
+    Each append writes and flushes a single line, so the cost per page is
+    constant however long the run is. The file is reopened in append mode by
+    a resumed run, and read back once by the finalization step.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = _path_lock(path)
+        self._fh = None
+        self.appended = 0
+
+    def append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps({**record, "ts": time.time()}, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._fh is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._fh = open(self.path, "a", encoding="utf-8")
+                if self._ends_mid_line():
+                    # Close off a line torn by a crash, or this record would be glued to it
+                    self._fh.write("\n")
+            self._fh.write(line)
+            self._fh.flush()
+            self.appended += 1
+
+    def _ends_mid_line(self) -> bool:
+        try:
+            with open(self.path, "rb") as fh:
+                fh.seek(0, os.SEEK_END)
+                if fh.tell() == 0:
+                    return False
+                fh.seek(-1, os.SEEK_END)
+                return fh.read(1) != b"\n"
+        except FileNotFoundError:
+            return False
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def __enter__(self) -> "ScrapeRecordLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Records in append order; a torn last line (crash mid-write) is skipped."""
+        try:
+            fh = open(self.path, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with fh:
+            for lineno, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.info(f"[scrape-output] skip_bad_record path={self.path} line={lineno}")
+
+    def latest_by(self, key: str) -> Dict[Any, Dict[str, Any]]:
+        """Last record per key value (a page scraped twice keeps its newest result)."""
+        latest: Dict[Any, Dict[str, Any]] = {}
+        for record in self.records():
+            latest[record.get(key)] = record
+        return latest
+
+    def remove(self) -> None:
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def job_record_log(folder: str, job_id: str, prefix: str = "scrape") -> ScrapeRecordLog:
+    return ScrapeRecordLog(os.path.join(folder, f"{prefix}_{job_id}.jsonl"))
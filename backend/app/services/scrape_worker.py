@@ -0,0 +1,283 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from app.services.host_health import host_health
+
+logger = logging.getLogger("uvicorn.error")
+
+# Messages API -> worker: ("run", task_id, kwargs) | ("cancel", task_id) | ("stats", request_id) | ("stop",)
+# Messages worker -> API: ("progress", task_id, finished, total) | ("done", task_id, result) | ("error", task_id, message)
+#                         | ("stats", request_id, stats) | ("host", "", kind, url, error)
+
+
+def _watch_parent(parent_pid: int) -> None:
+    # Exit with the API process instead of scraping on as an orphan
+    while True:
+        time.sleep(5)
+        if os.getppid() != parent_pid:
+            os._exit(0)
+
+
+def _worker_main(tasks, events, parent_pid: int) -> None:
+    """Worker process entry point: runs detail jobs, one thread each, and reports back over events."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    threading.Thread(target=_watch_parent, args=(parent_pid,), daemon=True).start()
+    # Imported here so the worker gets its own browser pool, host budgets and job store connections
+    from app.api.v1.endpoints.cases import driver_pool, run_detail_job
+    from app.services.host_health import host_health
+    from app.services.rate_limit import host_limiter
+
+    # Breaker and HTTPS findings are mirrored into the API process (attachments, host checks)
+    host_health.listener = lambda kind, url, error: events.put(("host", "", kind, url, error))
+    cancels: Dict[str, threading.Event] = {}
+
+    def run(task_id: str, kwargs: Dict[str, Any]) -> None:
+        def on_progress(finished: int, total: int) -> None:
+            events.put(("progress", task_id, finished, total))
+
+        try:
+            result = run_detail_job(on_progress=on_progress, cancel=cancels[task_id], **kwargs)
+            events.put(("done", task_id, tuple(result)))
+        except BaseException as e:
+            events.put(("error", task_id, f"{type(e).__name__}: {e}"))
+        finally:
+            cancels.pop(task_id, None)
+
+    logger.info(f"[scrape-worker] READY pid={os.getpid()}")
+    while True:
+        msg = tasks.get()
+        if msg[0] == "stop":
+            break
+        if msg[0] == "cancel":
+            if msg[1] in cancels:
+                cancels[msg[1]].set()
+        elif msg[0] == "stats":
+            events.put(("stats", msg[1], {
+                "driver_pool": driver_pool.stats(),
+                "pacing": host_limiter.snapshot(),
+                "hosts": host_health.stats(),
+            }))
+        elif msg[0] == "run":
+            _, task_id, kwargs = msg
+            cancels[task_id] = threading.Event()
+            threading.Thread(target=run, args=(task_id, kwargs), name=f"job-{task_id[:8]}", daemon=True).start()
+    for event in list(cancels.values()):
+        event.set()
+    driver_pool.shutdown()
+
+
+def _rss_bytes(pid: Optional[int]) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status", "r") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, TypeError):
+        pass
+    return None
+
+
+class _Task:
+    def __init__(self, on_progress: Optional[Callable[[int, int], None]]):
+        self.future: Future = Future()
+        self.on_progress = on_progress
+        self.started_at = time.time()
+        self.progress: Tuple[int, int] = (0, 0)
+
+
+class ScrapeWorker:
+    """Runs detail crawl jobs in a separate process and relays progress and results.
+
+    The worker is spawned on first use. Browsers, page parsing and result
+    writing live in that process, so a hung chromedriver call or a memory
+    spike never reaches the API process. Each submitted job gets a Future,
+    resolved with run_detail_job's result. on_progress(finished, total)
+    callbacks are invoked from the relay thread.
+
+    The worker's browser pool, host pacing and host health are its own:
+    remote_stats() fetches them, and host health outcomes (breakers, HTTPS
+    fallbacks) are replayed into this process's host_health as they happen.
+
+    If the worker dies, pending Futures fail and the next submit starts a
+    fresh worker. Crawl jobs are persistent, so resubmitting a job resumes it
+    from its remaining links.
+    """
+
+    def __init__(self):
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._process = None
+        self._tasks_q = None
+        self._events_q = None
+        self._relay: Optional[threading.Thread] = None
+        self._pending: Dict[str, _Task] = {}
+        self._stats_requests: Dict[str, Future] = {}
+        self._next_id = 1
+        self.counters = {"started": 0, "submitted": 0, "completed": 0, "failed": 0, "crashes": 0}
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _ensure_started(self) -> None:
+        if self.alive:
+            return
+        self._tasks_q = self._ctx.Queue()
+        self._events_q = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_worker_main, args=(self._tasks_q, self._events_q, os.getpid()), name="scrape-worker", daemon=True
+        )
+        self._process.start()
+        self.counters["started"] += 1
+        self._relay = threading.Thread(
+            target=self._relay_events, args=(self._process, self._events_q), name="scrape-worker-relay", daemon=True
+        )
+        self._relay.start()
+        logger.info(f"[scrape-worker] SPAWN pid={self._process.pid}")
+
+    def _relay_events(self, process, events) -> None:
+        while True:
+            try:
+                msg = events.get(timeout=1.0)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                self._fail_pending(process, f"scrape worker exited with code {process.exitcode}")
+                return
+            kind, task_id = msg[0], msg[1]
+            if kind == "host":
+                host_health.apply(msg[2], msg[3], msg[4])
+                continue
+            if kind == "stats":
+                with self._lock:
+                    request = self._stats_requests.pop(task_id, None)
+                if request is not None:
+                    request.set_result(msg[2])
+                continue
+            with self._lock:
+                task = self._pending.get(task_id)
+                if task is not None and kind in ("done", "error"):
+                    del self._pending[task_id]
+            if task is None:
+                continue
+            if kind == "progress":
+                task.progress = (msg[2], msg[3])
+                if task.on_progress is not None:
+                    try:
+                        task.on_progress(msg[2], msg[3])
+                    except Exception as e:
+                        logger.info(f"[scrape-worker] progress_callback_error task={task_id} err={e}")
+            elif kind == "done":
+                self.counters["completed"] += 1
+                task.future.set_result(msg[2])
+            else:
+                self.counters["failed"] += 1
+                task.future.set_exception(RuntimeError(msg[2]))
+
+    def _fail_pending(self, process, reason: str) -> None:
+        with self._lock:
+            if self._process is not process:
+                return
+            pending, self._pending = self._pending, {}
+            stats_requests, self._stats_requests = self._stats_requests, {}
+            self.counters["crashes"] += 1
+        logger.error(f"[scrape-worker] DIED pid={process.pid} code={process.exitcode} failed_tasks={len(pending)}")
+        for task in pending.values():
+            task.future.set_exception(RuntimeError(reason))
+        for request in stats_requests.values():
+            request.set_result(None)
+
+    def submit(self, on_progress: Optional[Callable[[int, int], None]] = None, **kwargs) -> Tuple[str, Future]:
+        """Start run_detail_job(**kwargs) in the worker; returns (task_id, Future of its result)."""
+        task = _Task(on_progress)
+        with self._lock:
+            self._ensure_started()
+            task_id = f"{self._process.pid}-{self._next_id}"
+            self._next_id += 1
+            self._pending[task_id] = task
+            self.counters["submitted"] += 1
+            self._tasks_q.put(("run", task_id, kwargs))
+        return task_id, task.future
+
+    def cancel(self, task_id: str) -> bool:
+        """Ask the worker to stop a task; its Future still resolves once the run winds down."""
+        with self._lock:
+            if task_id not in self._pending or not self.alive:
+                return False
+            self._tasks_q.put(("cancel", task_id))
+        return True
+
+    def remote_stats(self, timeout: float = 5) -> Optional[Dict[str, Any]]:
+        """The worker's own driver_pool, host_limiter and host_health stats; None if it is not running."""
+        request: Future = Future()
+        with self._lock:
+            if not self.alive:
+                return None
+            request_id = f"stats-{self._next_id}"
+            self._next_id += 1
+            self._stats_requests[request_id] = request
+            self._tasks_q.put(("stats", request_id))
+        try:
+            return request.result(timeout)
+        except Exception:
+            with self._lock:
+                self._stats_requests.pop(request_id, None)
+            return None
+
+    def run(
+        self,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+        cancel: Optional[threading.Event] = None,
+        **kwargs,
+    ) -> Any:
+        """Blocking submit(): waits for the job and returns its result (raises if it failed).
+
+        Setting cancel forwards a cancellation to the worker.
+        """
+        task_id, future = self.submit(on_progress=on_progress, **kwargs)
+        if cancel is not None:
+            while not cancel.wait(0.5):
+                if future.done():
+                    break
+            if cancel.is_set():
+                self.cancel(task_id)
+        return future.result()
+
+    def shutdown(self, timeout: float = 10) -> None:
+        with self._lock:
+            process, tasks_q = self._process, self._tasks_q
+            self._process = None
+        if process is None:
+            return
+        try:
+            tasks_q.put(("stop",))
+            process.join(timeout)
+        finally:
+            if process.is_alive():
+                process.terminate()
+        logger.info(f"[scrape-worker] SHUTDOWN pid={process.pid}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            process = self._process
+            tasks = {
+                task_id: {"finished": t.progress[0], "total": t.progress[1], "running_seconds": round(time.time() - t.started_at, 1)}
+                for task_id, t in self._pending.items()
+            }
+        return {
+            "alive": self.alive,
+            "pid": process.pid if process is not None else None,
+            "rss_bytes": _rss_bytes(process.pid) if process is not None and process.is_alive() else None,
+            "api_rss_bytes": _rss_bytes(os.getpid()),
+            "tasks": tasks,
+            **self.counters,
+        }
+
+
+scrape_worker = ScrapeWorker()
@@ -0,0 +1,269 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Set
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.dataset import list_dataset_files
+
+logger = logging.getLogger("uvicorn.error")
+
+# Flat CSV shards written by the scrapers (relative to backend/)
+PBOC_DATA_PATH = "../pboc"
+
+# Key kinds
+SUM_LINK = "sum_link"  # pbocsum.link, per 区域
+DTL_LINK = "dtl_link"  # pbocdtl.link
+DTL_UID = "dtl_uid"    # pbocdtl.uid
+CAT_UID = "cat_uid"    # pboccat.uid (id in older shards)
+
+NO_REGION = ""
+
+# Bump to rebuild indexes written by an older layout
+_SCHEMA_VERSION = 2
+
+# dataset -> [(kind, key columns (first present wins), region column or None)]
+_SHARD_KEYS = {
+    "pbocsum": [(SUM_LINK, ("link",), "区域")],
+    "pbocdtl": [(DTL_LINK, ("link",), None), (DTL_UID, ("uid",), None)],
+    "pboccat": [(CAT_UID, ("uid", "id"), None)],
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    kind TEXT NOT NULL,
+    region TEXT NOT NULL,
+    key TEXT NOT NULL,
+    date TEXT,
+    PRIMARY KEY (kind, region, key)
+);
+CREATE TABLE IF NOT EXISTS shards (
+    path TEXT PRIMARY KEY,
+    sig TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS freshness (
+    region TEXT PRIMARY KEY,
+    sum_count INTEGER NOT NULL,
+    max_sum_date TEXT,
+    max_detailed_date TEXT,
+    pending INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Per region: newest publish date, newest publish date among links with a detail row,
+# and the number of links without one
+_REFRESH_FRESHNESS = """
+INSERT INTO freshness (region, sum_count, max_sum_date, max_detailed_date, pending, updated_at)
+SELECT s.region, COUNT(*), MAX(s.date), MAX(CASE WHEN d.key IS NOT NULL THEN s.date END),
+       SUM(CASE WHEN d.key IS NULL THEN 1 ELSE 0 END), ?
+FROM seen s LEFT JOIN seen d ON d.kind = ? AND d.region = ? AND d.key = s.key
+WHERE s.kind = ?
+GROUP BY s.region
+"""
+
+
+def _signature(fp: str) -> Optional[str]:
+    try:
+        st = os.stat(fp)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _iso_dates(values: pd.Series) -> pd.Series:
+    dates = pd.to_datetime(values, errors="coerce")
+    return dates.dt.strftime("%Y-%m-%d").where(dates.notna(), None)
+
+
+def _dataset_of(fp: str) -> Optional[str]:
+    name = os.path.basename(fp)
+    return next((ds for ds in _SHARD_KEYS if name.startswith(ds)), None)
+
+
+class SeenIndex:
+    """Persistent sets of keys already stored in the flat CSV shards.
+
+    Keys are kept in SQLite (one primary-key B-tree per kind/region), so
+    membership tests and set differences such as "sum links without a detail
+    row" run as indexed queries instead of reloading and scanning every shard.
+
+    The index follows the shards incrementally: sync() ingests only the key
+    columns of shards it has not seen, and rebuilds if a shard was modified or
+    removed. Writers call add_shard() right after saving a shard.
+
+    Sum links also carry their publish date, from which a per-region
+    freshness table (newest case, newest detailed case, pending count) is
+    recomputed on every ingest.
+    """
+
+    def __init__(self, source_path: str, path: str):
+        self.source_path = source_path
+        self.path = path
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._sync_lock = threading.Lock()
+
+    @contextmanager
+    def _conn(self):
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    conn = sqlite3.connect(self.path, timeout=30)
+                    try:
+                        conn.execute("PRAGMA journal_mode=WAL")
+                        if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                            conn.executescript("DROP TABLE IF EXISTS seen; DROP TABLE IF EXISTS shards; DROP TABLE IF EXISTS freshness;")
+                        conn.executescript(_SCHEMA)
+                        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+                        conn.commit()
+                    finally:
+                        conn.close()
+                    self._initialized = True
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # Ingest
+
+    def _ingest(self, conn, fp: str, sig: str) -> int:
+        dataset = _dataset_of(fp)
+        if dataset is None:
+            return 0
+        specs = _SHARD_KEYS[dataset]
+        wanted = {col for _, key_cols, region_col in specs for col in (*key_cols, region_col) if col} | {"date"}
+        try:
+            df = pd.read_csv(fp, dtype=str, usecols=lambda c: c in wanted, low_memory=False)
+        except Exception as e:
+            logger.info(f"[seen-index] read_error file={fp} err={e}")
+            df = pd.DataFrame()
+        added = 0
+        for kind, key_cols, region_col in specs:
+            key_col = next((c for c in key_cols if c in df.columns), None)
+            if key_col is None:
+                continue
+            keys = df[key_col]
+            regions = df[region_col].fillna(NO_REGION) if region_col and region_col in df.columns else NO_REGION
+            dates = _iso_dates(df["date"]) if kind == SUM_LINK and "date" in df.columns else None
+            rows = pd.DataFrame({"region": regions, "key": keys, "date": dates}).dropna(subset=["key"])
+            # A link stored twice keeps its newest date
+            cur = conn.executemany(
+                "INSERT INTO seen (kind, region, key, date) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (kind, region, key) DO UPDATE SET date = excluded.date "
+                "WHERE excluded.date > COALESCE(seen.date, '')",
+                ((kind, r, k, d) for r, k, d in rows.itertuples(index=False)),
+            )
+            added += max(cur.rowcount, 0)
+        conn.execute(
+            "INSERT OR REPLACE INTO shards (path, sig) VALUES (?, ?)", (os.path.relpath(fp, self.source_path), sig)
+        )
+        return added
+
+    @staticmethod
+    def _refresh_freshness(conn) -> None:
+        conn.execute("DELETE FROM freshness")
+        conn.execute(_REFRESH_FRESHNESS, (time.time(), DTL_LINK, NO_REGION, SUM_LINK))
+
+    def sync(self) -> None:
+        """Ingest new shards; rebuild if a known shard changed or disappeared."""
+        with self._sync_lock, self._conn() as conn:
+            current = {}
+            for fp in list_dataset_files(self.source_path, _SHARD_KEYS.keys()):
+                sig = _signature(fp)
+                if sig is not None:
+                    current[os.path.relpath(fp, self.source_path)] = sig
+            known = dict(conn.execute("SELECT path, sig FROM shards").fetchall())
+            changed = any(current.get(rel) != sig for rel, sig in known.items())
+            if changed:
+                logger.info(f"[seen-index] REBUILD shards={len(current)}")
+                todo = current
+            else:
+                todo = {rel: sig for rel, sig in current.items() if rel not in known}
+            if not todo:
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if changed:
+                    conn.execute("DELETE FROM seen")
+                    conn.execute("DELETE FROM shards")
+                added = sum(self._ingest(conn, os.path.join(self.source_path, rel), sig) for rel, sig in todo.items())
+                self._refresh_freshness(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            logger.info(f"[seen-index] INGEST shards={len(todo)} keys_added={added}")
+
+    def add_shard(self, fp: str) -> None:
+        """Index a shard the caller has just written."""
+        sig = _signature(fp)
+        if sig is None:
+            return
+        with self._sync_lock, self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._ingest(conn, fp, sig)
+                self._refresh_freshness(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    # Queries (each syncs first, so shards written by other processes are included)
+
+    def keys(self, kind: str, region: Optional[str] = None) -> Set[str]:
+        self.sync()
+        with self._conn() as conn:
+            if region is None:
+                rows = conn.execute("SELECT key FROM seen WHERE kind = ?", (kind,))
+            else:
+                rows = conn.execute("SELECT key FROM seen WHERE kind = ? AND region = ?", (kind, region))
+            return {r[0] for r in rows}
+
+    def unseen(self, kind: str, keys: Iterable[str], region: Optional[str] = None) -> List[str]:
+        """keys (in order, first occurrence) not yet stored for kind (and region)."""
+        known = self.keys(kind, region)
+        out: List[str] = []
+        emitted: Set[str] = set()
+        for key in keys:
+            if key is None or (isinstance(key, float) and pd.isna(key)):
+                continue
+            if key not in known and key not in emitted:
+                emitted.add(key)
+                out.append(key)
+        return out
+
+    def pending_links(self, region: str) -> List[str]:
+        """The region's sum links that have no detail row yet, in ingest order."""
+        self.sync()
+        with self._conn() as conn:
+            rows = conn.execute(
+                "SELECT s.key FROM seen s WHERE s.kind = ? AND s.region = ? AND NOT EXISTS "
+                "(SELECT 1 FROM seen d WHERE d.kind = ? AND d.region = ? AND d.key = s.key) ORDER BY s.rowid",
+                (SUM_LINK, region, DTL_LINK, NO_REGION),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def freshness(self) -> Dict[str, Dict[str, Any]]:
+        """region -> {sum_count, max_sum_date, max_detailed_date, pending, updated_at}."""
+        self.sync()
+        with self._conn() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT * FROM freshness").fetchall()
+        return {r["region"]: {k: r[k] for k in r.keys() if k != "region"} for r in rows}
+
+    def counts(self) -> Dict[str, int]:
+        self.sync()
+        with self._conn() as conn:
+            return dict(conn.execute("SELECT kind, COUNT(*) FROM seen GROUP BY kind").fetchall())
+
+
+seen_index = SeenIndex(PBOC_DATA_PATH, settings.SEEN_INDEX_DB_PATH)
@@ -0,0 +1,135 @@
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+from app.core.database import connect_to_mongo
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _sync_partitions() -> str:
+    from app.services.partition_store import partition_store
+
+    partition_store.sync()
+    return "partitions in sync"
+
+
+def _sync_seen_index() -> str:
+    from app.services.seen_index import seen_index
+
+    counts = seen_index.counts()
+    return f"keys={sum(counts.values())}"
+
+
+def _load_search_dataset() -> str:
+    # Imported lazily: endpoint modules pull in heavy dependencies
+    from app.api.v1.endpoints.search import warm_dataset_cache
+
+    rows = warm_dataset_cache()
+    return f"rows={rows}"
+
+
+def _prewarm_drivers() -> str:
+    from app.api.v1.endpoints.cases import driver_pool
+
+    started = driver_pool.prewarm(settings.DRIVER_POOL_PREWARM)
+    return f"browsers={started}"
+
+
+class WarmupState:
+    """Tracks startup warm-up stages so readiness can be reported separately from liveness.
+
+    Each stage is one of pending/running/done/failed/skipped. The service is
+    ready once every required stage is done; optional stages (browsers, Mongo) may fail
+    without blocking readiness.
+    """
+
+    def __init__(self):
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _add_stage(self, name: str, required: bool) -> None:
+        self.stages[name] = {
+            "status": "pending",
+            "required": required,
+            "detail": None,
+            "elapsed_seconds": None,
+        }
+
+    @property
+    def ready(self) -> bool:
+        if not self.stages:
+            return False
+        return all(
+            st["status"] in ("done", "skipped") for st in self.stages.values() if st["required"]
+        )
+
+    async def _run_stage(self, name: str, fn: Callable[[], Any], blocking: bool = True) -> None:
+        stage = self.stages[name]
+        stage["status"] = "running"
+        t0 = time.time()
+        try:
+            if blocking:
+                result = await asyncio.get_running_loop().run_in_executor(None, fn)
+            else:
+                result = await fn()
+            stage["status"] = "done"
+            stage["detail"] = result
+        except Exception as e:
+            stage["status"] = "failed"
+            stage["detail"] = str(e)
+            logger.error(f"[warmup] STAGE_FAILED stage={name} err={e}")
+        finally:
+            stage["elapsed_seconds"] = round(time.time() - t0, 3)
+        logger.info(f"[warmup] STAGE stage={name} status={stage['status']} elapsed={stage['elapsed_seconds']}s")
+
+    async def _run(self) -> None:
+        # Mongo connects concurrently; the CSV stages run back to back since both read the same shards
+        mongo = None
+        if settings.WARMUP_MONGO:
+            mongo = asyncio.create_task(self._run_stage("mongo", connect_to_mongo, blocking=False))
+        await self._run_stage("partitions", _sync_partitions)
+        await self._run_stage("seen_index", _sync_seen_index)
+        await self._run_stage("search_dataset", _load_search_dataset)
+        if settings.DRIVER_POOL_PREWARM > 0:
+            await self._run_stage("browsers", _prewarm_drivers)
+        if mongo is not None:
+            await mongo
+        self.finished_at = time.time()
+        logger.info(f"[warmup] DONE ready={self.ready} elapsed={round(self.finished_at - (self.started_at or 0), 3)}s")
+
+    def start(self) -> None:
+        """Schedule the warm-up in the background on the running event loop."""
+        if self._task is not None:
+            return
+        self._add_stage("partitions", required=True)
+        self._add_stage("seen_index", required=True)
+        self._add_stage("search_dataset", required=True)
+        if settings.DRIVER_POOL_PREWARM > 0:
+            self._add_stage("browsers", required=False)
+        if settings.WARMUP_MONGO:
+            self._add_stage("mongo", required=False)
+        self.started_at = time.time()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def skip(self) -> None:
+        """Mark warm-up as disabled; the service reports ready immediately."""
+        self._add_stage("warmup", required=True)
+        self.stages["warmup"]["status"] = "skipped"
+
+    def snapshot(self) -> Dict[str, Any]:
+        done = [n for n, st in self.stages.items() if st["status"] in ("done", "failed", "skipped")]
+        return {
+            "ready": self.ready,
+            "progress": f"{len(done)}/{len(self.stages)}",
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stages": self.stages,
+        }
+
+
+warmup_state = WarmupState()
@@ -0,0 +1,34 @@
+import glob
+import hashlib
+import os
+from typing import Iterable, List
+
+# Datasets that make up the local PBOC CSV store
+DATASET_PREFIXES = ("pbocsum", "pbocdtl", "pboccat")
+
+
+def list_dataset_files(folder: str, prefixes: Iterable[str] = DATASET_PREFIXES) -> List[str]:
+    """Return all CSV shards under folder (recursive) matching any prefix."""
+    files: List[str] = []
+    for prefix in prefixes:
+        files.extend(glob.glob(os.path.join(folder, "**", f"{prefix}*.csv"), recursive=True))
+    return sorted(set(files))
+
+
+def compute_dataset_etag(folder: str, prefixes: Iterable[str] = DATASET_PREFIXES) -> str:
+    """Compute a version string for the dataset from shard paths, mtimes and sizes.
+
+    Any added, removed, rewritten or touched shard changes the etag. Returns an
+    empty string when no shard matches.
+    """
+    files = list_dataset_files(folder, prefixes)
+    if not files:
+        return ""
+    h = hashlib.sha1()
+    for fp in files:
+        try:
+            st = os.stat(fp)
+        except OSError:
+            continue
+        h.update(f"{os.path.relpath(fp, folder)}|{st.st_mtime_ns}|{st.st_size}\n".encode("utf-8"))
+    return h.hexdigest()
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CHUNK_SIZE = 64 * 1024
+
+
+def _parse_range(header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range `Range: bytes=a-b` header into inclusive offsets.
+
+    Returns None for malformed or multi-range headers (caller serves the full
+    file), and (-1, -1) when the range cannot be satisfied.
+    """
+    m = _RANGE_RE.match(header.strip())
+    if not m:
+        return None
+    start_s, end_s = m.groups()
+    if not start_s and not end_s:
+        return None
+    if not start_s:
+        # Suffix range: last N bytes
+        length = int(end_s)
+        if length == 0:
+            return (-1, -1)
+        start = max(0, file_size - length)
+        end = file_size - 1
+    else:
+        start = int(start_s)
+        end = int(end_s) if end_s else file_size - 1
+        end = min(end, file_size - 1)
+    if start >= file_size or start > end:
+        return (-1, -1)
+    return (start, end)
+
+
+def _iter_file_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def range_file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    headers: Optional[Dict[str, str]] = None,
+    background: Optional[BackgroundTask] = None,
+) -> Response:
+    """Serve a file honouring a single `Range` header (206 Partial Content).
+
+    Falls back to a plain FileResponse when no usable Range header is sent.
+    background runs once the response has been sent.
+    """
+    file_size = os.path.getsize(path)
+    base_headers = {"Accept-Ranges": "bytes"}
+    base_headers.update(headers or {})
+
+    range_header = request.headers.get("range")
+    byte_range = _parse_range(range_header, file_size) if range_header else None
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=base_headers, background=background)
+
+    start, end = byte_range
+    if start < 0:
+        base_headers["Content-Range"] = f"bytes */{file_size}"
+        return Response(status_code=416, headers=base_headers, background=background)
+
+    base_headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+    base_headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        _iter_file_range(path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers=base_headers,
+        background=background,
+    )
+
+
+def make_etag(version: str, *params: Any) -> str:
+    """Build a strong ETag from a data version string plus request params."""
+    raw = json.dumps([version, *params], ensure_ascii=False, sort_keys=True, default=str)
+    return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match header matches etag (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Return a 304 if the client already has etag; otherwise tag response and return None.
+
+    Responses are marked `no-cache` so browsers always revalidate, which costs
+    only the version check when nothing changed.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,76 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into a single execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    runs block until it finishes and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def _register(self, key: str):
+        """Return (call, is_leader) for key, registering a new call if none is running."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            return call, True
+
+    def _run(self, key: str, call: _Call, fn: Callable[[], Any]) -> None:
+        try:
+            call.result = fn()
+        except BaseException as e:  # propagate to every waiter
+            call.error = e
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once per key at a time and return its result to all callers."""
+        call, leader = self._register(key)
+        if leader:
+            self._run(key, call, fn)
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def start(self, key: str, fn: Callable[[], Any], name: Optional[str] = None) -> bool:
+        """Run fn in a background thread unless a call for key is already running.
+
+        Returns True if a new background call was started.
+        """
+        call, leader = self._register(key)
+        if not leader:
+            return False
+
+        def runner():
+            self._run(key, call, fn)
+            if call.error is not None:
+                logger.error(f"[singleflight] background call failed key={key} err={call.error}")
+
+        threading.Thread(target=runner, name=name or f"singleflight-{key}", daemon=True).start()
+        return True
@@ -0,0 +1,315 @@
+from typing import Any, Dict, List, Optional
+from types import SimpleNamespace
+import argparse
+import json
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+BENCH_PATH = os.path.dirname(os.path.abspath(__file__))
+BACKEND_PATH = os.path.dirname(BENCH_PATH)
+
+# Chinese org name -> org index for the orgs the fixture server can stand in for
+DEFAULT_ORGS = "总部,上海"
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/status", "r") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def _descendants(pid: int) -> List[int]:
+    children: List[int] = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children", "r") as fh:
+                children.extend(int(c) for c in fh.read().split())
+    except (OSError, ValueError):
+        return []
+    return [p for child in children for p in [child, *_descendants(child)]]
+
+
+class MemorySampler:
+    """Peak RSS of this process plus its browsers (descendants other than the fixture server)."""
+
+    def __init__(self, exclude: Optional[int] = None, interval: float = 0.05):
+        self.exclude = exclude
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sample(self) -> int:
+        excluded = {self.exclude, *_descendants(self.exclude)} if self.exclude is not None else set()
+        pids = [os.getpid()] + [p for p in _descendants(os.getpid()) if p not in excluded]
+        rss = sum(_rss_bytes(p) for p in pids)
+        self.peak = max(self.peak, rss)
+        return rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def __enter__(self) -> "MemorySampler":
+        self.sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+def _cpu_seconds() -> float:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+class HttpBrowser:
+    """Selenium-shaped page loader over httpx, for measuring the pipeline without Chrome.
+
+    Like a browser it does not raise on HTTP error statuses: the error page
+    becomes page_source and the status last_status, as on Playwright pages.
+    Only connection errors and timeouts propagate.
+    """
+
+    def __init__(self, timeout: float):
+        import httpx
+        from app.services.list_fetcher import DEFAULT_HEADERS
+
+        self._client = httpx.Client(headers=DEFAULT_HEADERS, timeout=timeout, follow_redirects=True)
+        self.page_source = ""
+        self.current_url = "about:blank"
+        self.last_status: Optional[int] = None
+        self.window_handles = ["main"]
+        self.switch_to = SimpleNamespace(window=lambda handle: None)
+
+    def get(self, url: str) -> None:
+        if url == "about:blank":
+            self.page_source, self.current_url, self.last_status = "", url, None
+            return
+        resp = self._client.get(url)
+        self.last_status = resp.status_code
+        self.page_source = resp.text
+        self.current_url = str(resp.url)
+
+    def execute_script(self, script: str) -> Any:
+        return 1
+
+    def close(self) -> None:
+        pass
+
+    def delete_all_cookies(self) -> None:
+        self._client.cookies.clear()
+
+    def quit(self) -> None:
+        self._client.close()
+
+
+def _start_fixture_server(args, org_indexes: List[str]):
+    cmd = [
+        sys.executable, os.path.join(BENCH_PATH, "fixture_server.py"),
+        "--orgs", ",".join(org_indexes),
+        "--pages", str(args.pages),
+        "--rows", str(args.rows),
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--throttle-rate", str(args.throttle_rate),
+        "--throttle-burst", str(args.throttle_burst),
+        "--seed", str(args.seed),
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line:
+        process.kill()
+        raise RuntimeError("fixture server did not start")
+    return process, json.loads(line)
+
+
+def _server_stats(base_url: str, reset: bool = False) -> Dict[str, Any]:
+    import httpx
+
+    parts = urlparse(base_url)
+    resp = httpx.get(f"{parts.scheme}://{parts.netloc}/_stats" + ("?reset=1" if reset else ""))
+    return resp.json()
+
+
+def _configure_round(cases, args, concurrency: int):
+    """Point the scraping globals at fresh pools sized for this round; returns the browser pool."""
+    from app.core.config import settings
+    from app.services.driver_pool import DriverPool
+    from app.services.rate_limit import HostRateLimiter
+
+    settings.LIST_FETCH_CONCURRENCY = concurrency
+    settings.SCRAPE_CONCURRENCY = concurrency
+    if args.browser == "http":
+        pool = DriverPool(lambda: HttpBrowser(args.timeout), size=concurrency, max_pages=0, acquire_timeout=args.timeout * 10)
+    else:
+        # Launched browsers are kept across rounds; the pool only grows
+        pool = cases.driver_pool
+        pool.size = max(pool.size, concurrency)
+    limiter = HostRateLimiter(
+        args.host_rate,
+        args.host_burst,
+        adaptive=settings.SCRAPE_ADAPTIVE_PACING,
+        min_rate=settings.SCRAPE_HOST_MIN_RATE_PER_SECOND,
+        max_rate=max(args.host_rate, settings.SCRAPE_HOST_MAX_RATE_PER_SECOND),
+        latency_target=settings.SCRAPE_LATENCY_TARGET_SECONDS,
+        increase=settings.SCRAPE_RATE_INCREASE,
+        decrease=settings.SCRAPE_RATE_DECREASE_FACTOR,
+    )
+    cases.driver_pool = pool
+    cases.host_limiter = limiter
+    return pool
+
+
+def _measure(fn, base_url: str, server_pid: int) -> Dict[str, Any]:
+    _server_stats(base_url, reset=True)
+    cpu0 = _cpu_seconds()
+    t0 = time.perf_counter()
+    with MemorySampler(exclude=server_pid) as memory:
+        result = fn()
+    wall = time.perf_counter() - t0
+    cpu = _cpu_seconds() - cpu0
+    server = _server_stats(base_url)
+    return {
+        "result": result,
+        "wall_seconds": round(wall, 3),
+        "pages": server["requests"],
+        "pages_per_second": round(server["requests"] / wall, 2) if wall else 0.0,
+        "cpu_seconds": round(cpu, 3),
+        "cpu_percent": round(100 * cpu / wall, 1) if wall else 0.0,
+        "peak_rss_mb": round(memory.peak / 2 ** 20, 1),
+        "status": server["status"],
+    }
+
+
+def run_benchmark(args) -> List[Dict[str, Any]]:
+    orgs = [org.strip() for org in args.orgs.split(",") if org.strip()]
+    cwd = os.getcwd()
+    workdir = os.path.abspath(args.workdir) if args.workdir else tempfile.mkdtemp(prefix="pboc-bench-")
+    # The app resolves ../temp and ../pboc against the working directory
+    os.makedirs(os.path.join(workdir, "backend"), exist_ok=True)
+    os.makedirs(os.path.join(workdir, "temp"), exist_ok=True)
+    os.makedirs(os.path.join(workdir, "pboc"), exist_ok=True)
+    os.chdir(os.path.join(workdir, "backend"))
+    os.environ["SCRAPE_WORKER_PROCESS"] = "false"
+    os.environ["HTML_ARCHIVE_ENABLED"] = "true" if args.archive else "false"
+    sys.path.insert(0, BACKEND_PATH)
+    from app.api.v1.endpoints import cases
+
+    unknown = [org for org in orgs if org not in cases.org2name]
+    if unknown:
+        raise SystemExit(f"Unknown org(s): {', '.join(unknown)}")
+    org_indexes = [cases.org2name[org] for org in orgs]
+
+    server, base_urls = _start_fixture_server(args, org_indexes)
+    any_base = next(iter(base_urls.values()))
+    for org, org_index in zip(orgs, org_indexes):
+        cases.org2url[org] = [base_urls[org_index]]
+
+    rounds = []
+    try:
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            pool = _configure_round(cases, args, concurrency)
+            links: Dict[str, List[str]] = {}
+
+            def list_phase():
+                rows = 0
+                for org in orgs:
+                    df = cases.get_sumeventdf(org, 1, args.pages)
+                    links[org] = df["link"].dropna().tolist() if not df.empty else []
+                    rows += len(df)
+                return {"rows": rows}
+
+            def detail_phase():
+                downloads = tables = 0
+                for org in orgs:
+                    d, t = cases.scrape_detail_pages(links[org], org)
+                    downloads += d
+                    tables += t
+                return {"links": sum(len(v) for v in links.values()), "downloads": downloads, "tables": tables}
+
+            try:
+                list_stats = _measure(list_phase, any_base, server.pid)
+                detail_stats = _measure(detail_phase, any_base, server.pid)
+            finally:
+                if args.browser == "http":
+                    pool.shutdown()
+            for phase, stats in (("get_sumeventdf", list_stats), ("scrape_detail_pages", detail_stats)):
+                rounds.append({"phase": phase, "concurrency": concurrency, **stats})
+                print(_format_row(rounds[-1]), flush=True)
+    finally:
+        if args.browser != "http":
+            cases.driver_pool.shutdown()
+        server.terminate()
+        server.wait(10)
+        os.chdir(cwd)
+        if not args.workdir and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return rounds
+
+
+_HEADER = f"{'phase':<20} {'conc':>4} {'pages':>6} {'wall s':>8} {'pages/s':>8} {'cpu s':>7} {'cpu %':>6} {'rss MB':>7}  result / status"
+
+
+def _format_row(r: Dict[str, Any]) -> str:
+    return (
+        f"{r['phase']:<20} {r['concurrency']:>4} {r['pages']:>6} {r['wall_seconds']:>8.2f} {r['pages_per_second']:>8.1f} "
+        f"{r['cpu_seconds']:>7.2f} {r['cpu_percent']:>6.1f} {r['peak_rss_mb']:>7.1f}  {r['result']} {r['status']}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay get_sumeventdf and scrape_detail_pages against the local fixture server at several concurrency settings."
+    )
+    parser.add_argument("--orgs", default=DEFAULT_ORGS, help="Org names (总部 gets the headquarters layout)")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="LIST_FETCH_CONCURRENCY / SCRAPE_CONCURRENCY values to compare")
+    parser.add_argument("--browser", choices=("http", "configured"), default="http",
+                        help="http: httpx page loader instead of a browser; configured: BROWSER_ENGINE (Chrome or Playwright)")
+    parser.add_argument("--pages", type=int, default=5, help="List pages per org")
+    parser.add_argument("--rows", type=int, default=20, help="Items per list page")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per response, seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of responses that are 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Server-side requests/s per host before 429 (0: off)")
+    parser.add_argument("--throttle-burst", type=float, default=1.0)
+    parser.add_argument("--host-rate", type=float, default=50.0, help="Client pacing per host, requests/s (production: SCRAPE_HOST_RATE_PER_SECOND)")
+    parser.add_argument("--host-burst", type=float, default=8.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Page load timeout for the http browser")
+    parser.add_argument("--archive", action="store_true", help="Keep HTML_ARCHIVE_ENABLED on (archive writes are part of the cost)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workdir", help="Scratch directory for job stores and output files (default: a temp dir, removed)")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary scratch directory")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the app's INFO logs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(levelname)s:     %(message)s")
+    print(_HEADER, flush=True)
+    rounds = run_benchmark(args)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            json.dump({"args": vars(args), "rounds": rounds}, fh, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
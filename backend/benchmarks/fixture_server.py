@@ -0,0 +1,282 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ZONGBU = "zongbu"
+BRANCH = "branch"
+
+_LIST_RE = re.compile(r"^/(?P<org>\w+)/list/index(?P<page>\d+)\.html$")
+_DETAIL_RE = re.compile(r"^/(?P<org>\w+)/detail/(?P<page>\d+)_(?P<row>\d+)\.html$")
+
+_PARTIES = ["某某银行股份有限公司", "某某农村商业银行股份有限公司", "某某支付科技有限公司", "某某村镇银行有限责任公司", "某某信用合作联社"]
+_PEOPLE = ["张某", "李某某", "王某", "赵某某", "陈某"]
+
+
+def _template(name: str) -> Template:
+    with open(os.path.join(FIXTURES_PATH, name), "r", encoding="utf-8") as fh:
+        return Template(fh.read())
+
+
+def layout_of(org: str) -> str:
+    """Headquarters pages use the zongbu layout, every branch the table layout."""
+    return ZONGBU if org == ZONGBU else BRANCH
+
+
+class _Bucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class FixtureSite:
+    """Deterministic list and detail pages of one org, rendered from the fixture templates.
+
+    List page N holds `rows` items linking to /<org>/detail/N_j.html; pages
+    past `pages` are empty lists. Branch detail pages are table pages, except
+    every fourth one which only links an attachment (download-only page).
+    """
+
+    def __init__(self, org: str, pages: int, rows: int, seed: int):
+        self.org = org
+        self.layout = layout_of(org)
+        self.pages = pages
+        self.rows = rows
+        self.seed = seed
+        prefix = "zongbu" if self.layout == ZONGBU else "branch"
+        self._list = _template(f"{prefix}_list.html")
+        self._row = _template(f"{prefix}_list_row.html")
+        self._detail = _template(f"{prefix}_detail.html")
+        self._download = _template("branch_detail_download.html")
+
+    def _case(self, page: int, row: int) -> Dict[str, str]:
+        rng = random.Random(f"{self.seed}/{self.org}/{page}/{row}")
+        # Newest first, like the real lists
+        day = (page - 1) * self.rows + row
+        date = time.strftime("%Y-%m-%d", time.gmtime(1735689600 - day * 86400))
+        docno = f"银罚决字〔{date[:4]}〕{page * 100 + row}号"
+        party = rng.choice(_PARTIES)
+        return {
+            "title": f"行政处罚信息公示表（{docno}）",
+            "date": date,
+            "docno": docno,
+            "party": party,
+            "person": rng.choice(_PEOPLE),
+            "amount": str(rng.randint(10, 500)),
+            "person_amount": str(rng.randint(1, 20)),
+            "authority": "中国人民银行" if self.layout == ZONGBU else f"中国人民银行{self.org}分行",
+            "link": f"/{self.org}/detail/{page}_{row}.html",
+            "download": f"/{self.org}/files/{page}_{row}.{'pdf' if self.layout == ZONGBU else 'xlsx'}",
+        }
+
+    def list_page(self, page: int) -> str:
+        count = self.rows if 1 <= page <= self.pages else 0
+        rows = "".join(self._row.substitute(self._case(page, j), summary=f"第{page}页第{j}条") for j in range(1, count + 1))
+        return self._list.substitute(rows=rows, page=page)
+
+    def detail_page(self, page: int, row: int) -> Optional[str]:
+        if not (1 <= page <= self.pages and 1 <= row <= self.rows):
+            return None
+        case = self._case(page, row)
+        if self.layout == BRANCH and row % 4 == 0:
+            return self._download.substitute(case)
+        return self._detail.substitute(case)
+
+
+class FixtureServer:
+    """Local stand-in for the PBOC sites: one HTTP server (own port, so own host) per org.
+
+    Every response waits latency (+ up to jitter) seconds; error_rate of the
+    page requests answer 500, and with throttle_rate each host only serves
+    that many requests per second (throttle_burst at once) and answers 429
+    with Retry-After beyond it. GET /_stats on any port returns request
+    counts by status; /_stats?reset=1 also clears them.
+    """
+
+    def __init__(
+        self,
+        orgs: List[str],
+        pages: int = 5,
+        rows: int = 20,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        throttle_burst: float = 1.0,
+        seed: int = 1,
+        host: str = "127.0.0.1",
+    ):
+        self.sites = {org: FixtureSite(org, pages, rows, seed) for org in orgs}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.throttle_burst = throttle_burst
+        self.host = host
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._servers: Dict[str, ThreadingHTTPServer] = {}
+        self._buckets: Dict[str, _Bucket] = {}
+        self._stats: Dict[str, int] = {}
+        self._bytes = 0
+
+    def start(self) -> "FixtureServer":
+        for org in self.sites:
+            server = ThreadingHTTPServer((self.host, 0), self._handler())
+            server.daemon_threads = True
+            server.fixture_org = org
+            self._servers[org] = server
+            if self.throttle_rate > 0:
+                self._buckets[org] = _Bucket(self.throttle_rate, self.throttle_burst)
+            threading.Thread(target=server.serve_forever, name=f"fixture-{org}", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers.values():
+            server.shutdown()
+            server.server_close()
+        self._servers = {}
+
+    def ports(self) -> Dict[str, int]:
+        return {org: server.server_address[1] for org, server in self._servers.items()}
+
+    def base_url(self, org: str) -> str:
+        """List URL prefix in org2url form: f"{base_url}{page}.html"."""
+        return f"http://{self.host}:{self._servers[org].server_address[1]}/{org}/list/index"
+
+    def stats(self, reset: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            stats = {"requests": sum(self._stats.values()), "status": dict(self._stats), "bytes": self._bytes}
+            if reset:
+                self._stats, self._bytes = {}, 0
+        return stats
+
+    def _count(self, key: str, size: int) -> None:
+        with self._lock:
+            self._stats[key] = self._stats.get(key, 0) + 1
+            self._bytes += size
+
+    def _roll_error(self) -> bool:
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def _delay(self) -> None:
+        delay = self.latency
+        if self.jitter > 0:
+            with self._lock:
+                delay += self._rng.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def respond(self, org: str, path: str) -> Tuple[int, Dict[str, str], bytes, str]:
+        """(status, headers, body, stats key) for a GET of path on org's host."""
+        if path.startswith("/_stats"):
+            body = json.dumps(self.stats(reset="reset=1" in path)).encode("utf-8")
+            return 200, {"Content-Type": "application/json"}, body, ""
+        self._delay()
+        bucket = self._buckets.get(org)
+        if bucket is not None and not bucket.take():
+            return 429, {"Retry-After": "1"}, b"Too Many Requests", "429"
+        site = self.sites[org]
+        list_match = _LIST_RE.match(path)
+        detail_match = _DETAIL_RE.match(path)
+        match = list_match or detail_match
+        if match is None or match.group("org") != org:
+            return 404, {}, b"Not Found", "404"
+        if self._roll_error():
+            return 500, {}, b"<html><body>Internal Server Error</body></html>", "500"
+        if list_match:
+            source = site.list_page(int(match.group("page")))
+            key = "200_list"
+        else:
+            source = site.detail_page(int(match.group("page")), int(match.group("row")))
+            if source is None:
+                return 404, {}, b"Not Found", "404"
+            key = "200_detail"
+        # Like the real sites: charset in <meta> only
+        return 200, {"Content-Type": "text/html"}, source.encode("utf-8"), key
+
+    def _handler(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, headers, body, key = fixture.respond(self.server.fixture_org, self.path)
+                if key:
+                    fixture._count(key, len(body))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve fixture PBOC list/detail pages for scraper benchmarks.")
+    parser.add_argument("--orgs", default="zongbu,shanghai", help="Org indexes to serve (zongbu gets the headquarters layout)")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--rows", type=int, default=20, help="Items per list page")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many extra seconds, uniformly random")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of page requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Requests/s per host before 429 (0: off)")
+    parser.add_argument("--throttle-burst", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    server = FixtureServer(
+        [org.strip() for org in args.orgs.split(",") if org.strip()],
+        pages=args.pages,
+        rows=args.rows,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        throttle_burst=args.throttle_burst,
+        seed=args.seed,
+    ).start()
+    # First line is machine-readable for the benchmark driver
+    print(json.dumps({org: server.base_url(org) for org in server.sites}), flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
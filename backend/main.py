@@ -1,8 +1,12 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import api_router
+from app.api.v1.endpoints.cases import crawl_scheduler, driver_pool
 from app.core.config import settings
-from app.core.database import connect_to_mongo, close_mongo_connection
+from app.core.database import close_mongo_connection
+from app.services.scrape_worker import scrape_worker
+from app.services.warmup import warmup_state
 
 app = FastAPI(
     title="PBOC Case Management API",
@@ -10,12 +14,21 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# @app.on_event("startup")
-# async def startup_event():
-#     await connect_to_mongo()
+@app.on_event("startup")
+async def startup_event():
+    # Load dataset, build search indexes and open the Mongo pool without blocking startup
+    if settings.WARMUP_ON_STARTUP:
+        warmup_state.start()
+    else:
+        warmup_state.skip()
+    if settings.CRAWL_SCHEDULE_ENABLED:
+        crawl_scheduler.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    crawl_scheduler.stop()
+    scrape_worker.shutdown(settings.SCRAPE_WORKER_SHUTDOWN_TIMEOUT_SECONDS)
+    driver_pool.shutdown()
     await close_mongo_connection()
 
 # Set up CORS
@@ -36,4 +49,10 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness (warm-up progress); 503 until the dataset is loaded."""
+    snapshot = warmup_state.snapshot()
+    return JSONResponse(content=snapshot, status_code=200 if snapshot["ready"] else 503)
@@ -0,0 +1,93 @@
+import pytest
+
+from app.services import crawl_jobs as cj
+from app.services.crawl_jobs import DONE, FAILED, FETCHING, QUEUED, CrawlJobStore, new_owner, selection_key
+
+LINKS = [f"http://a.test/{i}.html" for i in range(5)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CrawlJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_claim_leases_links_in_order_once(store):
+    job = store.create_job("上海", LINKS)
+    first = store.claim(job, new_owner(), 2, 60)
+    second = store.claim(job, new_owner(), 10, 60)
+    assert [url for _, url in first] == LINKS[:2]
+    assert [url for _, url in second] == LINKS[2:]
+    assert store.claim(job, new_owner(), 10, 60) == []
+    assert store.get_job(job)["links"][FETCHING] == 5
+
+
+def test_complete_and_fail_with_retries(store):
+    job = store.create_job("上海", LINKS[:2])
+    owner = new_owner()
+    store.claim(job, owner, 2, 60)
+    store.complete(job, LINKS[0], {"ok": True})
+    assert store.fail(job, LINKS[1], "boom", max_attempts=2) == QUEUED
+    assert store.claim(job, owner, 2, 60) == [(1, LINKS[1])]
+    assert store.fail(job, LINKS[1], "boom again", max_attempts=2) == FAILED
+    links = store.get_job(job)["links"]
+    assert (links[DONE], links[FAILED], store.remaining(job)) == (1, 1, 0)
+    assert store.results(job) == [(0, LINKS[0], {"ok": True})]
+    assert store.failed_links(job)[0]["attempts"] == 2
+
+
+def test_non_retryable_failure_is_final(store):
+    job = store.create_job("上海", LINKS[:1])
+    store.claim(job, new_owner(), 1, 60)
+    assert store.fail(job, LINKS[0], "dns", max_attempts=5, retryable=False) == FAILED
+
+
+def test_release_requeues_without_spending_an_attempt(store):
+    job = store.create_job("上海", LINKS[:3])
+    owner, other = new_owner(), new_owner()
+    store.claim(job, owner, 2, 60)
+    store.claim(job, other, 1, 60)
+    assert store.release(job, owner) == 2
+    claimed = store.claim(job, new_owner(), 10, 60)
+    assert [url for _, url in claimed] == LINKS[:2]
+    store.fail(job, LINKS[0], "boom", max_attempts=2)
+    # First attempt was given back by release, so one retry remains
+    assert store.claim(job, new_owner(), 1, 60) == [(0, LINKS[0])]
+
+
+def test_expired_lease_can_be_claimed_again(store):
+    job = store.create_job("上海", LINKS[:1])
+    store.claim(job, new_owner(), 1, -1)
+    assert store.claim(job, new_owner(), 1, 60) == [(0, LINKS[0])]
+
+
+def test_recover_stale_requeues_leases_of_a_previous_process(store, monkeypatch):
+    job = store.create_job("上海", LINKS[:2])
+    store.claim(job, new_owner(), 1, 60)
+    assert store.recover_stale(job) == 0
+    monkeypatch.setattr(cj, "BOOT_ID", "restarted")
+    assert store.recover_stale(job) == 1
+    assert store.get_job(job)["links"][QUEUED] == 2
+
+
+def test_add_links_skips_known_links(store):
+    job = store.create_job("上海", LINKS[:2])
+    assert store.add_links(job, LINKS[1:4]) == 2
+    assert store.get_job(job)["total"] == 4
+
+
+def test_find_active_keeps_selections_apart(store):
+    org_job = store.create_job("上海", LINKS)
+    key = selection_key(LINKS[:2])
+    sel_job = store.create_job("上海", LINKS[:2], meta={"selection": key})
+    assert store.find_active("上海") == org_job
+    assert store.find_active("上海", selection=key) == sel_job
+    assert store.find_active("上海", selection=selection_key(LINKS[:3])) is None
+    assert selection_key(reversed(LINKS[:2])) == key
+    store.set_status(sel_job, cj.JOB_DONE)
+    assert store.find_active("上海", selection=key) is None
+
+
+def test_set_status_with_expected_is_atomic(store):
+    job = store.create_job("上海", LINKS[:1])
+    assert store.set_status(job, cj.JOB_FINALIZING, expected=cj.JOB_RUNNING)
+    assert not store.set_status(job, cj.JOB_FINALIZING, expected=cj.JOB_RUNNING)
@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+from app.services.crawl_scheduler import RUN_FAILED, RUN_OK, CrawlScheduler, CrawlScheduleStore
+
+INTERVAL = 3600
+
+
+@pytest.fixture
+def make(tmp_path):
+    def build(run_org=None, orgs=("北京", "上海"), last_case=None):
+        store = CrawlScheduleStore(str(tmp_path / "schedule.sqlite3"))
+        scheduler = CrawlScheduler(
+            store,
+            orgs=lambda: list(orgs),
+            run_org=run_org or (lambda org: {"newCases": 0}),
+            last_case_at=lambda org: (last_case or {}).get(org),
+            interval=INTERVAL,
+            min_gap=0,
+        )
+        scheduler._sync_orgs()
+        return scheduler
+    return build
+
+
+def entry(scheduler, org):
+    return next(e for e in scheduler.store.entries() if e["org"] == org)
+
+
+def test_new_orgs_are_spread_most_stale_first(make):
+    scheduler = make(last_case={"北京": 100.0, "上海": 50.0})
+    first, second = entry(scheduler, "上海"), entry(scheduler, "北京")
+    assert second["next_run_at"] - first["next_run_at"] == pytest.approx(INTERVAL / 2, abs=1)
+
+
+def test_scheduled_run_keeps_its_slot(make):
+    scheduler = make()
+    slot = time.time() - 10
+    scheduler.store.set_next_run("上海", slot)
+    scheduler._run_entry(entry(scheduler, "上海"))
+    assert entry(scheduler, "上海")["next_run_at"] == pytest.approx(slot + INTERVAL)
+    assert scheduler.store.runs("上海")[0]["trigger"] == "schedule"
+
+
+def test_overdue_slot_moves_to_one_interval_from_now(make):
+    scheduler = make()
+    scheduler.store.set_next_run("上海", time.time() - 2 * INTERVAL)
+    scheduler._run_entry(entry(scheduler, "上海"))
+    assert entry(scheduler, "上海")["next_run_at"] == pytest.approx(time.time() + INTERVAL, abs=5)
+
+
+def test_manual_run_keeps_the_regular_slot(make):
+    scheduler = make()
+    slot = entry(scheduler, "上海")["next_run_at"]
+    assert slot > time.time()
+    assert scheduler.run_now("上海")
+    # A second request before the run does not lose the original slot
+    assert scheduler.run_now("上海")
+    scheduler._run_entry(entry(scheduler, "上海"))
+    assert entry(scheduler, "上海")["next_run_at"] == pytest.approx(slot)
+    assert scheduler.store.runs("上海")[0]["trigger"] == "manual"
+    assert "上海" not in scheduler._manual
+
+
+def test_manual_run_after_its_slot_passed_advances_from_the_slot(make):
+    scheduler = make()
+    slot = time.time() - 10
+    scheduler.store.set_next_run("北京", slot)
+    scheduler._manual["北京"] = slot
+    scheduler._run_entry(entry(scheduler, "北京"))
+    assert entry(scheduler, "北京")["next_run_at"] == pytest.approx(slot + INTERVAL)
+
+
+def test_failed_run_is_recorded_and_rescheduled(make):
+    def boom(org):
+        raise RuntimeError("list down")
+
+    scheduler = make(run_org=boom)
+    slot = time.time() - 10
+    scheduler.store.set_next_run("上海", slot)
+    scheduler._run_entry(entry(scheduler, "上海"))
+    run = scheduler.store.runs("上海")[0]
+    assert run["status"] == RUN_FAILED
+    assert "list down" in run["error"]
+    assert entry(scheduler, "上海")["next_run_at"] == pytest.approx(slot + INTERVAL)
+    assert scheduler.current is None
+
+
+def test_new_cases_update_staleness(make):
+    scheduler = make(run_org=lambda org: {"newCases": 3})
+    scheduler.store.set_next_run("上海", time.time() - 10)
+    scheduler._run_entry(entry(scheduler, "上海"))
+    assert scheduler.store.runs("上海")[0]["status"] == RUN_OK
+    assert entry(scheduler, "上海")["last_new_case_at"] == pytest.approx(time.time(), abs=5)
+    assert entry(scheduler, "北京")["last_new_case_at"] is None
+
+
+def test_next_due_picks_the_most_stale(make):
+    scheduler = make(last_case={"北京": 100.0, "上海": 50.0})
+    now = time.time()
+    scheduler.store.set_next_run("北京", now - 5)
+    scheduler.store.set_next_run("上海", now - 1)
+    due, wait = scheduler._next_due()
+    assert (due["org"], wait) == ("上海", 0.0)
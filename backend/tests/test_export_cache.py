@@ -0,0 +1,63 @@
+import os
+
+from app.services.export_cache import ExportCache
+
+
+def test_hit_returns_stored_entry(tmp_path):
+    cache = ExportCache(str(tmp_path), max_bytes=1000)
+    key = ExportCache.make_key(["上海"], "2024-01-01", None, ["pbocsum"], "v1")
+    assert cache.get(key) is None
+    cache.put(key, b"zip", "export.zip", "application/zip")
+    cache.release(key)
+    entry = cache.get(key)
+    assert entry["filename"] == "export.zip"
+    with open(entry["path"], "rb") as f:
+        assert f.read() == b"zip"
+    cache.release(key)
+
+
+def test_key_ignores_filter_order():
+    a = ExportCache.make_key(["上海", "北京"], None, None, ["pbocsum", "pbocdtl"], "v1")
+    b = ExportCache.make_key(["北京", "上海"], None, None, ["pbocdtl", "pbocsum"], "v1")
+    assert a == b
+    assert a != ExportCache.make_key(["北京", "上海"], None, None, ["pbocdtl", "pbocsum"], "v2")
+
+
+def test_unpinned_lru_entries_are_evicted(tmp_path):
+    cache = ExportCache(str(tmp_path), max_bytes=10)
+    cache.put("old", b"x" * 6, "old.zip", "application/zip")
+    cache.release("old")
+    os.utime(os.path.join(str(tmp_path), "old.bin"), (1, 1))
+    cache.put("new", b"y" * 6, "new.zip", "application/zip")
+    cache.release("new")
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+def test_entry_being_served_is_not_unlinked(tmp_path):
+    cache = ExportCache(str(tmp_path), max_bytes=10)
+    cache.put("old", b"x" * 6, "old.zip", "application/zip")
+    cache.release("old")
+    served = cache.get("old")
+    os.utime(served["path"], (1, 1))
+    cache.put("new", b"y" * 6, "new.zip", "application/zip")
+    cache.release("new")
+    # Evicted but still on disk for the response in progress; no new hits
+    assert os.path.exists(served["path"])
+    assert cache.get("old") is None
+    cache.release("old")
+    assert not os.path.exists(served["path"])
+
+
+def test_put_after_deferred_eviction_keeps_the_new_file(tmp_path):
+    cache = ExportCache(str(tmp_path), max_bytes=10)
+    cache.put("a", b"x" * 6, "a.zip", "application/zip")
+    served = cache.get("a")
+    os.utime(served["path"], (1, 1))
+    cache.put("b", b"y" * 6, "b.zip", "application/zip")
+    cache.release("b")
+    cache.release("a")
+    cache.put("a", b"z" * 3, "a.zip", "application/zip")
+    cache.release("a")
+    cache.release("a")
+    assert cache.get("a") is not None
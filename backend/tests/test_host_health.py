@@ -0,0 +1,116 @@
+import time
+
+import pytest
+
+from app.services.host_health import CLOSED, HALF_OPEN, OPEN, HostHealthRegistry
+
+URL = "http://127.0.0.1/page.html"
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    reg = HostHealthRegistry(breaker_threshold=2, breaker_cooldown=0.05)
+    reg.reachable_ports = {80}
+    monkeypatch.setattr(reg, "_connect", lambda ip, port: None if port in reg.reachable_ports else "ConnectionRefusedError")
+    return reg
+
+
+def breaker(reg):
+    return reg.stats()["hosts"]["127.0.0.1"]["breaker"]
+
+
+def trip(reg):
+    for _ in range(reg.breaker_threshold):
+        reg.record_failure(URL, "boom")
+
+
+def test_breaker_opens_after_threshold(registry):
+    registry.record_failure(URL, "boom")
+    assert breaker(registry) == CLOSED
+    assert registry.allow(URL)
+    registry.record_failure(URL, "boom")
+    assert breaker(registry) == OPEN
+    assert not registry.allow(URL)
+    assert not registry.check(URL)
+
+
+def test_success_resets_consecutive_failures(registry):
+    registry.record_failure(URL, "boom")
+    registry.record_success(URL)
+    registry.record_failure(URL, "boom")
+    assert breaker(registry) == CLOSED
+
+
+def test_half_open_lets_one_trial_through(registry):
+    trip(registry)
+    time.sleep(0.06)
+    assert registry.allow(URL)
+    assert breaker(registry) == HALF_OPEN
+    assert not registry.allow(URL)
+    registry.record_success(URL)
+    assert breaker(registry) == CLOSED
+    assert registry.allow(URL)
+
+
+def test_failed_trial_reopens(registry):
+    trip(registry)
+    time.sleep(0.06)
+    assert registry.allow(URL)
+    registry.record_failure(URL, "still down")
+    assert breaker(registry) == OPEN
+    assert not registry.allow(URL)
+
+
+def test_half_open_trial_then_validate(registry):
+    # allow() takes the trial; the validation probe must not reject the same link
+    trip(registry)
+    time.sleep(0.06)
+    assert registry.allow(URL)
+    assert registry.check(URL)
+    assert breaker(registry) == CLOSED
+    assert registry.allow(URL)
+
+
+def test_half_open_trial_then_failed_validate_does_not_stick(registry):
+    trip(registry)
+    time.sleep(0.06)
+    registry.reachable_ports = set()
+    assert registry.allow(URL)
+    assert not registry.check(URL)
+    registry.release(URL)
+    assert breaker(registry) == OPEN
+    time.sleep(0.06)
+    registry.reachable_ports = {80}
+    assert registry.allow(URL)
+
+
+def test_release_frees_the_trial(registry):
+    trip(registry)
+    time.sleep(0.06)
+    assert registry.allow(URL)
+    registry.release(URL)
+    assert breaker(registry) == HALF_OPEN
+    assert registry.allow(URL)
+
+
+def test_check_caches_reachability(registry):
+    assert registry.check(URL)
+    assert registry.check(URL)
+    assert registry.counters["probes"] == 1
+    assert registry.counters["cache_hits"] == 1
+
+
+def test_learns_https_only_hosts(registry):
+    registry.reachable_ports = {443}
+    events = []
+    registry.listener = lambda kind, url, error: events.append(kind)
+    assert registry.check(URL)
+    assert registry.preferred_url(URL) == "https://127.0.0.1/page.html"
+    assert events == ["https", "success"]
+
+
+def test_apply_replays_outcomes(registry):
+    other = HostHealthRegistry(breaker_threshold=2, breaker_cooldown=60)
+    registry.listener = other.apply
+    trip(registry)
+    assert other.stats()["hosts"]["127.0.0.1"]["breaker"] == OPEN
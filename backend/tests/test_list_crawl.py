@@ -0,0 +1,98 @@
+import re
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.api.v1.endpoints import cases
+
+ORG = "上海"
+BASE = "http://list.test/index"
+
+
+class FakeSite:
+    """List pages 1..last with two links each; pages past last are empty.
+
+    Failing pages always answer None, flaky pages only the first time.
+    """
+
+    def __init__(self, last, failing=()):
+        self.last = last
+        self.failing = set(failing)
+        self.flaky = set()
+        self.requested = []
+
+    def __call__(self, orgname, urls, zongbu, cache_batch=None):
+        out = {}
+        for url in urls:
+            page = int(re.search(r"(\d+)\.html$", url).group(1))
+            self.requested.append(page)
+            if page in self.failing or page in self.flaky:
+                self.flaky.discard(page)
+                out[url] = None
+            else:
+                rows = 2 if page <= self.last else 0
+                out[url] = pd.DataFrame({"name": [f"p{page}r{j}" for j in range(rows)],
+                                         "link": [f"http://list.test/d/{page}_{j}.html" for j in range(rows)]})
+        return out
+
+
+class FakeSeen:
+    def __init__(self, known):
+        self.known = known
+
+    def keys(self, *args, **kwargs):
+        return self.known
+
+
+@pytest.fixture
+def site(monkeypatch):
+    def install(last, failing=(), known_pages=0):
+        fake = FakeSite(last, failing)
+        known = {f"http://list.test/d/{p}_{j}.html" for p in range(1, known_pages + 1) for j in range(2)}
+        monkeypatch.setattr(cases, "fetch_list_urls", fake)
+        monkeypatch.setattr(cases, "seen_index", FakeSeen(known))
+        monkeypatch.setitem(cases.org2url, ORG, [BASE])
+        return fake
+    return install
+
+
+def test_backfill_crawls_from_first_unknown_page(site):
+    fake = site(last=10, known_pages=6)
+    sumdf, fetched = cases.crawl_sumeventdf_until_known(ORG, max_pages=50, backfill=True)
+    assert sorted({int(re.search(r"/(\d+)_", link).group(1)) for link in sumdf["link"]}) == [7, 8, 9, 10]
+    assert fetched == len(set(fake.requested))
+
+
+def test_backfill_retries_a_failed_probe_once(site):
+    fake = site(last=10)
+    fake.flaky = {2}
+    sumdf, fetched = cases.crawl_sumeventdf_until_known(ORG, max_pages=50, backfill=True)
+    assert fake.requested.count(2) == 2
+    assert len(sumdf) == 20
+    assert fetched == len(set(fake.requested))
+
+
+def test_backfill_stops_when_a_probe_keeps_failing(site):
+    fake = site(last=10, failing={16})
+    with pytest.raises(HTTPException) as exc:
+        cases.crawl_sumeventdf_until_known(ORG, max_pages=50, backfill=True)
+    assert exc.value.status_code == 502
+    # Never galloped past the failing page
+    assert max(fake.requested) == 16
+    assert fake.requested.count(16) == 2
+
+
+def test_until_known_stops_at_first_known_page(site):
+    fake = site(last=10, known_pages=0)
+    cases.seen_index.known = {f"http://list.test/d/4_{j}.html" for j in range(2)}
+    sumdf, fetched = cases.crawl_sumeventdf_until_known(ORG, max_pages=50)
+    assert len(sumdf) == 6
+    assert fetched == len(fake.requested)
+
+
+def test_range_counts_only_answered_pages(site):
+    site(last=10, failing={3})
+    sumdf, fetched = cases._crawl_sumeventdf_range(ORG, 1, 4)
+    assert fetched == 3
+    assert len(sumdf) == 6
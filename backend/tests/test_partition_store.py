@@ -0,0 +1,90 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app.services.partition_store import PartitionedStore
+
+
+def write_shard(folder, name, rows):
+    path = os.path.join(folder, f"{name}.csv")
+    pd.DataFrame(rows).to_csv(path)
+    return path
+
+
+@pytest.fixture
+def store(tmp_path):
+    source = tmp_path / "pboc"
+    source.mkdir()
+    return PartitionedStore(str(source), str(tmp_path / "parts"), sync_interval=3600)
+
+
+def test_load_prunes_by_region_and_month(store):
+    write_shard(store.source_path, "pbocsum1", [
+        {"link": "a", "区域": "上海", "date": "2024-01-05"},
+        {"link": "b", "区域": "北京", "date": "2024-02-05"},
+    ])
+    store.sync()
+    assert store.load("pbocsum", regions=["上海"])["link"].tolist() == ["a"]
+    assert store.load("pbocsum", start="2024-02-01")["link"].tolist() == ["b"]
+
+
+def test_region_filter_uses_the_partition_name_cleaning(store):
+    write_shard(store.source_path, "pbocsum1", [{"link": "a", "区域": "a=b", "date": "2024-01-05"}])
+    store.sync()
+    assert store.load("pbocsum", regions=["a=b"])["link"].tolist() == ["a"]
+
+
+def test_load_does_not_sync(store, monkeypatch):
+    write_shard(store.source_path, "pbocsum1", [{"link": "a", "区域": "上海", "date": "2024-01-05"}])
+    store.sync()
+    requested = []
+    monkeypatch.setattr(store, "request_sync", lambda: requested.append(True))
+    write_shard(store.source_path, "pbocsum2", [{"link": "b", "区域": "上海", "date": "2024-01-06"}])
+    assert store.load("pbocsum")["link"].tolist() == ["a"]
+    assert requested == []
+
+
+def test_load_requests_a_sync_when_stale(store, monkeypatch):
+    requested = []
+    monkeypatch.setattr(store, "request_sync", lambda: requested.append(True))
+    write_shard(store.source_path, "pbocsum1", [{"link": "a", "区域": "上海", "date": "2024-01-05"}])
+    # Never synced: reads the flat shards and asks for a sync
+    assert store.load("pbocsum")["link"].tolist() == ["a"]
+    assert requested == [True]
+
+
+def test_ingest_reads_only_new_shard_keys(store, monkeypatch):
+    write_shard(store.source_path, "pbocsum1", [{"link": "a", "区域": "上海", "date": "2024-01-05"}])
+    write_shard(store.source_path, "pbocdtl1", [{"link": "b", "uid": "u1"}])
+    store.sync()
+    # Unknown until its pbocsum row arrives
+    assert store.load("pbocdtl", regions=["北京"]).empty
+
+    read = []
+    original = store._link_map
+    monkeypatch.setattr(store, "_link_map", lambda files: read.append(list(files)) or original(files))
+    new_sum = write_shard(store.source_path, "pbocsum2", [{"link": "b", "区域": "北京", "date": "2024-03-01"}])
+    store.sync()
+    assert read == [[new_sum]]
+    assert store.load("pbocdtl", regions=["北京"])["uid"].tolist() == ["u1"]
+    assert store.load("pbocsum")["link"].sort_values().tolist() == ["a", "b"]
+
+
+def test_key_maps_survive_a_restart(store):
+    write_shard(store.source_path, "pbocsum1", [{"link": "a", "区域": "上海", "date": "2024-01-05"}])
+    store.sync()
+    fresh = PartitionedStore(store.source_path, store.root, sync_interval=3600)
+    write_shard(store.source_path, "pbocdtl1", [{"link": "a", "uid": "u1"}])
+    fresh.sync()
+    assert fresh.load("pbocdtl", regions=["上海"])["uid"].tolist() == ["u1"]
+
+
+def test_modified_shard_rebuilds(store):
+    path = write_shard(store.source_path, "pbocsum1", [{"link": "a", "区域": "上海", "date": "2024-01-05"}])
+    store.sync()
+    pd.DataFrame([{"link": "a", "区域": "北京", "date": "2024-01-05"}]).to_csv(path)
+    os.utime(path, ns=(1, 1))
+    store.sync()
+    assert store.load("pbocsum", regions=["上海"]).empty
+    assert store.load("pbocsum", regions=["北京"])["link"].tolist() == ["a"]
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+
+from app.services.progress_bus import ProgressBus
+
+TOPIC = "scrape:job1"
+
+
+def progress(n):
+    return {"type": "progress", "n": n}
+
+
+async def drain(sub):
+    events = []
+    while True:
+        event = await sub.get(timeout=0.05)
+        if event is None:
+            return events
+        events.append(event)
+
+
+def test_subscriber_gets_published_events_in_order():
+    async def main():
+        bus = ProgressBus(buffer_size=10, retain_seconds=60)
+        sub = bus.subscribe(TOPIC)
+        bus.publish(TOPIC, {"type": "log", "msg": "a"})
+        bus.publish(TOPIC, {"type": "log", "msg": "b"})
+        bus.publish(TOPIC, {"type": "completed"})
+        return [e async for e in sub]
+
+    events = asyncio.run(main())
+    assert [e.get("msg", e["type"]) for e in events] == ["a", "b", "completed"]
+
+
+def test_progress_snapshots_coalesce():
+    async def main():
+        bus = ProgressBus(buffer_size=10, retain_seconds=60)
+        sub = bus.subscribe(TOPIC)
+        for n in range(5):
+            bus.publish(TOPIC, progress(n))
+        return await drain(sub)
+
+    assert asyncio.run(main()) == [progress(4)]
+
+
+def test_late_subscriber_gets_retained_event_once():
+    async def main():
+        bus = ProgressBus(buffer_size=10, retain_seconds=60)
+        first = bus.subscribe(TOPIC)
+        bus.publish(TOPIC, progress(1))
+        bus.publish(TOPIC, {"type": "completed"})
+        # Joins while both events are still waiting in the outbox
+        late = bus.subscribe(TOPIC)
+        return await drain(first), await drain(late)
+
+    first, late = asyncio.run(main())
+    assert first == [progress(1), {"type": "completed"}]
+    assert late == [{"type": "completed"}]
+
+
+def test_seq_at_or_below_last_is_dropped():
+    async def main():
+        bus = ProgressBus(buffer_size=10, retain_seconds=60)
+        sub = bus.subscribe(TOPIC)
+        sub._push(3, progress(3))
+        sub._push(2, progress(2))
+        sub._push(3, progress(3))
+        sub._push(4, {"type": "completed"})
+        return await drain(sub)
+
+    assert asyncio.run(main()) == [progress(3), {"type": "completed"}]
+
+
+def test_full_buffer_drops_oldest_non_final_event():
+    async def main():
+        bus = ProgressBus(buffer_size=2, retain_seconds=60)
+        sub = bus.subscribe(TOPIC)
+        sub._push(1, {"type": "log", "msg": "a"})
+        sub._push(2, {"type": "error"})
+        sub._push(3, {"type": "log", "msg": "b"})
+        return await drain(sub), sub.dropped
+
+    events, dropped = asyncio.run(main())
+    assert events == [{"type": "error"}, {"type": "log", "msg": "b"}]
+    assert dropped == 1
+
+
+def test_publish_from_another_thread():
+    async def main():
+        bus = ProgressBus(buffer_size=10, retain_seconds=60)
+        sub = bus.subscribe(TOPIC)
+        worker = threading.Thread(target=lambda: [bus.publish(TOPIC, progress(n)) for n in range(100)])
+        worker.start()
+        worker.join()
+        bus.publish(TOPIC, {"type": "completed"})
+        return [e async for e in sub]
+
+    events = asyncio.run(main())
+    assert events[-1] == {"type": "completed"}
+    assert events[-2] == progress(99)
+
+
+def test_watcher_sees_subscriber_count():
+    async def main():
+        bus = ProgressBus(buffer_size=10, retain_seconds=60)
+        counts = []
+        bus.watch(TOPIC, counts.append)
+        sub = bus.subscribe(TOPIC)
+        sub.close()
+        return counts
+
+    assert asyncio.run(main()) == [1, 0]
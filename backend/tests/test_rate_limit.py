@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+from app.services.rate_limit import HostRateLimiter, TokenBucket
+
+URL = "http://example.test/page.html"
+HOST = "example.test"
+
+
+def test_bucket_starts_full_then_paces():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    wait = bucket.try_acquire()
+    assert 0 < wait <= 0.1
+    time.sleep(wait + 0.01)
+    assert bucket.try_acquire() == 0
+
+
+def test_bucket_never_holds_more_than_capacity():
+    bucket = TokenBucket(rate=1000, capacity=1)
+    time.sleep(0.01)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() > 0
+
+
+def test_set_rate_changes_the_wait():
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.try_acquire()
+    assert bucket.try_acquire() == pytest.approx(1, abs=0.05)
+    bucket.set_rate(10)
+    assert bucket.try_acquire() == pytest.approx(0.1, abs=0.05)
+
+
+def adaptive(**kwargs):
+    params = dict(adaptive=True, min_rate=0.25, max_rate=4, latency_target=1.0, increase=0.5, decrease=0.5)
+    params.update(kwargs)
+    return HostRateLimiter(1.0, **params)
+
+
+def rate(limiter):
+    return limiter.stats(HOST)[HOST]["rate_per_second"]
+
+
+def test_fixed_rate_when_not_adaptive():
+    limiter = HostRateLimiter(1.0)
+    limiter.record(URL, 0.1, ok=False)
+    limiter.record(URL, 0.1, ok=True)
+    assert rate(limiter) == 1.0
+    assert limiter.stats(HOST)[HOST]["errors"] == 1
+
+
+def test_healthy_responses_increase_additively_up_to_max():
+    limiter = adaptive()
+    limiter.record(URL, 0.1, ok=True)
+    assert rate(limiter) == 1.5
+    for _ in range(20):
+        limiter.record(URL, 0.1, ok=True)
+    assert rate(limiter) == 4
+
+
+def test_error_halves_down_to_min():
+    limiter = adaptive()
+    limiter.record(URL, 0.1, ok=False)
+    assert rate(limiter) == 0.5
+    limiter._paces[HOST].last_backoff = 0
+    limiter.record(URL, 0.1, ok=False)
+    limiter._paces[HOST].last_backoff = 0
+    limiter.record(URL, 0.1, ok=False)
+    assert rate(limiter) == 0.25
+
+
+def test_backoff_counts_once_per_interval():
+    limiter = adaptive()
+    limiter.record(URL, 0.1, ok=False)
+    limiter.record(URL, 0.1, ok=False)
+    assert rate(limiter) == 0.5
+    assert limiter.stats(HOST)[HOST]["backoffs"] == 1
+
+
+def test_slow_response_backs_off():
+    limiter = adaptive()
+    limiter.record(URL, 2.5, ok=True)
+    assert rate(limiter) == 0.5
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_error_status_backs_off(status):
+    limiter = adaptive()
+    limiter.record(URL, 0.1, ok=True, status=status)
+    assert rate(limiter) == 0.5
+    assert limiter.stats(HOST)[HOST]["errors"] == 1
+
+
+@pytest.mark.parametrize("status", [200, 304, 404])
+def test_other_status_is_healthy(status):
+    limiter = adaptive()
+    limiter.record(URL, 0.1, ok=True, status=status)
+    assert rate(limiter) == 1.5
@@ -0,0 +1,101 @@
+import threading
+import time
+
+from app.services.rate_limit import HostRateLimiter
+from app.services.scrape_engine import iter_scrape
+
+
+class FakeBrowser:
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.last_status = None
+        self.page_source = ""
+
+    def get(self, url):
+        time.sleep(0.01)
+        self.last_status = self.statuses.get(url, 200)
+        self.page_source = f"<html>{url}</html>"
+
+
+class FakePool:
+    def __init__(self, browser):
+        self.browser = browser
+        self.in_use = 0
+
+    def acquire(self):
+        self.in_use += 1
+        return self.browser
+
+    def release(self, browser):
+        self.in_use -= 1
+
+
+class RecordingLimiter(HostRateLimiter):
+    def __init__(self):
+        super().__init__(1000, 1000)
+        self.records = []
+
+    def record(self, url, latency, ok, status=None):
+        self.records.append((url, latency, ok, status))
+        super().record(url, latency, ok, status)
+
+
+def run(links, scrape_one, statuses=None, cancel=None):
+    pool = FakePool(FakeBrowser(statuses or {}))
+    limiter = RecordingLimiter()
+    outcomes = {url: (result, err) for _, url, result, err in iter_scrape(links, scrape_one, pool, limiter, 2, cancel)}
+    assert pool.in_use == 0
+    return outcomes, limiter.records
+
+
+def load(browser, url):
+    browser.get(url)
+    return browser.page_source
+
+
+def test_results_and_page_loads_are_recorded():
+    links = ["http://a.test/1", "http://b.test/2"]
+    outcomes, records = run(links, load, {"http://b.test/2": 503})
+    assert outcomes["http://a.test/1"] == ("<html>http://a.test/1</html>", None)
+    assert sorted((url, ok, status) for url, _, ok, status in records) == [
+        ("http://a.test/1", True, 200),
+        ("http://b.test/2", True, 503),
+    ]
+
+
+def test_rejections_before_the_request_are_not_recorded():
+    def reject(browser, url):
+        raise ValueError("host check failed")
+
+    outcomes, records = run(["http://a.test/1"], reject)
+    assert isinstance(outcomes["http://a.test/1"][1], ValueError)
+    assert records == []
+
+
+def test_latency_covers_only_the_page_load():
+    def slow_check(browser, url):
+        time.sleep(0.2)
+        return load(browser, url)
+
+    _, records = run(["http://a.test/1"], slow_check)
+    assert records[0][1] < 0.1
+
+
+def test_failed_page_load_is_an_error():
+    class Broken(FakeBrowser):
+        def get(self, url):
+            raise TimeoutError("page load")
+
+    pool = FakePool(Broken({}))
+    limiter = RecordingLimiter()
+    outcomes = list(iter_scrape(["http://a.test/1"], load, pool, limiter, 1))
+    assert isinstance(outcomes[0][3], TimeoutError)
+    assert [(ok, status) for _, _, ok, status in limiter.records] == [(False, None)]
+
+
+def test_cancelled_run_dispatches_nothing():
+    cancel = threading.Event()
+    cancel.set()
+    outcomes, records = run(["http://a.test/1", "http://a.test/2"], load, cancel=cancel)
+    assert outcomes == {}
+    assert records == []
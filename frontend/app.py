@@ -155,13 +155,13 @@ def main():
 
                 while True:
                     # get sumeventdf
-                    sumeventdf = get_sumeventdf(org_name, start, end)
+                    sumeventdf, page_hashes = get_sumeventdf(org_name, start, end)
                     # get length of sumeventdf
                     length = len(sumeventdf)
                     # display length
                     st.success(f"获取了{length}条案例")
                     # update sumeventdf
-                    newsum = update_sumeventdf(sumeventdf, org_name)
+                    newsum = update_sumeventdf(sumeventdf, org_name, page_hashes)
                     # get length of newsum
                     sumevent_len = len(newsum)
                     # display sumeventdf
@@ -1,12 +1,12 @@
 # Standard library imports
 import csv
 import glob
+import hashlib
 import os
-import random
 import re
 import time
 from ast import literal_eval
-from urllib.parse import unquote
+from urllib.parse import unquote, urljoin
 import json
 
 # Third-party imports
@@ -18,9 +18,9 @@ import streamlit as st
 # Local imports
 from database import delete_data, get_collection, get_data, get_size, insert_data
 from doc2text import pdfurl2tableocr
-from selenium.webdriver.common.by import By
+from lxml import html as lxml_html
 from snapshot import get_chrome_driver
-from utils import get_now, split_words
+from utils import AdaptivePacer, get_now, split_words
 
 # from geopy.geocoders import Nominatim
 # from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
@@ -31,6 +31,7 @@ import uuid
 penpboc = "../pboc"
 temppath = r"../temp"
 mappath = "../map/chinageo.json"
+listpagecachepath = os.path.join(temppath, "listpagecache.json")
 
 # choose orgname index
 org2name = {
@@ -445,22 +446,55 @@ def display_pbocsum(org_name_ls):
         display_suminfo(dtl)
 
 
-# get sumeventdf in page number range
+def load_list_page_cache():
+    try:
+        with open(listpagecachepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def commit_list_page_cache(page_hashes):
+    if not page_hashes:
+        return
+    cache = load_list_page_cache()
+    cache.update(page_hashes)
+    os.makedirs(temppath, exist_ok=True)
+    tmppath = listpagecachepath + ".tmp"
+    with open(tmppath, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmppath, listpagecachepath)
+
+
+def list_rows_hash(df):
+    return hashlib.sha256(
+        df[["name", "date", "link", "sum"]].to_csv(index=False).encode("utf-8")
+    ).hexdigest()
+
+
+# get sumeventdf in page number range; returns (sumdf, page_hashes), pass
+# page_hashes to update_sumeventdf so they are saved only once the rows are stored
 def get_sumeventdf(orgname, start, end):
     org_name_index = org2name[orgname]
     browser = get_chrome_driver(temppath)
+    # pages whose rows are unchanged since the last saved run are skipped
+    pagecache = load_list_page_cache()
+    page_hashes = {}
 
     baseurl = org2url[orgname]
 
     resultls = []
     errorls = []
     count = 0
+    pacer = AdaptivePacer()
     for i in range(start, end + 1):
         st.info("page: " + str(i))
         st.info(str(count) + " begin")
         url = baseurl + str(i) + ".html"
         st.info("url: " + url)
         # st.write(org_name_index)
+        pagestart = time.time()
+        pageok = True
         try:
             browser.implicitly_wait(3)
             browser.get(url)
@@ -470,56 +504,66 @@ def get_sumeventdf(orgname, start, end):
             datels = []
             linkls = []
             sumls = []
+            # parse the rendered page once instead of querying chromedriver per element
+            tree = get_pagetree(browser)
             if org_name_index == "zongbu":
                 st.write("zongbu")
-                ls3 = browser.find_elements(By.XPATH, "//div[2]/ul/li/a")
-                ls4 = browser.find_elements(By.XPATH, "//div[2]/ul/li/span")
+                ls3 = tree.xpath("//div[2]/ul/li/a")
+                ls4 = tree.xpath("//div[2]/ul/li/span")
                 for i in range(len(ls3)):
-                    namels.append(ls3[i].text)
-                    datels.append(ls4[i].text)
-                    linkls.append(ls3[i].get_attribute("href"))
+                    namels.append(node_text(ls3[i]))
+                    datels.append(node_text(ls4[i]))
+                    linkls.append(node_href(ls3[i], browser.current_url))
                     sumls.append("")
             else:
-                ls1 = browser.find_elements(By.XPATH, '//td[@class="hei12jj"]')
+                ls1 = tree.xpath('//td[@class="hei12jj"]')
                 total = len(ls1) // 3
                 for i in range(total):
-                    #     print(ls1[i].text)
-                    namels.append(ls1[i * 3].text)
-                    datels.append(ls1[i * 3 + 1].text)
-                    sumls.append(ls1[i * 3 + 2].text)
+                    #     print(node_text(ls1[i]))
+                    namels.append(node_text(ls1[i * 3]))
+                    datels.append(node_text(ls1[i * 3 + 1]))
+                    sumls.append(node_text(ls1[i * 3 + 2]))
 
-                ls2 = browser.find_elements(By.XPATH, '//font[@class="hei12"]/a')
+                ls2 = tree.xpath('//font[@class="hei12"]/a')
                 # linkls = []
                 for link in ls2:
-                    linkls.append(link.get_attribute("href"))
+                    linkls.append(node_href(link, browser.current_url))
 
             # st.write(namels)
             df = pd.DataFrame(
                 {"name": namels, "date": datels, "link": linkls, "sum": sumls}
             )
-            resultls.append(df)
+            pagehash = list_rows_hash(df)
+            if pagecache.get(url) == pagehash:
+                st.info("unchanged: " + url)
+            else:
+                page_hashes[url] = pagehash
+                resultls.append(df)
         except Exception as e:
             st.error("error!: " + str(e))
             errorls.append(url)
+            pageok = False
+        pacer.record(time.time() - pagestart, pageok)
 
         mod = (i + 1) % 2
-        if mod == 0 and count > 0:
+        if mod == 0 and count > 0 and resultls:
             tempdf = pd.concat(resultls)
             savename = "tempsum-" + org_name_index + str(count + 1)
             savedf(tempdf, savename)
 
-        wait = random.randint(2, 20)
-        time.sleep(wait)
-        st.info("finish: " + str(count))
+        wait = pacer.wait()
+        st.info("finish: " + str(count) + " next in " + str(wait) + "s")
         count += 1
 
     browser.quit()
+    if not resultls:
+        return pd.DataFrame(columns=["name", "date", "link", "sum", "区域"]), page_hashes
     sumdf = pd.concat(resultls)
     savecsv = "tempsumall" + org_name_index + str(count)
     # add orgname
     sumdf["区域"] = orgname
     savedf(sumdf, savecsv)
-    return sumdf
+    return sumdf, page_hashes
 
 
 def savedf(df, basename):
@@ -529,14 +573,14 @@ def savedf(df, basename):
 
 
 # update sumeventdf
-def update_sumeventdf(currentsum, orgname):
+def update_sumeventdf(currentsum, orgname, page_hashes=None):
     org_name_index = org2name[orgname]
     # get detail
     oldsum = get_pbocsum(orgname)
     if oldsum.empty:
-        oldidls = []
+        oldidls = set()
     else:
-        oldidls = oldsum["link"].tolist()
+        oldidls = set(oldsum["link"])
     currentidls = currentsum["link"].tolist()
     # print('oldidls:',oldidls)
     # print('currentidls:', currentidls)
@@ -553,6 +597,8 @@ def update_sumeventdf(currentsum, orgname):
         # add orgname
         newdf["区域"] = orgname
         savedf(newdf, savename)
+    # rows are saved, remember the page hashes
+    commit_list_page_cache(page_hashes)
     return newdf
 
 
@@ -571,9 +617,9 @@ def update_toupd(orgname):
     # get detail
     oldsum = get_pbocdetail(orgname)
     if oldsum.empty:
-        oldidls = []
+        oldidls = set()
     else:
-        oldidls = oldsum["link"].tolist()
+        oldidls = set(oldsum["link"])
     if currentsum.empty:
         currentidls = []
     else:
@@ -610,19 +656,31 @@ def get_eventdetail(eventsum, orgname):
     tresultls = []
     errorls = []
     count = 0
+    # append-only temp log: each page's rows are added once, as json lines
+    templog = os.path.join(
+        temppath, org_name_index, "temptodownload-" + org_name_index + get_now() + ".jsonl"
+    )
+    pacer = AdaptivePacer()
     for durl in detaills:
         st.info(str(count) + " begin")
         st.info("url: " + durl)
+        dstart = len(dresultls)
+        tstart = len(tresultls)
+        pagestart = time.time()
+        pageok = True
         try:
             browser.get(durl)
 
+            # parse the rendered page once instead of querying chromedriver per element
+            tree = get_pagetree(browser)
+
             st.write("get download link")
             # get download link
-            dl1 = browser.find_elements(By.XPATH, '//td[@class="hei14jj"]//a')
+            dl1 = tree.xpath('//td[@class="hei14jj"]//a')
             downurl = []
             if len(dl1) > 0:
                 for dl in dl1:
-                    dlink = dl.get_attribute("href")
+                    dlink = node_href(dl, browser.current_url)
                     st.write(dlink)
                     downurl.append(dlink)
 
@@ -643,9 +701,9 @@ def get_eventdetail(eventsum, orgname):
             st.write("get table")
             # get web table
             if org_name_index == "zongbu":
-                dl2 = browser.find_elements(By.XPATH, "//table/tbody/tr")
+                dl2 = tree.xpath("//table/tbody/tr")
             else:
-                dl2 = browser.find_elements(By.XPATH, '//td[@class="hei14jj"]//tr')
+                dl2 = tree.xpath('//td[@class="hei14jj"]//tr')
             df = web2table(dl2)
             st.write(df)
             # if len(downurl) == 0 and df.empty:
@@ -735,20 +793,15 @@ def get_eventdetail(eventsum, orgname):
             st.error("error!: " + str(e))
             st.error("check url:" + durl)
             errorls.append(durl)
+            pageok = False
+        pacer.record(time.time() - pagestart, pageok)
 
-        mod = (count + 1) % 10
-        if mod == 0 and count > 0:
-            # concat all result
-            resultls = dresultls + tresultls
-            if resultls:
-                tempdf = pd.concat(resultls)
-                savename = "temptodownload-" + org_name_index + str(count + 1)
-                # savetemp(tempdf, savename)
-                savetempsub(tempdf, savename, org_name_index)
-
-        wait = random.randint(2, 20)
-        time.sleep(wait)
-        st.info("finish: " + str(count))
+        # save this page's rows only
+        for pagedf in dresultls[dstart:] + tresultls[tstart:]:
+            appendtemplog(pagedf, templog)
+
+        wait = pacer.wait()
+        st.info("finish: " + str(count) + " next in " + str(wait) + "s")
         count += 1
 
     browser.quit()
@@ -782,14 +835,35 @@ def get_eventdetail(eventsum, orgname):
     return alldf
 
 
+def get_pagetree(browser):
+    # one page_source snapshot, parsed with lxml
+    return lxml_html.fromstring(browser.page_source)
+
+
+def node_text(node):
+    # text of a parsed element, lines kept and whitespace collapsed like selenium .text
+    # text nodes and <br> in document order
+    text = "".join(n if isinstance(n, str) else "\n" for n in node.xpath(".//text() | .//br"))
+    lines = [" ".join(line.split()) for line in text.split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def node_href(node, baseurl):
+    # absolute link, as selenium get_attribute("href") returns
+    href = node.get("href")
+    if href is None:
+        return None
+    return urljoin(baseurl, href)
+
+
 def web2table(dl2):
     tbls = []
     for tr in dl2:
         rowls = []
-        dl3 = tr.find_elements(By.TAG_NAME, "td")
+        dl3 = tr.xpath("./td")
         for td in dl3:
-            #         print(td.text)
-            rowls.append(td.text)
+            #         print(node_text(td))
+            rowls.append(node_text(td))
         tbls.append(rowls)
     df = pd.DataFrame(tbls)
     return df
@@ -814,6 +888,14 @@ def savetempsub(df, basename, subfolder):
     df.to_csv(savepath, quoting=csv.QUOTE_NONNUMERIC, escapechar="\\")
 
 
+def appendtemplog(df, savepath):
+    # constant cost per call: rows are appended, earlier rows are never rewritten
+    os.makedirs(os.path.dirname(savepath), exist_ok=True)
+    lines = df.to_json(orient="records", lines=True, force_ascii=False)
+    with open(savepath, "a", encoding="utf-8") as f:
+        f.write(lines if lines.endswith("\n") else lines + "\n")
+
+
 # download attachment
 def download_attachment(linkurl, downloadls, orgname):
     org_name_index = org2name[orgname]
@@ -823,9 +905,12 @@ def download_attachment(linkurl, downloadls, orgname):
     resultls = []
     errorls = []
     count = 0
+    pacer = AdaptivePacer(max_delay=10.0)
     for link, url in zip(linkurl, downloadls):
         st.info("begin: " + str(count))
         st.info("url: " + url)
+        pagestart = time.time()
+        pageok = True
         try:
             # get filename from url
             filename = os.path.basename(url)
@@ -847,6 +932,8 @@ def download_attachment(linkurl, downloadls, orgname):
             st.error("error!: " + str(e))
             st.error("check url:" + url)
             errorls.append(url)
+            pageok = False
+        pacer.record(time.time() - pagestart, pageok)
 
         mod = (count + 1) % 10
         if mod == 0 and count > 0:
@@ -855,9 +942,8 @@ def download_attachment(linkurl, downloadls, orgname):
             # savetemp(tempdf, savename)
             savetempsub(tempdf, savename, org_name_index)
 
-        wait = random.randint(2, 10)
-        time.sleep(wait)
-        st.info("finish: " + str(count))
+        wait = pacer.wait()
+        st.info("finish: " + str(count) + " next in " + str(wait) + "s")
         count += 1
 
     if resultls:
@@ -2180,9 +2266,9 @@ def update_pboclabel():
 
     # if amtdf is not empty
     if amtdf.empty:
-        amtoldidls = []
+        amtoldidls = set()
     else:
-        amtoldidls = amtdf["uid"].tolist()
+        amtoldidls = set(amtdf["uid"])
     # get new idls not in oldidls
     amtupdidls = [x for x in newidls if x not in amtoldidls]
 
@@ -1,6 +1,7 @@
 import datetime
 import glob
 import os
+import time
 
 import pandas as pd
 import requests
@@ -102,6 +103,26 @@ def split_words(text):
 #     components.html(table.render_embed(), width=800)
 
 
+# adaptive delay between page loads (AIMD): shorter while pages load fast, doubled on errors
+class AdaptivePacer:
+    def __init__(self, delay=5.0, min_delay=2.0, max_delay=20.0, latency_target=5.0, step=0.5):
+        self.delay = delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.latency_target = latency_target
+        self.step = step
+
+    def record(self, latency, ok):
+        if not ok or latency > 2 * self.latency_target:
+            self.delay = min(self.max_delay, self.delay * 2)
+        elif latency <= self.latency_target:
+            self.delay = max(self.min_delay, self.delay - self.step)
+
+    def wait(self):
+        time.sleep(self.delay)
+        return self.delay
+
+
 # get current date and time string
 def get_now():
     now = datetime.datetime.now()
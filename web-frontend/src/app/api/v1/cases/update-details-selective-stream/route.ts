@@ -42,6 +42,8 @@ export async function POST(request: NextRequest) {
               'Content-Type': 'application/json',
             },
             body: JSON.stringify(body),
+            // Closing the page drops the backend stream too, so the server can stop the run
+            signal: request.signal,
           })
 
           if (!response.ok) {
@@ -14,6 +14,7 @@ import { toast } from 'sonner'
 import { MainLayout } from '@/components/layout/main-layout'
 import { useProgressStream } from '@/lib/hooks/use-progress-stream'
 import { ProgressTracker } from '@/components/ui/progress-tracker'
+import { config } from '@/lib/config'
 
 // 城市列表 - 与后端 org2url 顺序保持一致
 const cityList = [
@@ -103,73 +104,63 @@ export default function UpdatePage() {
     })))
 
     try {
-      for (let i = 0; i < selectedOrgs.length; i++) {
-        const orgName = selectedOrgs[i]
+      // 多个机构在后端并发更新，按完成顺序流式返回结果
+      const response = await fetch(`${config.backendUrl}/api/v1/cases/update-list-batch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ orgNames: selectedOrgs, startPage, endPage })
+      })
 
-        setUpdateStatuses(prev => prev.map(status => 
-          status.orgName === orgName 
-            ? { ...status, status: 'updating', message: '正在获取案例列表...', progress: 10 }
-            : status
-        ))
+      if (!response.ok || !response.body) throw new Error('更新失败')
 
-        let totalNew = 0
-        let currentPage = startPage
-        const totalPages = endPage - startPage + 1
-        let processedPages = 0
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
 
-        while (currentPage <= endPage) {
-          try {
-            const response = await fetch('/api/cases/update-list', {
-              method: 'POST',
-              headers: { 'Content-Type': 'application/json' },
-              body: JSON.stringify({ orgName, startPage: currentPage, endPage: currentPage })
-            })
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
 
-            if (!response.ok) throw new Error('更新失败')
+        buffer += decoder.decode(value, { stream: true })
+        const events = buffer.split('\n\n')
+        buffer = events.pop() || ''
 
-            const data = await response.json()
-            totalNew += Number(data?.newCases || 0)
-            processedPages += 1
+        for (const event of events) {
+          if (!event.startsWith('data: ')) continue
+          const data = JSON.parse(event.slice(6))
 
-            const progress = Math.min(90, 10 + (processedPages / totalPages) * 80)
+          if (data.type === 'org_start') {
             setUpdateStatuses(prev => prev.map(status => 
-              status.orgName === orgName 
+              status.orgName === data.orgName 
+                ? { ...status, status: 'updating', message: '正在获取案例列表...', progress: 10 }
+                : status
+            ))
+          } else if (data.type === 'org_result') {
+            setUpdateStatuses(prev => prev.map(status => 
+              status.orgName === data.orgName 
                 ? { 
                     ...status, 
-                    status: 'updating', 
-                    progress: progress,
-                    message: `正在处理第 ${currentPage} 页，已获取 ${totalNew} 条新案例...`
+                    status: 'completed', 
+                    progress: 100,
+                    message: `更新完成，共获取 ${data.newCases} 条新案例`,
+                    newCases: Number(data.newCases || 0)
                   }
                 : status
             ))
-
-            // 移动到下一页
-            currentPage += 1
-          } catch (err) {
+          } else if (data.type === 'org_error') {
             setUpdateStatuses(prev => prev.map(status => 
-              status.orgName === orgName 
-                ? { ...status, status: 'error', progress: 0, message: '更新失败', newCases: totalNew }
+              status.orgName === data.orgName 
+                ? { ...status, status: 'error', progress: 0, message: '更新失败' }
                 : status
             ))
-            break
           }
         }
-
-        // 完成当前机构
-        setUpdateStatuses(prev => prev.map(status => 
-          status.orgName === orgName 
-            ? { 
-                ...status, 
-                status: 'completed', 
-                progress: 100,
-                message: `更新完成，共获取 ${totalNew} 条新案例`,
-                newCases: totalNew
-              }
-            : status
-        ))
       }
 
       toast.success('案例列表更新完成')
+    } catch (error) {
+      console.error('Update failed:', error)
+      toast.error('案例列表更新失败')
     } finally {
       setIsUpdating(false)
     }
@@ -9,6 +9,7 @@ export interface ProgressState {
   message: string
   error: string | null
   orgName: string | null
+  jobId: string | null
   currentLink: number
   totalLinks: number
   updatedCases: number
@@ -22,6 +23,7 @@ const initialState: ProgressState = {
   message: '',
   error: null,
   orgName: null,
+  jobId: null,
   currentLink: 0,
   totalLinks: 0,
   updatedCases: 0,
@@ -50,6 +52,103 @@ export function useProgressStream() {
     setState(prev => ({ ...prev, isActive: false }))
   }, [])
 
+  // Read Server-Sent Events from a stream response into state
+  const consumeStream = useCallback(async (response: Response) => {
+    if (!response.ok) {
+      throw new Error(`HTTP error! status: ${response.status}`)
+    }
+
+    if (!response.body) {
+      throw new Error('Response body is null')
+    }
+
+    // Create EventSource-like reader for Server-Sent Events
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+
+    try {
+      while (true) {
+        const { done, value } = await reader.read()
+        
+        if (done) {
+          break
+        }
+
+        const chunk = decoder.decode(value, { stream: true })
+        const lines = chunk.split('\n')
+
+        for (const line of lines) {
+          if (line.startsWith('data: ')) {
+            try {
+              const data = JSON.parse(line.slice(6))
+              
+              setState(prev => {
+                switch (data.type) {
+                  case 'start':
+                    return {
+                      ...prev,
+                      isActive: true,
+                      progress: 0,
+                      message: data.message || '开始更新...',
+                      error: null,
+                      orgName: data.orgName,
+                      jobId: data.jobId || null,
+                      totalLinks: data.totalLinks || 0,
+                      currentLink: 0
+                    }
+                  
+                  case 'progress':
+                    return {
+                      ...prev,
+                      progress: Math.min(data.progress || 0, 99), // Cap at 99% until complete
+                      message: data.message || `正在处理第 ${data.currentLink}/${data.totalLinks} 个链接`,
+                      jobId: data.jobId || prev.jobId,
+                      currentLink: data.currentLink || 0,
+                      totalLinks: data.totalLinks || prev.totalLinks
+                    }
+                  
+                  case 'complete':
+                    return {
+                      ...prev,
+                      isActive: false,
+                      progress: 100,
+                      message: data.message || '更新完成',
+                      updatedCases: data.updatedCases || 0,
+                      downloads: data.downloads || 0,
+                      tables: data.tables || 0
+                    }
+                  
+                  case 'cancelled':
+                    return {
+                      ...prev,
+                      isActive: false,
+                      message: data.message || '更新已取消',
+                      currentLink: data.currentLink || prev.currentLink
+                    }
+
+                  case 'error':
+                    return {
+                      ...prev,
+                      isActive: false,
+                      error: data.error || '更新过程中出现错误',
+                      message: data.message || '更新失败'
+                    }
+                  
+                  default:
+                    return prev
+                }
+              })
+            } catch (parseError) {
+              console.error('Failed to parse SSE data:', parseError, 'Raw line:', line)
+            }
+          }
+        }
+      }
+    } finally {
+      reader.releaseLock()
+    }
+  }, [])
+
   const startStream = useCallback(async (orgName: string, selectedLinks?: string[]) => {
     // Stop any existing stream
     stopStream()
@@ -82,105 +181,54 @@ export function useProgressStream() {
         signal: abortControllerRef.current.signal
       })
 
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`)
-      }
-
-      if (!response.body) {
-        throw new Error('Response body is null')
+      await consumeStream(response)
+    } catch (error: any) {
+      if (error.name === 'AbortError') {
+        // Request was aborted, don't update state
+        return
       }
+      
+      console.error('Stream error:', error)
+      setState(prev => ({
+        ...prev,
+        isActive: false,
+        error: error.message || '连接失败',
+        message: '更新失败'
+      }))
+    }
+  }, [stopStream, consumeStream])
 
-      // Create EventSource-like reader for Server-Sent Events
-      const reader = response.body.getReader()
-      const decoder = new TextDecoder()
-
-      try {
-        while (true) {
-          const { done, value } = await reader.read()
-          
-          if (done) {
-            break
-          }
+  // Re-attach to a run that is still going on the server (e.g. after a reload)
+  const attachStream = useCallback(async (jobId: string) => {
+    stopStream()
 
-          const chunk = decoder.decode(value, { stream: true })
-          const lines = chunk.split('\n')
-
-          for (const line of lines) {
-            if (line.startsWith('data: ')) {
-              try {
-                const data = JSON.parse(line.slice(6))
-                
-                setState(prev => {
-                  switch (data.type) {
-                    case 'start':
-                      return {
-                        ...prev,
-                        isActive: true,
-                        progress: 0,
-                        message: data.message || '开始更新...',
-                        error: null,
-                        orgName: data.orgName,
-                        totalLinks: data.totalLinks || 0,
-                        currentLink: 0
-                      }
-                    
-                    case 'progress':
-                      return {
-                        ...prev,
-                        progress: Math.min(data.progress || 0, 99), // Cap at 99% until complete
-                        message: data.message || `正在处理第 ${data.currentLink}/${data.totalLinks} 个链接`,
-                        currentLink: data.currentLink || 0,
-                        totalLinks: data.totalLinks || prev.totalLinks
-                      }
-                    
-                    case 'complete':
-                      return {
-                        ...prev,
-                        isActive: false,
-                        progress: 100,
-                        message: data.message || '更新完成',
-                        updatedCases: data.updatedCases || 0,
-                        downloads: data.downloads || 0,
-                        tables: data.tables || 0
-                      }
-                    
-                    case 'error':
-                      return {
-                        ...prev,
-                        isActive: false,
-                        error: data.error || '更新过程中出现错误',
-                        message: data.message || '更新失败'
-                      }
-                    
-                    default:
-                      return prev
-                  }
-                })
-              } catch (parseError) {
-                console.error('Failed to parse SSE data:', parseError, 'Raw line:', line)
-              }
-            }
-          }
-        }
-      } finally {
-        reader.releaseLock()
-      }
+    setState({
+      ...initialState,
+      isActive: true,
+      jobId,
+      message: '正在重新连接...'
+    })
 
+    try {
+      abortControllerRef.current = new AbortController()
+      const response = await fetch(`${config.backendUrl}/api/v1/cases/jobs/${encodeURIComponent(jobId)}/stream`, {
+        signal: abortControllerRef.current.signal
+      })
+      await consumeStream(response)
     } catch (error: any) {
       if (error.name === 'AbortError') {
-        // Request was aborted, don't update state
         return
       }
-      
+
       console.error('Stream error:', error)
       setState(prev => ({
         ...prev,
         isActive: false,
         error: error.message || '连接失败',
-        message: '更新失败'
+        message: '重新连接失败'
       }))
     }
-  }, [stopStream])
+  }, [stopStream, consumeStream])
 
   const retryStream = useCallback(async () => {
     const { orgName } = state
@@ -192,6 +240,7 @@ export function useProgressStream() {
   return {
     state,
     startStream,
+    attachStream,
     stopStream,
     resetState,
     retryStream